@@ -0,0 +1,152 @@
+"""
+WebSocket endpoint for GraphQL subscriptions (``graphql-transport-ws``).
+
+Clients authenticate by sending their session id (or signed session token,
+see core/session_tokens.py) as ``connection_init`` payload
+``{"sessionId": ...}`` (browsers cannot set the ``X-Session-ID`` header on
+WebSockets); a session cookie works as well.
+"""
+import asyncio
+from importlib import import_module
+
+from asgiref.sync import sync_to_async
+from channels.auth import get_user
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from graphene_django.settings import graphene_settings
+from graphql import (
+    ExecutionResult,
+    GraphQLError,
+    OperationType,
+    get_operation_ast,
+    subscribe,
+    validate,
+)
+
+from core.session_tokens import SessionTokens
+from . import document_cache
+from .loaders import Loaders
+from .schema import async_schema, get_request_validation_rules
+
+
+PROTOCOL = 'graphql-transport-ws'
+
+
+class SubscriptionContext:
+    """Resolver context of one subscription operation."""
+
+    def __init__(self, user):
+        self.user = user
+        self.loaders = Loaders(is_async=True)
+        self.cache_tags = {}
+
+
+class GraphQLSubscriptionConsumer(AsyncJsonWebsocketConsumer):
+    """Runs GraphQL subscriptions and streams their results to the client."""
+
+    async def connect(self):
+        if PROTOCOL not in self.scope.get('subprotocols', []):
+            await self.close()
+            return
+        self.acknowledged = False
+        self.operations = {}
+        await self.accept(PROTOCOL)
+
+    async def disconnect(self, code):
+        for task in getattr(self, 'operations', {}).values():
+            task.cancel()
+
+    async def receive_json(self, message):
+        message_type = message.get('type') if isinstance(message, dict) else None
+        if message_type == 'connection_init':
+            await self._connection_init(message.get('payload') or {})
+        elif message_type == 'ping':
+            await self.send_json({'type': 'pong'})
+        elif message_type == 'pong':
+            pass
+        elif message_type == 'subscribe':
+            if not self.acknowledged:
+                await self.close(code=4401)
+                return
+            await self._subscribe(message.get('id'), message.get('payload') or {})
+        elif message_type == 'complete':
+            task = self.operations.pop(message.get('id'), None)
+            if task:
+                task.cancel()
+        else:
+            await self.close(code=4400)
+
+    async def _connection_init(self, payload):
+        if self.acknowledged:
+            await self.close(code=4429)
+            return
+        session_key = payload.get('sessionId')
+        if session_key and settings.SESSION_TOKENS_ENABLED and SessionTokens.looks_like_token(session_key):
+            self.scope['user'] = await sync_to_async(SessionTokens.authenticate)(session_key) or AnonymousUser()
+        elif session_key:
+            engine = import_module(settings.SESSION_ENGINE)
+            self.scope['session'] = engine.SessionStore(session_key)
+            self.scope['user'] = await get_user(self.scope)
+        self.acknowledged = True
+        await self.send_json({'type': 'connection_ack'})
+
+    async def _subscribe(self, operation_id, payload):
+        if not isinstance(operation_id, str):
+            await self.close(code=4400)
+            return
+        if operation_id in self.operations:
+            await self.close(code=4409)
+            return
+
+        result = await self._start(payload)
+        if isinstance(result, ExecutionResult):
+            await self.send_json({
+                'type': 'error',
+                'id': operation_id,
+                'payload': [error.formatted for error in result.errors],
+            })
+            return
+        self.operations[operation_id] = asyncio.ensure_future(self._stream(operation_id, result))
+
+    async def _start(self, payload):
+        """Return the result stream of a subscription, or an ExecutionResult with errors."""
+        query = payload.get('query')
+        if not isinstance(query, str):
+            return ExecutionResult(errors=[GraphQLError("Must provide query string.")])
+
+        cached = document_cache.get_document(query)
+        if cached.document is None or cached.errors:
+            return ExecutionResult(errors=cached.errors)
+
+        operation_name = payload.get('operationName')
+        operation_ast = get_operation_ast(cached.document, operation_name)
+        if operation_ast is None or operation_ast.operation != OperationType.SUBSCRIPTION:
+            return ExecutionResult(errors=[GraphQLError("Only subscription operations are supported.")])
+
+        variables = payload.get('variables') or {}
+        validation_errors = validate(
+            async_schema.graphql_schema,
+            cached.document,
+            get_request_validation_rules(variables),
+            graphene_settings.MAX_VALIDATION_ERRORS,
+        )
+        if validation_errors:
+            return ExecutionResult(errors=validation_errors)
+
+        return await subscribe(
+            async_schema.graphql_schema,
+            cached.document,
+            context_value=SubscriptionContext(self.scope.get('user') or AnonymousUser()),
+            variable_values=variables,
+            operation_name=operation_name,
+        )
+
+    async def _stream(self, operation_id, results):
+        try:
+            async for result in results:
+                await self.send_json({'type': 'next', 'id': operation_id, 'payload': result.formatted})
+            await self.send_json({'type': 'complete', 'id': operation_id})
+        finally:
+            self.operations.pop(operation_id, None)
+            await results.aclose()
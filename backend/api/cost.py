@@ -0,0 +1,207 @@
+"""
+Static query cost and depth analysis.
+
+Runs as a GraphQL validation rule so over-budget operations are rejected
+before any resolver touches the database. The cost of a field is its weight
+plus the cost of its selection multiplied by the expected number of items:
+the ``first`` argument for paginated fields, ``GRAPHQL_DEFAULT_LIST_SIZE``
+for plain lists.
+"""
+from contextlib import asynccontextmanager, contextmanager
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.db import connection
+from graphql import (
+    FieldNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLList,
+    InlineFragmentNode,
+    get_named_type,
+    get_nullable_type,
+    is_object_type,
+    is_interface_type,
+)
+from graphql.execution.values import get_argument_values
+from graphql.validation import ValidationRule
+
+from core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+
+# Fields that are more expensive than a plain column read.
+FIELD_WEIGHTS = {
+    'ProjectType.statistics': 3,
+    'ProjectType.tasks': 3,
+    'TaskType.comments': 5,
+    'Query.search': 10,
+}
+
+
+class QueryCostRule(ValidationRule):
+    """
+    Reject operations deeper than ``GRAPHQL_MAX_DEPTH`` or costlier than
+    ``GRAPHQL_MAX_COST``.
+
+    Use ``QueryCostRule.bind(variables, report)`` to get a rule that sees
+    the request variables and records ``{operation_name: (cost, depth)}``
+    into ``report``.
+    """
+
+    variables = None
+    report = None
+
+    @classmethod
+    def bind(cls, variables=None, report=None):
+        return type(cls.__name__, (cls,), {'variables': variables or {}, 'report': report})
+
+    def enter_operation_definition(self, node, *_args):
+        root_type = self.context.schema.get_root_type(node.operation)
+        if root_type is None:
+            return self.SKIP
+        cost, depth = self._selection_cost(node.selection_set, root_type, 1, frozenset())
+        name = node.name.value if node.name else None
+        if self.report is not None:
+            self.report[name] = (cost, depth)
+
+        if depth > settings.GRAPHQL_MAX_DEPTH:
+            self.report_error(GraphQLError(
+                f"Query depth {depth} exceeds the maximum of {settings.GRAPHQL_MAX_DEPTH}.",
+                node,
+            ))
+        elif cost > settings.GRAPHQL_MAX_COST:
+            self.report_error(GraphQLError(
+                f"Query cost {cost} exceeds the maximum of {settings.GRAPHQL_MAX_COST}.",
+                node,
+            ))
+        return self.SKIP
+
+    def _selection_cost(self, selection_set, parent_type, depth, fragments):
+        """Return (cost, max depth) of a selection set on ``parent_type``."""
+        cost, max_depth = 0, depth
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                field_cost, field_depth = self._field_cost(selection, parent_type, depth, fragments)
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = parent_type
+                if selection.type_condition:
+                    fragment_type = self.context.schema.get_type(selection.type_condition.name.value)
+                field_cost, field_depth = self._selection_cost(
+                    selection.selection_set, fragment_type or parent_type, depth, fragments
+                )
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = self.context.get_fragment(name)
+                if fragment is None or name in fragments:
+                    # Unknown or cyclic spreads are reported by the standard rules.
+                    continue
+                fragment_type = self.context.schema.get_type(fragment.type_condition.name.value)
+                field_cost, field_depth = self._selection_cost(
+                    fragment.selection_set, fragment_type or parent_type, depth, fragments | {name}
+                )
+            else:
+                continue
+            cost += field_cost
+            max_depth = max(max_depth, field_depth)
+        return cost, max_depth
+
+    def _field_cost(self, node, parent_type, depth, fragments):
+        name = node.name.value
+        if name.startswith('__'):
+            # Introspection is cheap and served from the schema, not the database.
+            return 0, depth
+        if not (is_object_type(parent_type) or is_interface_type(parent_type)):
+            return 0, depth
+        field_def = parent_type.fields.get(name)
+        if field_def is None:
+            return 0, depth
+
+        weight = FIELD_WEIGHTS.get(f'{parent_type.name}.{name}', 1)
+        if not node.selection_set:
+            return weight, depth
+
+        child_cost, child_depth = self._selection_cost(
+            node.selection_set, get_named_type(field_def.type), depth + 1, fragments
+        )
+        return weight + self._multiplier(node, field_def, parent_type) * child_cost, child_depth
+
+    def _multiplier(self, node, field_def, parent_type):
+        """Expected number of items a field returns."""
+        if 'first' in field_def.args:
+            try:
+                first = get_argument_values(field_def, node, self.variables).get('first')
+            except GraphQLError:
+                first = None
+            return min(first if first is not None else DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+        if isinstance(get_nullable_type(field_def.type), GraphQLList):
+            if node.name.value == 'edges' and 'pageInfo' in parent_type.fields:
+                # Already counted by the paginated field that owns this connection.
+                return 1
+            return settings.GRAPHQL_DEFAULT_LIST_SIZE
+        return 1
+
+
+def statement_timeout_ms(cost):
+    """Postgres statement_timeout matching an operation's cost budget."""
+    timeout = (
+        settings.GRAPHQL_BASE_STATEMENT_TIMEOUT_MS
+        + cost * settings.GRAPHQL_STATEMENT_TIMEOUT_MS_PER_COST
+    )
+    return int(min(timeout, settings.GRAPHQL_MAX_STATEMENT_TIMEOUT_MS))
+
+
+@contextmanager
+def statement_timeout(cost):
+    """
+    Run the enclosed queries under a Postgres ``statement_timeout`` sized
+    to the operation cost. A no-op on other database backends.
+
+    The timeout is set on the session and reset afterwards, so the
+    operation keeps its own transaction handling (autocommit, or the atomic
+    block of ``ATOMIC_MUTATIONS``). Inside an atomic block it is set with
+    ``SET LOCAL`` instead: a RESET would fail once an error aborted the
+    transaction, and the setting ends with the transaction anyway.
+    """
+    if connection.vendor != 'postgresql':
+        yield
+        return
+    if connection.in_atomic_block:
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL statement_timeout = %s", [statement_timeout_ms(cost)])
+        yield
+        return
+    _set_statement_timeout(statement_timeout_ms(cost))
+    try:
+        yield
+    finally:
+        _reset_statement_timeout()
+
+
+def _set_statement_timeout(timeout_ms):
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SET statement_timeout = %s", [timeout_ms])
+    return True
+
+
+def _reset_statement_timeout():
+    with connection.cursor() as cursor:
+        cursor.execute("RESET statement_timeout")
+
+
+@asynccontextmanager
+async def astatement_timeout(cost):
+    """
+    Async variant of ``statement_timeout``.
+
+    Async ORM calls cannot share a transaction, so the timeout is set on the
+    session of the request's database thread and reset afterwards.
+    """
+    is_set = await sync_to_async(_set_statement_timeout)(statement_timeout_ms(cost))
+    try:
+        yield
+    finally:
+        if is_set:
+            await sync_to_async(_reset_statement_timeout)()
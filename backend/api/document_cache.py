@@ -0,0 +1,123 @@
+"""
+Process-local LRU cache of parsed and validated GraphQL documents.
+
+Parsing and validating a document against the full schema costs more than
+executing small hot operations such as ``me`` or ``organizations``. Both
+only depend on the document text, so they are cached by its SHA-256 hash.
+Request-dependent validation (query cost, see api/cost.py) still runs on
+every execution.
+
+Introspection results only depend on the schema, the document and its
+variables, so they are cached as well.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from graphene_django.settings import graphene_settings
+from graphql import FieldNode, GraphQLError, parse, validate
+
+from core.metrics import record_cache
+
+from .schema import document_validation_rules, schema
+
+
+class CachedDocument:
+    """A parsed document and the result of validating it."""
+
+    def __init__(self, document=None, errors=None):
+        self.document = document
+        self.errors = errors or []
+
+
+class LRUCache:
+    """Thread-safe bounded mapping with hit/miss counters."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+documents = LRUCache(settings.GRAPHQL_DOCUMENT_CACHE_SIZE)
+introspection_results = LRUCache(settings.GRAPHQL_INTROSPECTION_CACHE_SIZE)
+
+
+def get_document(query: str) -> CachedDocument:
+    """Parse and validate ``query``, reusing a cached result when possible."""
+    key = hashlib.sha256(query.encode('utf-8')).hexdigest()
+    cached = documents.get(key)
+    record_cache('document', cached is not None)
+    if cached is None:
+        try:
+            document = parse(query)
+        except GraphQLError as e:
+            cached = CachedDocument(errors=[e])
+        else:
+            errors = validate(
+                schema.graphql_schema,
+                document,
+                document_validation_rules,
+                graphene_settings.MAX_VALIDATION_ERRORS,
+            )
+            cached = CachedDocument(document, errors)
+        documents.set(key, cached)
+    return cached
+
+
+def is_introspection(operation_ast) -> bool:
+    """True when every root field of the operation is an introspection field."""
+    selections = operation_ast.selection_set.selections
+    return bool(selections) and all(
+        isinstance(selection, FieldNode) and selection.name.value.startswith('__')
+        for selection in selections
+    )
+
+
+def introspection_key(query: str, operation_name, variables) -> str:
+    payload = json.dumps([query, operation_name, variables or {}], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def stats() -> dict:
+    """Hit/miss counters of both caches."""
+    return {
+        'documents': documents.stats(),
+        'introspection': introspection_results.stats(),
+    }
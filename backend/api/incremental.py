@@ -0,0 +1,326 @@
+"""
+Incremental delivery: ``@defer`` and ``@stream``.
+
+graphql-core 3.2 has no incremental execution, so ``IncrementalExecutionContext``
+adds it on top of the regular executor:
+
+* a fragment marked ``@defer`` is left out when its parent object completes
+  and recorded with the parent value, to be executed once the initial
+  payload has been sent;
+* a list field marked ``@stream`` completes only its first ``initialCount``
+  items; the rest are completed later, ``STREAM_CHUNK_SIZE`` at a time.
+
+Payloads follow the 2022-08-24 incremental delivery format that Apollo
+Client understands (``multipart/mixed; deferSpec=20220824``). Operations
+are only executed incrementally when the client accepts multipart
+responses; otherwise both directives are ignored and the full result is
+returned at once. ``@defer`` on root fields is executed eagerly.
+"""
+from collections import deque
+
+from graphql import (
+    DirectiveLocation,
+    FieldNode,
+    FragmentSpreadNode,
+    GraphQLArgument,
+    GraphQLBoolean,
+    GraphQLDirective,
+    GraphQLError,
+    GraphQLInt,
+    GraphQLNonNull,
+    GraphQLString,
+    InlineFragmentNode,
+    Visitor,
+    located_error,
+    specified_directives,
+    visit,
+)
+from graphql.execution import ExecutionContext
+from graphql.execution.execute import invalid_return_type_error
+from graphql.execution.collect_fields import (
+    does_fragment_condition_match,
+    get_field_entry_key,
+    should_include_node,
+)
+from graphql.execution.values import get_directive_values
+from graphql.pyutils import is_iterable
+
+
+STREAM_CHUNK_SIZE = 20
+
+MULTIPART_CONTENT_TYPE = 'multipart/mixed; boundary="-"; deferSpec=20220824'
+
+GraphQLDeferDirective = GraphQLDirective(
+    name='defer',
+    locations=[DirectiveLocation.FRAGMENT_SPREAD, DirectiveLocation.INLINE_FRAGMENT],
+    args={
+        'if': GraphQLArgument(GraphQLNonNull(GraphQLBoolean), default_value=True),
+        'label': GraphQLArgument(GraphQLString),
+    },
+    description="Deliver the fragment after the rest of the response.",
+)
+
+GraphQLStreamDirective = GraphQLDirective(
+    name='stream',
+    locations=[DirectiveLocation.FIELD],
+    args={
+        'if': GraphQLArgument(GraphQLNonNull(GraphQLBoolean), default_value=True),
+        'label': GraphQLArgument(GraphQLString),
+        'initialCount': GraphQLArgument(GraphQLNonNull(GraphQLInt), default_value=0),
+    },
+    description="Deliver the list items after the first initialCount incrementally.",
+)
+
+directives = (*specified_directives, GraphQLDeferDirective, GraphQLStreamDirective)
+
+
+class _IncrementalDirectiveFinder(Visitor):
+    def __init__(self):
+        super().__init__()
+        self.found = False
+
+    def enter_directive(self, node, *_args):
+        if node.name.value in ('defer', 'stream'):
+            self.found = True
+            return self.BREAK
+
+
+def has_incremental_directives(document) -> bool:
+    finder = _IncrementalDirectiveFinder()
+    visit(document, finder)
+    return finder.found
+
+
+def accepts_multipart(request) -> bool:
+    return 'multipart/mixed' in request.headers.get('Accept', '')
+
+
+class DeferredFragment:
+    """Fields of a deferred fragment and the object they are resolved on."""
+
+    def __init__(self, label, path, parent_type, source, fields):
+        self.label = label
+        self.path = path
+        self.parent_type = parent_type
+        self.source = source
+        self.fields = fields
+
+    def execute(self, context):
+        return context.execute_fields(self.parent_type, self.source, self.path, self.fields)
+
+    def entry(self, data):
+        return {'data': data, 'path': self.path.as_list()}
+
+
+class StreamedItems:
+    """A chunk of list items still to be completed for a ``@stream`` field."""
+
+    def __init__(self, label, path, item_type, field_nodes, info, items, start):
+        self.label = label
+        self.path = path
+        self.item_type = item_type
+        self.field_nodes = field_nodes
+        self.info = info
+        self.items = items
+        self.start = start
+
+    def execute(self, context):
+        completed = [
+            context.complete_value(
+                self.item_type, self.field_nodes, self.info, self.path.add_key(index), item
+            )
+            for index, item in enumerate(self.items, self.start)
+        ]
+        if any(context.is_awaitable(value) for value in completed):
+            async def gather_items():
+                return [await value if context.is_awaitable(value) else value for value in completed]
+            return gather_items()
+        return completed
+
+    def entry(self, items):
+        return {'items': items, 'path': self.path.add_key(self.start).as_list()}
+
+
+class IncrementalExecutionContext(ExecutionContext):
+    """ExecutionContext that postpones ``@defer`` fragments and ``@stream`` items."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pending = deque()
+        self._defer_cache = {}
+
+    @property
+    def has_next(self):
+        return bool(self.pending)
+
+    def execute_initial(self):
+        """Execute the operation without deferred work; may return an awaitable."""
+        try:
+            data = self.execute_operation(self.operation, self.root_value)
+        except GraphQLError as error:
+            self.collected_errors.add(error, None)
+            return self.build_response(None, self.collected_errors.errors)
+
+        if self.is_awaitable(data):
+            async def await_data():
+                try:
+                    return self.build_response(await data, self.collected_errors.errors)
+                except GraphQLError as error:
+                    self.collected_errors.add(error, None)
+                    return self.build_response(None, self.collected_errors.errors)
+            return await_data()
+        return self.build_response(data, self.collected_errors.errors)
+
+    def execute_pending(self):
+        """
+        Execute every pending record and return their payload entries (or an
+        awaitable of them). Records queued meanwhile are left for the next call.
+        """
+        records = list(self.pending)
+        self.pending.clear()
+        entries = []
+        for index, record in enumerate(records):
+            entry = self._execute_record(record)
+            if self.is_awaitable(entry):
+                async def await_entries(entry=entry, remaining=records[index + 1:]):
+                    entries.append(await entry)
+                    for record in remaining:
+                        entry = self._execute_record(record)
+                        entries.append(await entry if self.is_awaitable(entry) else entry)
+                    return entries
+                return await_entries()
+            entries.append(entry)
+        return entries
+
+    def _execute_record(self, record):
+        errors_before = len(self.collected_errors.errors)
+
+        def build_entry(value):
+            entry = record.entry(value)
+            errors = self.collected_errors.errors[errors_before:]
+            if errors:
+                entry['errors'] = errors
+            if record.label is not None:
+                entry['label'] = record.label
+            return entry
+
+        def fail(raw_error):
+            error = located_error(raw_error, None, record.path.as_list())
+            self.collected_errors.add(error, record.path)
+            return build_entry(None)
+
+        try:
+            value = record.execute(self)
+        except Exception as raw_error:
+            return fail(raw_error)
+
+        if self.is_awaitable(value):
+            async def await_entry():
+                try:
+                    return build_entry(await value)
+                except Exception as raw_error:
+                    return fail(raw_error)
+            return await_entry()
+        return build_entry(value)
+
+    def complete_object_value(self, return_type, field_nodes, info, path, result):
+        fields, deferred = self._collect_deferrable_subfields(return_type, field_nodes)
+        for label, deferred_fields in deferred:
+            self.pending.append(DeferredFragment(label, path, return_type, result, deferred_fields))
+
+        if return_type.is_type_of:
+            is_type_of = return_type.is_type_of(result, info)
+            if self.is_awaitable(is_type_of):
+                async def execute_subfields_async():
+                    if not await is_type_of:
+                        raise invalid_return_type_error(return_type, result, field_nodes)
+                    return self.execute_fields(return_type, result, path, fields)
+                return execute_subfields_async()
+            if not is_type_of:
+                raise invalid_return_type_error(return_type, result, field_nodes)
+
+        return self.execute_fields(return_type, result, path, fields)
+
+    def complete_list_value(self, return_type, field_nodes, info, path, result):
+        stream = get_directive_values(GraphQLStreamDirective, field_nodes[0], self.variable_values)
+        if not stream or not stream['if'] or not is_iterable(result):
+            return super().complete_list_value(return_type, field_nodes, info, path, result)
+
+        items = list(result)
+        initial_count = max(stream['initialCount'], 0)
+        for start in range(initial_count, len(items), STREAM_CHUNK_SIZE):
+            self.pending.append(StreamedItems(
+                stream.get('label'),
+                path,
+                return_type.of_type,
+                field_nodes,
+                info,
+                items[start:start + STREAM_CHUNK_SIZE],
+                start,
+            ))
+        return super().complete_list_value(
+            return_type, field_nodes, info, path, items[:initial_count]
+        )
+
+    def _collect_deferrable_subfields(self, return_type, field_nodes):
+        key = (return_type, *map(id, field_nodes))
+        collected = self._defer_cache.get(key)
+        if collected is None:
+            fields, deferred = {}, []
+            visited = set()
+            for node in field_nodes:
+                if node.selection_set:
+                    self._collect(return_type, node.selection_set, fields, deferred, visited, True)
+            collected = self._defer_cache[key] = (fields, deferred)
+        return collected
+
+    def _collect(self, runtime_type, selection_set, fields, deferred, visited, deferrable):
+        for selection in selection_set.selections:
+            if not should_include_node(self.variable_values, selection):
+                continue
+            if isinstance(selection, FieldNode):
+                fields.setdefault(get_field_entry_key(selection), []).append(selection)
+                continue
+
+            if isinstance(selection, InlineFragmentNode):
+                fragment = selection
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = self.fragments.get(name)
+                if name in visited or fragment is None:
+                    continue
+                visited.add(name)
+            else:
+                continue
+            if not does_fragment_condition_match(self.schema, fragment, runtime_type):
+                continue
+
+            defer = get_directive_values(GraphQLDeferDirective, selection, self.variable_values)
+            if deferrable and defer and defer['if']:
+                deferred_fields = {}
+                # Nested @defer on the same object is delivered with its parent.
+                self._collect(runtime_type, fragment.selection_set, deferred_fields, deferred, visited, False)
+                deferred.append((defer.get('label'), deferred_fields))
+            else:
+                self._collect(runtime_type, fragment.selection_set, fields, deferred, visited, deferrable)
+
+
+def build_execution_context(schema, document, **options):
+    """Return an IncrementalExecutionContext, or a list of errors."""
+    return IncrementalExecutionContext.build(
+        schema,
+        document,
+        root_value=options.get('root_value'),
+        context_value=options.get('context_value'),
+        raw_variable_values=options.get('variable_values'),
+        operation_name=options.get('operation_name'),
+        middleware=options.get('middleware'),
+    )
+
+
+def multipart_part(payload: bytes) -> bytes:
+    return b'\r\nContent-Type: application/json; charset=utf-8\r\n\r\n' + payload + b'\r\n---'
+
+
+MULTIPART_START = b'\r\n---'
+MULTIPART_END = b'--\r\n'
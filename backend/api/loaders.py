@@ -0,0 +1,181 @@
+"""
+Per-request batch loaders for GraphQL relations.
+
+Without batching a list of parents resolves its children one parent at a
+time (1 + P + T queries for ``projects { tasks { comments } }``). Each
+loader below collects every parent key it has been told about and resolves
+all of them with a single ``IN (...)`` query.
+
+Under the synchronous schema execution is depth-first, so the resolver that
+produced a parent list primes the child loader with every parent key and the
+first ``load()`` dispatches them together. Under the async schema (see
+``AsyncProjectHubGraphQLView``) sibling resolvers run concurrently, and
+``load()`` returns an awaitable that is dispatched once per event-loop tick.
+"""
+import asyncio
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+
+from tasks.models import Task, TaskComment
+
+
+class BatchLoader:
+    """
+    Minimal DataLoader.
+
+    Keys are queued with ``prime()`` (typically by the resolver that
+    produced the parent list) or implicitly by ``load()``. Fetching any key
+    that has not been loaded yet dispatches every queued key in one
+    ``batch_load()`` call; results are memoized for the rest of the request.
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+        self._cache = {}
+        self._queue = []
+        self._queued = set()
+        self._inflight = {}
+        self._pending_dispatch = None
+
+    def batch_load(self, keys):
+        """Return a dict mapping each key to its value."""
+        raise NotImplementedError
+
+    def after_load(self, results):
+        """Hook run in the caller's context once a batch has been stored."""
+
+    def default(self):
+        """Value returned for keys that ``batch_load`` did not produce."""
+        return None
+
+    def prime(self, keys):
+        """Queue keys to be fetched together with the next dispatch."""
+        for key in keys:
+            if key not in self._cache and key not in self._queued and key not in self._inflight:
+                self._queued.add(key)
+                self._queue.append(key)
+
+    def load(self, key):
+        """Return the value for ``key`` (an awaitable in async mode)."""
+        if self.registry.is_async:
+            return self._load_async(key)
+        if key not in self._cache:
+            self.prime([key])
+            self._dispatch()
+        return self._cache[key]
+
+    def load_many(self, keys):
+        keys = list(keys)
+        if self.registry.is_async:
+            return asyncio.gather(*(self._load_async(key) for key in keys))
+        self.prime(keys)
+        if self._queue:
+            self._dispatch()
+        return [self._cache[key] for key in keys]
+
+    def clear(self):
+        """Forget all memoized results (e.g. after a mutation)."""
+        self._cache.clear()
+        self._queue.clear()
+        self._queued.clear()
+
+    def _take_queue(self):
+        keys, self._queue, self._queued = self._queue, [], set()
+        return keys
+
+    def _store(self, keys, results):
+        for key in keys:
+            self._cache[key] = results.get(key, self.default())
+        self.after_load(results)
+
+    def _dispatch(self):
+        keys = self._take_queue()
+        self._store(keys, self.batch_load(keys))
+
+    async def _load_async(self, key):
+        if key in self._cache:
+            return self._cache[key]
+        if key in self._inflight:
+            await self._inflight[key]
+            return self._cache[key]
+
+        self.prime([key])
+        if self._pending_dispatch is None:
+            self._pending_dispatch = asyncio.ensure_future(self._dispatch_async())
+        await self._pending_dispatch
+        return self._cache[key]
+
+    async def _dispatch_async(self):
+        # Yield once so every sibling resolver scheduled in this tick can
+        # queue its key before the batch is cut.
+        await asyncio.sleep(0)
+        self._pending_dispatch = None
+        keys = self._take_queue()
+        current = asyncio.current_task()
+        self._inflight.update((key, current) for key in keys)
+        try:
+            results = await sync_to_async(self.batch_load)(keys)
+            self._store(keys, results)
+        finally:
+            for key in keys:
+                self._inflight.pop(key, None)
+
+
+class TasksByProjectLoader(BatchLoader):
+    """Tasks of each project, in the model's default ordering."""
+
+    def default(self):
+        return []
+
+    def batch_load(self, project_ids):
+        grouped = defaultdict(list)
+        for task in Task.objects.filter(project_id__in=project_ids):
+            grouped[task.project_id].append(task)
+        return grouped
+
+    def after_load(self, results):
+        # Children of this level are resolved next; fetch them as one batch.
+        self.registry.comments_by_task.prime(
+            task.id for tasks in results.values() for task in tasks
+        )
+
+
+class CommentsByTaskLoader(BatchLoader):
+    """Comments of each task, newest first."""
+
+    def default(self):
+        return []
+
+    def batch_load(self, task_ids):
+        grouped = defaultdict(list)
+        for comment in TaskComment.objects.filter(task_id__in=task_ids):
+            grouped[comment.task_id].append(comment)
+        return grouped
+
+
+class Loaders:
+    """Registry of all loaders for one GraphQL request."""
+
+    def __init__(self, is_async=False):
+        # Set per operation by the view: async execution awaits loads.
+        self.is_async = is_async
+        self.tasks_by_project = TasksByProjectLoader(self)
+        self.comments_by_task = CommentsByTaskLoader(self)
+
+    def clear(self):
+        for loader in (self.tasks_by_project, self.comments_by_task):
+            loader.clear()
+
+
+def get_loaders(info) -> Loaders:
+    """
+    Return the loader registry attached to the request context, creating
+    it on first use so resolvers also work outside ``GraphQLView``.
+    """
+    context = info.context
+    loaders = getattr(context, 'loaders', None)
+    if loaders is None:
+        loaders = Loaders()
+        setattr(context, 'loaders', loaders)
+    return loaders
@@ -0,0 +1,94 @@
+"""
+Graphene middleware.
+"""
+import time
+from inspect import isawaitable
+from random import random
+
+from django.conf import settings
+from graphql import GraphQLObjectType, get_named_type
+
+from core.metrics import RESOLVER_LATENCY
+
+from .sql_diagnostics import current_diagnostics, current_field
+
+
+# (parent type, field) -> histogram child, or None when the field is not
+# timed. Module level because the view builds its middleware per request.
+_field_histograms = {}
+
+
+class ResolverMetricsMiddleware:
+    """
+    Records resolver latency of root fields and of fields returning objects.
+
+    Root fields are always timed; nested fields only for a
+    ``METRICS_FIELD_SAMPLE_RATE`` fraction of resolutions, and scalar fields
+    never, so the per-field cost stays a dictionary lookup.
+    """
+
+    def __init__(self):
+        self.sample_rate = settings.METRICS_FIELD_SAMPLE_RATE
+
+    def resolve(self, next, root, info, **args):
+        key = (info.parent_type.name, info.field_name)
+        try:
+            histogram = _field_histograms[key]
+        except KeyError:
+            histogram = _field_histograms[key] = self._histogram_for(info)
+
+        if histogram is None or (info.path.prev is not None and random() >= self.sample_rate):
+            return next(root, info, **args)
+
+        started = time.perf_counter()
+        try:
+            result = next(root, info, **args)
+        except Exception:
+            histogram.observe(time.perf_counter() - started)
+            raise
+        if isawaitable(result):
+            return self._observe_async(result, histogram, started)
+        histogram.observe(time.perf_counter() - started)
+        return result
+
+    @staticmethod
+    async def _observe_async(result, histogram, started):
+        try:
+            return await result
+        finally:
+            histogram.observe(time.perf_counter() - started)
+
+    @staticmethod
+    def _histogram_for(info):
+        is_root = info.parent_type in (
+            info.schema.query_type, info.schema.mutation_type, info.schema.subscription_type
+        )
+        if not is_root and not isinstance(get_named_type(info.return_type), GraphQLObjectType):
+            return None
+        return RESOLVER_LATENCY.labels(f'{info.parent_type.name}.{info.field_name}')
+
+
+class SQLDiagnosticsMiddleware:
+    """Attributes the queries of each resolver to it (see api/sql_diagnostics.py)."""
+
+    def resolve(self, next, root, info, **args):
+        if current_diagnostics.get() is None:
+            return next(root, info, **args)
+
+        field = f'{info.parent_type.name}.{info.field_name}'
+        token = current_field.set(field)
+        try:
+            result = next(root, info, **args)
+        finally:
+            current_field.reset(token)
+        if isawaitable(result):
+            return self._resolve_async(result, field)
+        return result
+
+    @staticmethod
+    async def _resolve_async(result, field):
+        token = current_field.set(field)
+        try:
+            return await result
+        finally:
+            current_field.reset(token)
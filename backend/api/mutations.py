@@ -5,11 +5,17 @@ import graphene
 from django.core.exceptions import ValidationError, PermissionDenied
 from django.contrib.auth.models import User
 
-from .types import ProjectType, TaskType, TaskCommentType, ProjectInput, TaskInput, CommentInput, OrganizationType
+from .types import (
+    ProjectType, TaskType, TaskCommentType, ProjectInput, TaskInput, CommentInput, OrganizationType,
+    BulkTaskResultType, TaskBulkUpdateInput, BulkInviteResultType, ImportResultType,
+)
 from services.project_service import ProjectService
 from services.task_service import TaskService
 from services.organization_service import OrganizationService
+from services.import_service import ImportService
+from organizations.membership_cache import MembershipCache
 from organizations.models import OrganizationMembership, OrganizationInvite
+from .response_cache import ResponseCache, organization_projects_tag, project_tag
 
 
 
@@ -60,6 +66,7 @@ class CreateProject(graphene.Mutation):
                 status=input.status or 'PLANNING',
                 due_date=input.due_date
             )
+            ResponseCache.invalidate(organization_projects_tag(organization_id))
             return CreateProject(project=project, success=True, error=None)
         except (ValidationError, PermissionDenied) as e:
             return CreateProject(project=None, success=False, error=str(e))
@@ -89,6 +96,7 @@ class UpdateProject(graphene.Mutation):
                 status=input.status,
                 due_date=input.due_date
             )
+            ResponseCache.invalidate(project_tag(project.id))
             return UpdateProject(project=project, success=True, error=None)
         except (ValidationError, PermissionDenied) as e:
             return UpdateProject(project=None, success=False, error=str(e))
@@ -120,6 +128,7 @@ class CreateTask(graphene.Mutation):
                 assignee_email=input.assignee_email or '',
                 due_date=input.due_date
             )
+            ResponseCache.invalidate(project_tag(task.project_id))
             return CreateTask(task=task, success=True, error=None)
         except (ValidationError, PermissionDenied) as e:
             return CreateTask(task=None, success=False, error=str(e))
@@ -151,11 +160,126 @@ class UpdateTask(graphene.Mutation):
                 assignee_email=input.assignee_email,
                 due_date=input.due_date
             )
+            ResponseCache.invalidate(project_tag(task.project_id))
             return UpdateTask(task=task, success=True, error=None)
         except (ValidationError, PermissionDenied) as e:
             return UpdateTask(task=None, success=False, error=str(e))
 
 
+def bulk_results(results):
+    return [BulkTaskResultType(task=result.task, error=result.error) for result in results]
+
+
+class BulkCreateTasks(graphene.Mutation):
+    """Create many tasks of a project in one transaction."""
+
+    class Arguments:
+        project_id = graphene.UUID(required=True)
+        organization_id = graphene.UUID(required=True)
+        input = graphene.List(graphene.NonNull(TaskInput), required=True)
+
+    results = graphene.List(BulkTaskResultType)
+    success = graphene.Boolean()
+    error = graphene.String()
+
+    def mutate(self, info, project_id, organization_id, input):
+        if not info.context.user.is_authenticated:
+            return BulkCreateTasks(results=None, success=False, error="Authentication required")
+        try:
+            results = TaskService.bulk_create_tasks(
+                project_id=project_id,
+                organization_id=organization_id,
+                items=[dict(item) for item in input],
+            )
+            ResponseCache.invalidate(project_tag(project_id))
+            return BulkCreateTasks(results=bulk_results(results), success=True, error=None)
+        except (ValidationError, PermissionDenied) as e:
+            return BulkCreateTasks(results=None, success=False, error=str(e))
+
+
+class BulkUpdateTasks(graphene.Mutation):
+    """Update status, priority, assignee or due date of many tasks in one transaction."""
+
+    class Arguments:
+        organization_id = graphene.UUID(required=True)
+        input = graphene.List(graphene.NonNull(TaskBulkUpdateInput), required=True)
+
+    results = graphene.List(BulkTaskResultType)
+    success = graphene.Boolean()
+    error = graphene.String()
+
+    def mutate(self, info, organization_id, input):
+        if not info.context.user.is_authenticated:
+            return BulkUpdateTasks(results=None, success=False, error="Authentication required")
+        try:
+            results = TaskService.bulk_update_tasks(
+                organization_id=organization_id,
+                updates=[dict(item) for item in input],
+            )
+            ResponseCache.invalidate(*{project_tag(r.task.project_id) for r in results if r.task})
+            return BulkUpdateTasks(results=bulk_results(results), success=True, error=None)
+        except (ValidationError, PermissionDenied) as e:
+            return BulkUpdateTasks(results=None, success=False, error=str(e))
+
+
+class BulkMoveTasks(graphene.Mutation):
+    """Move many tasks to the end of another project in one transaction."""
+
+    class Arguments:
+        task_ids = graphene.List(graphene.NonNull(graphene.UUID), required=True)
+        project_id = graphene.UUID(required=True)
+        organization_id = graphene.UUID(required=True)
+
+    results = graphene.List(BulkTaskResultType)
+    success = graphene.Boolean()
+    error = graphene.String()
+
+    def mutate(self, info, task_ids, project_id, organization_id):
+        if not info.context.user.is_authenticated:
+            return BulkMoveTasks(results=None, success=False, error="Authentication required")
+        try:
+            results = TaskService.bulk_move_tasks(
+                task_ids=task_ids,
+                project_id=project_id,
+                organization_id=organization_id,
+            )
+            ResponseCache.invalidate(
+                project_tag(project_id), *{project_tag(r.moved_from) for r in results if r.moved_from}
+            )
+            return BulkMoveTasks(results=bulk_results(results), success=True, error=None)
+        except (ValidationError, PermissionDenied) as e:
+            return BulkMoveTasks(results=None, success=False, error=str(e))
+
+
+class MoveTask(graphene.Mutation):
+    """Move a task between two tasks of its project."""
+
+    class Arguments:
+        task_id = graphene.UUID(required=True)
+        organization_id = graphene.UUID(required=True)
+        before_id = graphene.UUID(description="Task that will come right before the moved task.")
+        after_id = graphene.UUID(description="Task that will come right after the moved task.")
+
+    task = graphene.Field(TaskType)
+    success = graphene.Boolean()
+    error = graphene.String()
+
+    def mutate(self, info, task_id, organization_id, before_id=None, after_id=None):
+        if not info.context.user.is_authenticated:
+            return MoveTask(task=None, success=False, error="Authentication required")
+        try:
+            task = TaskService.move_task(
+                task_id=task_id,
+                organization_id=organization_id,
+                before_id=before_id,
+                after_id=after_id,
+            )
+            ResponseCache.invalidate(project_tag(task.project_id))
+            return MoveTask(task=task, success=True, error=None)
+        except (ValidationError, PermissionDenied) as e:
+            return MoveTask(task=None, success=False, error=str(e))
+
+
 class AddTaskComment(graphene.Mutation):
     """Add a comment to a task."""
     
@@ -179,12 +303,15 @@ class AddTaskComment(graphene.Mutation):
                 author_name=input.author_name or 'Anonymous',
                 author_email=input.author_email or ''
             )
+            ResponseCache.invalidate(project_tag(comment.task.project_id))
             return AddTaskComment(comment=comment, success=True, error=None)
         except (ValidationError, PermissionDenied) as e:
             return AddTaskComment(comment=None, success=False, error=str(e))
 
 
+from django.conf import settings
 from django.contrib.auth import authenticate, login, logout
+from core.session_tokens import SessionTokens
 from .types import UserType
 
 # Auth Mutations
@@ -236,6 +363,8 @@ class Login(graphene.Mutation):
                 return Login(success=False, error="User with this email not found")
 
         user = authenticate(username=username, password=password)
+        if user is not None and settings.SESSION_TOKENS_ENABLED:
+            return Login(success=True, session_key=SessionTokens.issue(user, info.context), user=user)
         if user is not None:
             login(info.context, user)
             if not info.context.session.session_key:
@@ -257,10 +386,19 @@ class Login(graphene.Mutation):
 
 
 class Logout(graphene.Mutation):
+    class Arguments:
+        everywhere = graphene.Boolean(description="Also end the user's other session tokens.")
+
     success = graphene.Boolean()
 
-    def mutate(self, info):
-        logout(info.context)
+    def mutate(self, info, everywhere=False):
+        request = info.context
+        if everywhere and request.user.is_authenticated:
+            SessionTokens.revoke_all(request.user.pk)
+        token = getattr(request, 'session_token', None)
+        if token:
+            SessionTokens.revoke(token)
+        logout(request)
         return Logout(success=True)
 
 
@@ -287,7 +425,7 @@ class JoinOrganization(graphene.Mutation):
             return JoinOrganization(organization=None, success=False, error="Invite has expired or already been used")
         
         # Check if already a member
-        if OrganizationMembership.objects.filter(user=info.context.user, organization=invite.organization).exists():
+        if MembershipCache.is_member(info.context.user, invite.organization_id):
             return JoinOrganization(organization=invite.organization, success=True, error=None)
         
         # Create membership
@@ -321,39 +459,105 @@ class InviteToOrganization(graphene.Mutation):
             return InviteToOrganization(invite_code=None, success=False, error="Authentication required")
         
         # Check if user is owner of the organization
-        try:
-            membership = OrganizationMembership.objects.get(
-                user=info.context.user,
-                organization_id=organization_id
-            )
-        except OrganizationMembership.DoesNotExist:
+        role = MembershipCache.role(info.context.user, organization_id)
+        if role is None:
             return InviteToOrganization(invite_code=None, success=False, error="Organization not found")
         
-        if membership.role != 'owner':
+        if role != 'owner':
             return InviteToOrganization(invite_code=None, success=False, error="Only organization owners can invite users")
         
-        # Create invite
+        # Create invite; the email is sent by the outbox worker
         from django.utils import timezone
         from datetime import timedelta
-        from services.email_service import EmailService
-        
+        from services.email_outbox import EmailOutbox
+
         invite = OrganizationInvite.objects.create(
             organization_id=organization_id,
             email=email,
             invited_by=info.context.user,
             expires_at=timezone.now() + timedelta(days=7)
         )
-        
-        # Send invite email (don't fail the mutation if email fails)
-        EmailService.send_organization_invite(
-            to_email=email,
-            organization_name=membership.organization.name,
-            invite_code=str(invite.invite_code),
-            invited_by_username=info.context.user.username
-        )
-        
+        EmailOutbox.enqueue_invite(invite)
+
         return InviteToOrganization(invite_code=str(invite.invite_code), success=True, error=None)
 
+
+class InviteManyToOrganization(graphene.Mutation):
+    """Invite many email addresses to an organization. Only owners can invite."""
+
+    class Arguments:
+        organization_id = graphene.UUID(required=True)
+        emails = graphene.List(graphene.NonNull(graphene.String), required=True)
+
+    results = graphene.List(BulkInviteResultType)
+    success = graphene.Boolean()
+    error = graphene.String()
+
+    def mutate(self, info, organization_id, emails):
+        if not info.context.user.is_authenticated:
+            return InviteManyToOrganization(results=None, success=False, error="Authentication required")
+
+        role = MembershipCache.role(info.context.user, organization_id)
+        if role is None:
+            return InviteManyToOrganization(results=None, success=False, error="Organization not found")
+        if role != 'owner':
+            return InviteManyToOrganization(
+                results=None, success=False, error="Only organization owners can invite users"
+            )
+
+        try:
+            results = OrganizationService.invite_many(organization_id, info.context.user, emails)
+        except ValidationError as e:
+            return InviteManyToOrganization(results=None, success=False, error=str(e))
+        return InviteManyToOrganization(
+            results=[
+                BulkInviteResultType(
+                    email=result.email,
+                    outcome=result.outcome,
+                    invite_code=str(result.invite.invite_code) if result.invite else None,
+                )
+                for result in results
+            ],
+            success=True,
+            error=None,
+        )
+
+class ImportData(graphene.Mutation):
+    """
+    Import projects, tasks and comments from an uploaded CSV or JSON Lines
+    file. Send the operation as multipart/form-data with the file in the
+    form field named by ``file``.
+    """
+
+    class Arguments:
+        organization_id = graphene.UUID(required=True)
+        file = graphene.String(default_value='file', description="Form field holding the upload.")
+        format = graphene.String(description="csv or jsonl; defaults to the file extension.")
+
+    result = graphene.Field(ImportResultType)
+    success = graphene.Boolean()
+    error = graphene.String()
+
+    def mutate(self, info, organization_id, file='file', format=None):
+        if not info.context.user.is_authenticated:
+            return ImportData(result=None, success=False, error="Authentication required")
+        if not MembershipCache.is_member(info.context.user, organization_id):
+            return ImportData(result=None, success=False, error="Organization not found")
+
+        upload = info.context.FILES.get(file)
+        if upload is None:
+            return ImportData(result=None, success=False, error=f"No file uploaded in field '{file}'")
+        format = format or ImportService.detect_format(upload.name)
+        if format is None:
+            return ImportData(result=None, success=False, error="Cannot tell the format from the file name")
+        try:
+            report = ImportService.import_file(organization_id, upload, format)
+        except ValidationError as e:
+            return ImportData(result=None, success=False, error=e.messages[0])
+        ResponseCache.invalidate(organization_projects_tag(organization_id))
+        return ImportData(result=report, success=True, error=None)
+
+
 class Mutation(graphene.ObjectType):
     """Root mutation type."""
     # Auth
@@ -366,7 +570,13 @@ class Mutation(graphene.ObjectType):
     update_project = UpdateProject.Field()
     create_task = CreateTask.Field()
     update_task = UpdateTask.Field()
+    bulk_create_tasks = BulkCreateTasks.Field()
+    bulk_update_tasks = BulkUpdateTasks.Field()
+    bulk_move_tasks = BulkMoveTasks.Field()
+    move_task = MoveTask.Field()
     create_organization = CreateOrganization.Field()
     join_organization = JoinOrganization.Field()
     invite_to_organization = InviteToOrganization.Field()
+    invite_many_to_organization = InviteManyToOrganization.Field()
+    import_data = ImportData.Field()
     add_task_comment = AddTaskComment.Field()
@@ -0,0 +1,142 @@
+"""
+Selection-set driven queryset optimizer.
+
+Turns the fields a client selected into ``.only()`` column lists,
+``select_related`` for forward relations and ``Prefetch`` objects for
+reverse relations, so a query fetches exactly what will be serialized.
+Large text columns such as ``description`` and ``content`` are only read
+when they were asked for.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from graphene.utils.str_converters import to_snake_case
+from graphql import FieldNode, FragmentSpreadNode, InlineFragmentNode, get_named_type
+
+from projects.models import Project
+
+
+# Columns needed by fields that are computed rather than read from a column.
+FIELD_DEPENDENCIES = {
+    'ProjectType.statistics': list(Project.TASK_COUNTER_FIELDS.values()),
+}
+
+
+class QueryPlan:
+    """Columns and relations to load for one model in a selection."""
+
+    def __init__(self, model):
+        self.model = model
+        self.only = {model._meta.pk.attname}
+        self.select = {}
+        self.prefetch = {}
+        # False when a selected field's column needs are unknown.
+        self.prune = True
+
+    def _only_paths(self, prefix=''):
+        paths = [prefix + name for name in self.only]
+        for name, plan in self.select.items():
+            paths += plan._only_paths(f'{prefix}{name}__')
+        return paths
+
+    def _select_paths(self, prefix=''):
+        paths = []
+        for name, plan in self.select.items():
+            paths.append(prefix + name)
+            paths += plan._select_paths(f'{prefix}{name}__')
+        return paths
+
+    def _prunable(self):
+        return self.prune and all(plan._prunable() for plan in self.select.values())
+
+    def _prefetches(self, prefix=''):
+        prefetches = []
+        for name, (plan, remote_field) in self.prefetch.items():
+            plan.only.add(remote_field)
+            prefetches.append(Prefetch(prefix + name, queryset=plan.apply(plan.model.objects.all())))
+        for name, plan in self.select.items():
+            prefetches += plan._prefetches(f'{prefix}{name}__')
+        return prefetches
+
+    def apply(self, queryset):
+        select_paths = self._select_paths()
+        if select_paths:
+            queryset = queryset.select_related(*select_paths)
+        prefetches = self._prefetches()
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+        if self._prunable():
+            queryset = queryset.only(*self._only_paths())
+        return queryset
+
+
+def _collect_fields(selection_set, fragments, fields=None):
+    """Flatten a selection set into {field name: [FieldNode, ...]}."""
+    fields = {} if fields is None else fields
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode):
+            fields.setdefault(selection.name.value, []).append(selection)
+        elif isinstance(selection, InlineFragmentNode):
+            _collect_fields(selection.selection_set, fragments, fields)
+        elif isinstance(selection, FragmentSpreadNode):
+            fragment = fragments.get(selection.name.value)
+            if fragment is not None:
+                _collect_fields(fragment.selection_set, fragments, fields)
+    return fields
+
+
+def _build_plan(model, graphql_type, field_nodes, fragments):
+    plan = QueryPlan(model)
+    fields = {}
+    for node in field_nodes:
+        if node.selection_set:
+            _collect_fields(node.selection_set, fragments, fields)
+
+    for name, nodes in fields.items():
+        if name.startswith('__'):
+            continue
+        dependencies = FIELD_DEPENDENCIES.get(f'{graphql_type.name}.{name}')
+        if dependencies is not None:
+            plan.only.update(dependencies)
+            continue
+        try:
+            model_field = model._meta.get_field(to_snake_case(name))
+        except FieldDoesNotExist:
+            plan.prune = False
+            continue
+
+        if not model_field.is_relation:
+            plan.only.add(model_field.attname)
+            continue
+
+        child_type = get_named_type(graphql_type.fields[name].type)
+        child_plan = _build_plan(model_field.related_model, child_type, nodes, fragments)
+        if model_field.concrete and (model_field.many_to_one or model_field.one_to_one):
+            plan.only.add(model_field.attname)
+            plan.select[model_field.name] = child_plan
+        elif model_field.one_to_many:
+            plan.prefetch[model_field.name] = (child_plan, model_field.field.attname)
+        else:
+            plan.prune = False
+    return plan
+
+
+def optimize_queryset(queryset, info):
+    """
+    Apply the column and relation needs of the current field's selection
+    set to ``queryset``.
+    """
+    plan = _build_plan(
+        queryset.model,
+        get_named_type(info.return_type),
+        info.field_nodes,
+        info.fragments,
+    )
+    return plan.apply(queryset)
+
+
+def get_prefetched(instance, relation):
+    """Return objects prefetched for ``relation``, or None if not prefetched."""
+    cache = getattr(instance, '_prefetched_objects_cache', {})
+    if relation in cache:
+        return list(cache[relation])
+    return None
@@ -0,0 +1,101 @@
+"""
+Automatic persisted queries (APQ).
+
+Clients send ``extensions.persistedQuery.sha256Hash`` instead of the full
+document. Unknown hashes are answered with ``PersistedQueryNotFound`` and the
+client retries once with the document, which is registered after it passes
+validation. With ``GRAPHQL_PERSISTED_QUERIES_ALLOWLIST_ONLY`` enabled only
+documents registered through ``register_persisted_queries`` are executed.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+KEY_PREFIX = 'graphql:pq:'
+
+
+class PersistedQueryError(Exception):
+    """A persisted query request that cannot be served."""
+
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.code = code
+
+
+def hash_query(query: str) -> str:
+    return hashlib.sha256(query.encode('utf-8')).hexdigest()
+
+
+class PersistedQueryRegistry:
+    """Hash -> document registry stored in the configured (Redis) cache."""
+
+    @staticmethod
+    def _cache():
+        return caches[settings.GRAPHQL_PERSISTED_QUERIES_CACHE]
+
+    @staticmethod
+    def get(sha256_hash: str):
+        """Return ``{'query': ..., 'allowlisted': bool}`` or None."""
+        return PersistedQueryRegistry._cache().get(KEY_PREFIX + sha256_hash)
+
+    @staticmethod
+    def register(query: str, allowlisted: bool = False) -> str:
+        """Store a document under its hash; allow-listed entries never expire."""
+        sha256_hash = hash_query(query)
+        timeout = None if allowlisted else settings.GRAPHQL_PERSISTED_QUERIES_TTL
+        PersistedQueryRegistry._cache().set(
+            KEY_PREFIX + sha256_hash,
+            {'query': query, 'allowlisted': allowlisted},
+            timeout,
+        )
+        return sha256_hash
+
+
+def get_request_extensions(request, data) -> dict:
+    """Read the ``extensions`` request parameter from GET or the body."""
+    extensions = request.GET.get('extensions') or data.get('extensions')
+    if isinstance(extensions, str):
+        try:
+            extensions = json.loads(extensions)
+        except ValueError:
+            raise PersistedQueryError("Extensions are invalid JSON.", 'BAD_REQUEST')
+    return extensions if isinstance(extensions, dict) else {}
+
+
+def resolve_persisted_query(query, extensions):
+    """
+    Resolve the document to execute.
+
+    Returns ``(query, hash_to_register, allowlisted)``; the hash is set when
+    the client sent a new document that should be registered once it
+    validates, and ``allowlisted`` when the document is allow-listed.
+    """
+    allowlist_only = settings.GRAPHQL_PERSISTED_QUERIES_ALLOWLIST_ONLY
+    persisted = extensions.get('persistedQuery')
+    if not persisted:
+        if allowlist_only:
+            raise PersistedQueryError("PersistedQueryRequired", 'PERSISTED_QUERY_REQUIRED')
+        return query, None, False
+
+    if persisted.get('version') != 1:
+        raise PersistedQueryError("Unsupported persisted query version", 'BAD_REQUEST')
+    sha256_hash = persisted.get('sha256Hash')
+    if not isinstance(sha256_hash, str):
+        raise PersistedQueryError("Missing sha256Hash", 'BAD_REQUEST')
+
+    entry = PersistedQueryRegistry.get(sha256_hash)
+    allowlisted = bool(entry and entry['allowlisted'])
+    if allowlist_only and not allowlisted:
+        raise PersistedQueryError("PersistedQueryNotAllowed", 'PERSISTED_QUERY_NOT_ALLOWED')
+
+    if not query:
+        if entry is None:
+            raise PersistedQueryError("PersistedQueryNotFound", 'PERSISTED_QUERY_NOT_FOUND')
+        return entry['query'], None, allowlisted
+
+    if hash_query(query) != sha256_hash:
+        raise PersistedQueryError("provided sha does not match query", 'BAD_REQUEST')
+    return query, (None if entry else sha256_hash), allowlisted
@@ -3,10 +3,20 @@ GraphQL queries for the project management system.
 """
 import graphene
 from uuid import UUID
+from asgiref.sync import sync_to_async
 
-from .types import ProjectType, TaskType, ProjectStatisticsType, OrganizationType, UserType
+from .types import (
+    ProjectType, TaskType, ProjectStatisticsType, OrganizationType, UserType,
+    ProjectConnection, TaskConnection, TaskCommentConnection, TaskSearchConnection,
+    TaskStatusEnum, TaskPriorityEnum, TaskSortEnum,
+)
+from .loaders import get_loaders
+from .optimizer import optimize_queryset
+from .response_cache import record_cache_tags, record_organization_projects_tags, project_tag
 from services.project_service import ProjectService
-from services.task_service import TaskService
+from services.search_service import SearchService
+from services.task_service import TaskFilters, TaskService
+from organizations.membership_cache import MembershipCache
 from organizations.models import Organization
 
 
@@ -28,6 +38,12 @@ class Query(graphene.ObjectType):
         ProjectType,
         organization_id=graphene.UUID(required=True)
     )
+    projects_connection = graphene.Field(
+        ProjectConnection,
+        organization_id=graphene.UUID(required=True),
+        first=graphene.Int(),
+        after=graphene.String()
+    )
     project = graphene.Field(
         ProjectType,
         id=graphene.UUID(required=True),
@@ -43,13 +59,43 @@ class Query(graphene.ObjectType):
     tasks = graphene.List(
         TaskType,
         project_id=graphene.UUID(required=True),
-        organization_id=graphene.UUID(required=True)
+        organization_id=graphene.UUID(required=True),
+        status=graphene.List(graphene.NonNull(TaskStatusEnum)),
+        priority=graphene.List(graphene.NonNull(TaskPriorityEnum)),
+        assignee_email=graphene.String(),
+        due_before=graphene.Date(),
+        due_after=graphene.Date(),
+        overdue=graphene.Boolean(description="Due before today and not done (false: the opposite)."),
+        sort_by=graphene.Argument(TaskSortEnum)
+    )
+    tasks_connection = graphene.Field(
+        TaskConnection,
+        project_id=graphene.UUID(required=True),
+        organization_id=graphene.UUID(required=True),
+        first=graphene.Int(),
+        after=graphene.String()
     )
     task = graphene.Field(
         TaskType,
         id=graphene.UUID(required=True),
         organization_id=graphene.UUID(required=True)
     )
+    comments_connection = graphene.Field(
+        TaskCommentConnection,
+        task_id=graphene.UUID(required=True),
+        organization_id=graphene.UUID(required=True),
+        first=graphene.Int(),
+        after=graphene.String()
+    )
+
+    # Search
+    search = graphene.Field(
+        TaskSearchConnection,
+        organization_id=graphene.UUID(required=True),
+        query=graphene.String(required=True),
+        first=graphene.Int(),
+        after=graphene.String()
+    )
 
     def resolve_me(self, info):
         user = info.context.user
@@ -60,14 +106,13 @@ class Query(graphene.ObjectType):
     def resolve_organizations(self, info):
         if not info.context.user.is_authenticated:
             return []
-        # Filter by user membership
         return Organization.objects.filter(
             is_active=True,
-            memberships__user=info.context.user
-        ).distinct()
+            id__in=list(MembershipCache.roles(info.context.user))
+        )
 
     def resolve_organization(self, info, id):
-        if not info.context.user.is_authenticated:
+        if not MembershipCache.is_member(info.context.user, id):
             return None
         try:
             return Organization.objects.get(id=id, is_active=True)
@@ -77,11 +122,23 @@ class Query(graphene.ObjectType):
     def resolve_projects(self, info, organization_id):
         if not info.context.user.is_authenticated:
             return []
-        return ProjectService.get_projects_for_organization(organization_id)
+        record_organization_projects_tags(info, organization_id)
+        return list(optimize_queryset(
+            ProjectService.get_projects_for_organization(organization_id), info
+        ))
+
+    def resolve_projects_connection(self, info, organization_id, first=None, after=None):
+        if not info.context.user.is_authenticated:
+            return None
+        record_organization_projects_tags(info, organization_id)
+        page = ProjectService.get_projects_page(organization_id, first=first, after=after)
+        get_loaders(info).tasks_by_project.prime(project.id for project in page.items)
+        return ProjectConnection.from_page(page)
 
     def resolve_project(self, info, id, organization_id):
         if not info.context.user.is_authenticated:
             return None
+        record_cache_tags(info, project_tag(id))
         try:
             return ProjectService.get_project(id, organization_id)
         except Exception:
@@ -90,16 +147,29 @@ class Query(graphene.ObjectType):
     def resolve_project_statistics(self, info, project_id, organization_id):
         if not info.context.user.is_authenticated:
             return None
+        record_cache_tags(info, project_tag(project_id))
         try:
             stats = ProjectService.get_project_statistics(project_id, organization_id)
             return ProjectStatisticsType(**stats)
         except Exception:
             return None
 
-    def resolve_tasks(self, info, project_id, organization_id):
+    def resolve_tasks(self, info, project_id, organization_id, sort_by=None, **filters):
         if not info.context.user.is_authenticated:
             return []
-        return TaskService.get_tasks_for_project(project_id, organization_id)
+        record_cache_tags(info, project_tag(project_id))
+        tasks = TaskService.get_tasks_for_project(
+            project_id, organization_id, TaskFilters(**filters), sort_by
+        )
+        return optimize_queryset(tasks, info)
+
+    def resolve_tasks_connection(self, info, project_id, organization_id, first=None, after=None):
+        if not info.context.user.is_authenticated:
+            return None
+        record_cache_tags(info, project_tag(project_id))
+        page = TaskService.get_tasks_page(project_id, organization_id, first=first, after=after)
+        get_loaders(info).comments_by_task.prime(task.id for task in page.items)
+        return TaskConnection.from_page(page)
 
     def resolve_task(self, info, id, organization_id):
         if not info.context.user.is_authenticated:
@@ -108,3 +178,131 @@ class Query(graphene.ObjectType):
             return TaskService.get_task(id, organization_id)
         except Exception:
             return None
+
+    def resolve_comments_connection(self, info, task_id, organization_id, first=None, after=None):
+        if not info.context.user.is_authenticated:
+            return None
+        page = TaskService.get_comments_page(task_id, organization_id, first=first, after=after)
+        return TaskCommentConnection.from_page(page)
+
+    def resolve_search(self, info, organization_id, query, first=None, after=None):
+        if not MembershipCache.is_member(info.context.user, organization_id):
+            return None
+        page = SearchService.search_tasks(organization_id, query, first=first, after=after)
+        get_loaders(info).comments_by_task.prime(task.id for task in page.items)
+        return TaskSearchConnection.from_page(page)
+
+
+async def _evaluate(queryset):
+    """Evaluate a queryset from async code."""
+    if queryset._prefetch_related_lookups:
+        # Django 4.2 cannot prefetch during async iteration.
+        return await sync_to_async(list)(queryset)
+    return [obj async for obj in queryset]
+
+
+class AsyncQuery(Query):
+    """
+    Root query type for the async view (see AsyncProjectHubGraphQLView).
+
+    Same fields and behaviour as ``Query``; root resolvers use the async ORM
+    so a worker can serve other requests while waiting for the database.
+    """
+
+    class Meta:
+        name = 'Query'
+
+    async def resolve_organizations(self, info):
+        if not info.context.user.is_authenticated:
+            return []
+        roles = await sync_to_async(MembershipCache.roles)(info.context.user)
+        return await _evaluate(Organization.objects.filter(is_active=True, id__in=list(roles)))
+
+    async def resolve_organization(self, info, id):
+        if not await sync_to_async(MembershipCache.is_member)(info.context.user, id):
+            return None
+        try:
+            return await Organization.objects.aget(id=id, is_active=True)
+        except Organization.DoesNotExist:
+            return None
+
+    async def resolve_projects(self, info, organization_id):
+        if not info.context.user.is_authenticated:
+            return []
+        await sync_to_async(record_organization_projects_tags)(info, organization_id)
+        return await _evaluate(optimize_queryset(
+            ProjectService.get_projects_for_organization(organization_id), info
+        ))
+
+    async def resolve_projects_connection(self, info, organization_id, first=None, after=None):
+        if not info.context.user.is_authenticated:
+            return None
+        await sync_to_async(record_organization_projects_tags)(info, organization_id)
+        page = await sync_to_async(ProjectService.get_projects_page)(
+            organization_id, first=first, after=after
+        )
+        get_loaders(info).tasks_by_project.prime(project.id for project in page.items)
+        return ProjectConnection.from_page(page)
+
+    async def resolve_project(self, info, id, organization_id):
+        if not info.context.user.is_authenticated:
+            return None
+        await sync_to_async(record_cache_tags)(info, project_tag(id))
+        try:
+            return await ProjectService.aget_project(id, organization_id)
+        except Exception:
+            return None
+
+    async def resolve_project_statistics(self, info, project_id, organization_id):
+        if not info.context.user.is_authenticated:
+            return None
+        await sync_to_async(record_cache_tags)(info, project_tag(project_id))
+        try:
+            stats = await ProjectService.aget_project_statistics(project_id, organization_id)
+            return ProjectStatisticsType(**stats)
+        except Exception:
+            return None
+
+    async def resolve_tasks(self, info, project_id, organization_id, sort_by=None, **filters):
+        if not info.context.user.is_authenticated:
+            return []
+        await sync_to_async(record_cache_tags)(info, project_tag(project_id))
+        tasks = await TaskService.aget_tasks_for_project(
+            project_id, organization_id, TaskFilters(**filters), sort_by
+        )
+        return await _evaluate(optimize_queryset(tasks, info))
+
+    async def resolve_tasks_connection(self, info, project_id, organization_id, first=None, after=None):
+        if not info.context.user.is_authenticated:
+            return None
+        await sync_to_async(record_cache_tags)(info, project_tag(project_id))
+        page = await sync_to_async(TaskService.get_tasks_page)(
+            project_id, organization_id, first=first, after=after
+        )
+        get_loaders(info).comments_by_task.prime(task.id for task in page.items)
+        return TaskConnection.from_page(page)
+
+    async def resolve_task(self, info, id, organization_id):
+        if not info.context.user.is_authenticated:
+            return None
+        try:
+            return await TaskService.aget_task(id, organization_id)
+        except Exception:
+            return None
+
+    async def resolve_comments_connection(self, info, task_id, organization_id, first=None, after=None):
+        if not info.context.user.is_authenticated:
+            return None
+        page = await sync_to_async(TaskService.get_comments_page)(
+            task_id, organization_id, first=first, after=after
+        )
+        return TaskCommentConnection.from_page(page)
+
+    async def resolve_search(self, info, organization_id, query, first=None, after=None):
+        if not await sync_to_async(MembershipCache.is_member)(info.context.user, organization_id):
+            return None
+        page = await sync_to_async(SearchService.search_tasks)(
+            organization_id, query, first=first, after=after
+        )
+        get_loaders(info).comments_by_task.prime(task.id for task in page.items)
+        return TaskSearchConnection.from_page(page)
@@ -0,0 +1,171 @@
+"""
+Opt-in response cache for read-only GraphQL operations.
+
+Entries are keyed by document, operation name, variables and the caller's
+organization, and tagged with what they touched: ``org:<id>:projects`` for
+an organization's project list and ``project:<id>`` for anything read from
+a project. Tags are versioned counters; an entry is only served while every
+tag still has the version it was stored with, so invalidating a tag is a
+single INCR regardless of how many entries carry it.
+
+Resolvers record a tag before reading the data it covers, and the tag's
+version is snapshotted right then. A mutation committing while the
+operation runs therefore leaves the stored entry already stale instead of
+labelling pre-mutation data with the post-mutation version.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from graphql import FieldNode, OperationType
+from graphql.execution.values import get_argument_values
+
+from organizations.membership_cache import MembershipCache
+from projects.models import Project
+
+
+KEY_PREFIX = 'graphql:response:'
+TAG_PREFIX = 'graphql:tag:'
+
+# Root fields whose results only depend on their arguments and on data
+# reachable through the tags their resolvers record.
+CACHEABLE_ROOT_FIELDS = {
+    'projects',
+    'projectsConnection',
+    'project',
+    'projectStatistics',
+    'tasks',
+    'tasksConnection',
+}
+
+
+def organization_projects_tag(organization_id):
+    return f'org:{organization_id}:projects'
+
+
+def project_tag(project_id):
+    return f'project:{project_id}'
+
+
+def record_cache_tags(info, *tags):
+    """
+    Record tags the current operation is about to read from. Call it before
+    reading: when the response will be cached, the current version of each
+    new tag is snapshotted.
+    """
+    context = info.context
+    recorded = getattr(context, 'cache_tags', None)
+    if recorded is None:
+        recorded = {}
+        setattr(context, 'cache_tags', recorded)
+    new_tags = [tag for tag in dict.fromkeys(tags) if tag not in recorded]
+    if not new_tags:
+        return
+    if getattr(context, 'response_cache_key', None):
+        recorded.update(ResponseCache._tag_versions(new_tags))
+    else:
+        recorded.update(dict.fromkeys(new_tags))
+
+
+def record_organization_projects_tags(info, organization_id):
+    """
+    Record the tags of an organization's project list before reading it.
+    Project rows carry counters changed under their project tag, so when the
+    response will be cached every project's tag is snapshotted up front.
+    """
+    tags = [organization_projects_tag(organization_id)]
+    if getattr(info.context, 'response_cache_key', None):
+        tags += [
+            project_tag(project_id)
+            for project_id in Project.objects.filter(organization_id=organization_id).values_list('id', flat=True)
+        ]
+    record_cache_tags(info, *tags)
+
+
+class ResponseCache:
+    """Tag-invalidated cache of GraphQL execution results."""
+
+    @staticmethod
+    def _cache():
+        return caches[settings.GRAPHQL_RESPONSE_CACHE]
+
+    @staticmethod
+    def cache_key(schema, operation_ast, query, operation_name, variables, user):
+        """
+        Return the cache key for an operation, or None if it is not
+        cacheable (disabled, anonymous caller, mutation, a root field
+        outside CACHEABLE_ROOT_FIELDS, or an organization the caller is not
+        a member of).
+        """
+        if not settings.GRAPHQL_RESPONSE_CACHE_ENABLED or not user.is_authenticated:
+            return None
+        if operation_ast is None or operation_ast.operation != OperationType.QUERY:
+            return None
+
+        organization_ids = set()
+        for selection in operation_ast.selection_set.selections:
+            if not isinstance(selection, FieldNode) or selection.name.value not in CACHEABLE_ROOT_FIELDS:
+                return None
+            field_def = schema.query_type.fields[selection.name.value]
+            arguments = get_argument_values(field_def, selection, variables)
+            organization_ids.add(str(arguments.get('organizationId') or arguments.get('organization_id')))
+
+        # Entries are shared by the members of an organization; nobody else
+        # may be served one.
+        if not all(MembershipCache.is_member(user, organization_id) for organization_id in organization_ids):
+            return None
+
+        payload = json.dumps(
+            [query, operation_name, variables or {}, sorted(organization_ids)],
+            sort_keys=True,
+            default=str,
+        )
+        return KEY_PREFIX + hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _tag_versions(tags):
+        cache = ResponseCache._cache()
+        keys = [TAG_PREFIX + tag for tag in tags]
+        versions = cache.get_many(keys)
+        # Seed unseen tags with a clock-based version so a tag that was
+        # evicted and re-created never matches versions stored before.
+        seed = time.time_ns()
+        missing = {key: seed for key in keys if key not in versions}
+        if missing:
+            cache.set_many(missing, None)
+            versions.update(missing)
+        return {tag: versions[TAG_PREFIX + tag] for tag in tags}
+
+    @staticmethod
+    def get(key):
+        """Return cached result data if every tag is still current."""
+        entry = ResponseCache._cache().get(key)
+        if entry is None:
+            return None
+        if ResponseCache._tag_versions(list(entry['tags'])) != entry['tags']:
+            return None
+        return entry['data']
+
+    @staticmethod
+    def set(key, data, tag_versions):
+        """Store ``data`` with the tag versions snapshotted before it was read."""
+        ResponseCache._cache().set(
+            key, {'data': data, 'tags': dict(tag_versions)}, settings.GRAPHQL_RESPONSE_CACHE_TTL
+        )
+
+    @staticmethod
+    def invalidate(*tags):
+        """Invalidate every entry carrying any of ``tags`` once the transaction commits."""
+        def bump():
+            cache = ResponseCache._cache()
+            for tag in tags:
+                try:
+                    cache.incr(TAG_PREFIX + tag)
+                except ValueError:
+                    # Never read yet: no entry can carry it.
+                    pass
+
+        transaction.on_commit(bump)
@@ -0,0 +1,10 @@
+"""
+WebSocket routes for the project management API.
+"""
+from django.urls import path
+
+from .consumers import GraphQLSubscriptionConsumer
+
+websocket_urlpatterns = [
+    path('graphql/', GraphQLSubscriptionConsumer.as_asgi()),
+]
@@ -2,8 +2,33 @@
 Root GraphQL schema.
 """
 import graphene
-from .queries import Query
+from graphql import specified_rules
+
+from .queries import AsyncQuery, Query
 from .mutations import Mutation
+from .subscriptions import Subscription
+from .cost import QueryCostRule
+from .incremental import directives
+
+
+schema = graphene.Schema(
+    query=Query, mutation=Mutation, subscription=Subscription, directives=directives
+)
+
+# Same schema with coroutine root resolvers, served by the async view.
+async_schema = graphene.Schema(
+    query=AsyncQuery, mutation=Mutation, subscription=Subscription, directives=directives
+)
+
+
+# The spec rules only depend on the document, so their result can be cached
+# per document (see api/document_cache.py).
+document_validation_rules = specified_rules
 
 
-schema = graphene.Schema(query=Query, mutation=Mutation)
+def get_request_validation_rules(variables=None, cost_report=None):
+    """
+    Validation rules that depend on the request and run on every execution:
+    query cost/depth analysis bound to the request variables.
+    """
+    return (QueryCostRule.bind(variables, cost_report),)
@@ -0,0 +1,113 @@
+"""
+Per-operation SQL diagnostics reported in response ``extensions``.
+
+Enabled by ``GRAPHQL_SQL_DIAGNOSTICS`` (on with ``DEBUG``). Every query run
+while an operation executes is attributed to the resolver that issued it
+(``ProjectType.statistics``, ``TaskType.comments``, ...) and fingerprinted
+with its parameters and ``IN`` lists collapsed. A fingerprint repeated more
+than ``GRAPHQL_SQL_N_PLUS_ONE_THRESHOLD`` times from one resolver is
+reported as a likely N+1::
+
+    "sqlDiagnostics": {
+      "queries": 14,
+      "timeMs": 3.2,
+      "duplicates": [{"sql": "SELECT ...", "count": 12, "fields": ["TaskType.comments"]}],
+      "nPlusOne": [{"field": "TaskType.comments", "sql": "SELECT ...", "count": 12}]
+    }
+"""
+import re
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+# Reported fingerprints are shortened to this many characters.
+MAX_SQL_LENGTH = 200
+
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*%s\s*,?)+\)', re.IGNORECASE)
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_WHITESPACE = re.compile(r'\s+')
+
+current_diagnostics = ContextVar('current_diagnostics', default=None)
+current_field = ContextVar('current_field', default=None)
+
+
+def fingerprint(sql: str) -> str:
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _LITERAL.sub('?', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class SQLDiagnostics:
+    """Queries executed by one operation, grouped by fingerprint and resolver."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.by_field = defaultdict(Counter)
+
+    def record(self, sql, duration, field):
+        key = fingerprint(sql)
+        self.count += 1
+        self.duration += duration
+        self.fingerprints[key] += 1
+        self.by_field[field][key] += 1
+
+    def report(self, threshold: int) -> dict:
+        duplicates = [
+            {
+                'sql': key[:MAX_SQL_LENGTH],
+                'count': count,
+                'fields': sorted(field or '(operation)' for field, keys in self.by_field.items() if key in keys),
+            }
+            for key, count in self.fingerprints.most_common()
+            if count > 1
+        ]
+        n_plus_one = [
+            {'field': field, 'sql': key[:MAX_SQL_LENGTH], 'count': count}
+            for field, keys in self.by_field.items()
+            if field is not None
+            for key, count in keys.items()
+            if count > threshold
+        ]
+        return {
+            'queries': self.count,
+            'timeMs': round(self.duration * 1000, 2),
+            'duplicates': duplicates,
+            'nPlusOne': sorted(n_plus_one, key=lambda entry: -entry['count']),
+        }
+
+
+def diagnostics_wrapper(execute, sql, params, many, context):
+    """Connection execute wrapper recording queries into the current diagnostics."""
+    diagnostics = current_diagnostics.get()
+    if diagnostics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        diagnostics.record(sql, time.perf_counter() - started, current_field.get())
+
+
+def install(connection):
+    """Install the wrapper on ``connection``; call from the thread that runs the queries."""
+    if diagnostics_wrapper not in connection.execute_wrappers:
+        # Outermost, so connection.execute_wrapper() blocks still pop their own.
+        connection.execute_wrappers.insert(0, diagnostics_wrapper)
+
+
+@contextmanager
+def collect(diagnostics):
+    """Record the enclosed queries into ``diagnostics`` (a no-op for None)."""
+    if diagnostics is None:
+        yield
+        return
+    token = current_diagnostics.set(diagnostics)
+    try:
+        yield
+    finally:
+        current_diagnostics.reset(token)
+
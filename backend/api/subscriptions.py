@@ -0,0 +1,65 @@
+"""
+GraphQL subscriptions for the project management system.
+
+Each field streams changes of one project as they are committed, so boards
+can apply deltas instead of refetching their lists. Served over WebSockets
+by api/consumers.py.
+"""
+import graphene
+from asgiref.sync import sync_to_async
+from django.core.exceptions import PermissionDenied
+
+from .types import TaskType, TaskCommentAddedType
+from organizations.membership_cache import MembershipCache
+from services.task_event_service import TaskEventService
+from services.task_service import TaskService
+
+
+async def _subscribe(info, project_id, organization_id, event):
+    if not info.context.user.is_authenticated:
+        raise PermissionDenied("Authentication required")
+    if not await sync_to_async(MembershipCache.is_member)(info.context.user, organization_id):
+        raise PermissionDenied("Not a member of this organization")
+    await TaskService._averify_project_access(project_id, organization_id)
+    return await TaskEventService.subscribe(project_id, event)
+
+
+class Subscription(graphene.ObjectType):
+    """Root subscription type."""
+
+    task_created = graphene.Field(
+        TaskType,
+        project_id=graphene.UUID(required=True),
+        organization_id=graphene.UUID(required=True)
+    )
+    task_updated = graphene.Field(
+        TaskType,
+        project_id=graphene.UUID(required=True),
+        organization_id=graphene.UUID(required=True)
+    )
+    task_removed = graphene.Field(
+        TaskType,
+        project_id=graphene.UUID(required=True),
+        organization_id=graphene.UUID(required=True),
+        description="A task moved out of the project.",
+    )
+    comment_added = graphene.Field(
+        TaskCommentAddedType,
+        project_id=graphene.UUID(required=True),
+        organization_id=graphene.UUID(required=True)
+    )
+
+    async def subscribe_task_created(root, info, project_id, organization_id):
+        return await _subscribe(info, project_id, organization_id, TaskEventService.TASK_CREATED)
+
+    async def subscribe_task_updated(root, info, project_id, organization_id):
+        return await _subscribe(info, project_id, organization_id, TaskEventService.TASK_UPDATED)
+
+    async def subscribe_task_removed(root, info, project_id, organization_id):
+        return await _subscribe(info, project_id, organization_id, TaskEventService.TASK_REMOVED)
+
+    async def subscribe_comment_added(root, info, project_id, organization_id):
+        return await _subscribe(info, project_id, organization_id, TaskEventService.COMMENT_ADDED)
+
+    def resolve_comment_added(root, info, **kwargs):
+        return TaskCommentAddedType(task_id=root.task_id, comment=root)
@@ -1,12 +1,46 @@
-from django.test import TestCase
-from django.contrib.auth.models import User
-from organizations.models import Organization
+from django.test import AsyncRequestFactory, TestCase, TransactionTestCase, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.contrib.auth.models import AnonymousUser, User
+from organizations.models import Organization, OrganizationInvite, OrganizationMembership
 from projects.models import Project
 from tasks.models import Task, TaskComment
-from core.constants import ProjectStatus, TaskStatus, TaskPriority
+from core.constants import EmailStatus, ProjectStatus, TaskStatus, TaskPriority
 from graphene.test import Client
 from api.schema import schema
+from api.views import AsyncProjectHubGraphQLView
+from api.consumers import GraphQLSubscriptionConsumer
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from api import document_cache
+from api.persisted_queries import PersistedQueryRegistry, hash_query
+from api.optimizer import optimize_queryset
+from api.response_cache import TAG_PREFIX, project_tag
+from api.sql_diagnostics import SQLDiagnostics
+from api.cost import statement_timeout
+from core import work_queue
+from core.ranking import rank_between, rank_sequence
+from services.email_outbox import EmailOutbox
+from services.import_service import ImportService
+from services.project_service import ProjectService
+from services.task_service import TaskFilters, TaskService
+import asyncio
 import json
+from datetime import date, timedelta
+import os
+import tempfile
+from io import StringIO
+from django.core import mail
+from django.core.management import CommandError, call_command
+from django.core.mail.backends import locmem
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.cache import caches
+from django.conf import settings
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.core.exceptions import ValidationError
+from types import SimpleNamespace
+from unittest import mock, skipUnless
+from prometheus_client import REGISTRY
 
 class ModelTests(TestCase):
     def setUp(self):
@@ -54,3 +88,1402 @@ class GraphQLTests(TestCase):
         executed = self.client.execute(query)
         # It should return null because we are not authenticated in this test client context
         self.assertIsNone(executed['data']['me'])
+
+
+class BatchLoaderTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='loader', password='password')
+        self.client = Client(schema)
+        self.org = Organization.objects.create(name="Loader Org", slug="loader-org")
+        for p in range(3):
+            project = Project.objects.create(organization=self.org, name=f"Project {p}")
+            for t in range(3):
+                task = Task.objects.create(project=project, title=f"Task {t}")
+                TaskComment.objects.create(task=task, content="Looks good")
+        ProjectService.reconcile_task_counters()
+
+    def test_nested_projects_query_is_batched(self):
+        query = '''
+            query($orgId: UUID!) {
+                projects(organizationId: $orgId) {
+                    name
+                    tasks { title comments { content } }
+                }
+            }
+        '''
+        # One query per level: projects, tasks, comments.
+        with self.assertNumQueries(3):
+            executed = self.client.execute(
+                query,
+                variables={'orgId': str(self.org.id)},
+                context_value=SimpleNamespace(user=self.user),
+            )
+        self.assertNotIn('errors', executed)
+        projects = executed['data']['projects']
+        self.assertEqual(len(projects), 3)
+        for project in projects:
+            self.assertEqual(len(project['tasks']), 3)
+            for task in project['tasks']:
+                self.assertEqual(task['comments'], [{'content': 'Looks good'}])
+
+    def test_project_statistics_read_counters(self):
+        project = Project.objects.filter(organization=self.org).first()
+        TaskService.update_task(
+            project.tasks.get(title="Task 0").id, self.org.id, status=TaskStatus.DONE
+        )
+        query = '''
+            query($orgId: UUID!) {
+                projects(organizationId: $orgId) {
+                    id
+                    statistics { totalTasks completedTasks pendingTasks completionPercentage }
+                }
+            }
+        '''
+        with self.assertNumQueries(1):
+            executed = self.client.execute(
+                query,
+                variables={'orgId': str(self.org.id)},
+                context_value=SimpleNamespace(user=self.user),
+            )
+        stats = {p['id']: p['statistics'] for p in executed['data']['projects']}
+        self.assertEqual(stats[str(project.id)], {
+            'totalTasks': 3, 'completedTasks': 1, 'pendingTasks': 2, 'completionPercentage': 33.3,
+        })
+
+
+    def test_only_selected_columns_are_loaded(self):
+        query = '''
+            query($orgId: UUID!) {
+                projects(organizationId: $orgId) {
+                    name
+                    tasks { title comments { authorName } }
+                }
+            }
+        '''
+        with CaptureQueriesContext(connection) as queries:
+            executed = self.client.execute(
+                query,
+                variables={'orgId': str(self.org.id)},
+                context_value=SimpleNamespace(user=self.user),
+            )
+        self.assertNotIn('errors', executed)
+        self.assertEqual(len(queries), 3)
+        for captured in queries:
+            self.assertNotIn('"description"', captured['sql'])
+            self.assertNotIn('"content"', captured['sql'])
+
+class TaskCounterTests(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name="Counter Org", slug="counter-org")
+        self.project = Project.objects.create(organization=self.org, name="Counters")
+
+    def test_service_keeps_counters_in_sync(self):
+        task = TaskService.create_task(self.project.id, self.org.id, title="Write docs")
+        TaskService.create_task(self.project.id, self.org.id, title="Ship it")
+        TaskService.update_task(task.id, self.org.id, status=TaskStatus.DONE)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.todo_task_count, 1)
+        self.assertEqual(self.project.done_task_count, 1)
+        self.assertEqual(self.project.completion_percentage, 50.0)
+
+    def test_reconcile_command_fixes_drift(self):
+        TaskService.create_task(self.project.id, self.org.id, title="Write docs")
+        Project.objects.filter(id=self.project.id).update(todo_task_count=7, done_task_count=2)
+        call_command('reconcile_task_counters', stdout=StringIO())
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.todo_task_count, self.project.done_task_count), (1, 0))
+
+    def test_deleted_tasks_leave_the_counters(self):
+        keep = TaskService.create_task(self.project.id, self.org.id, title="Keep")
+        gone = TaskService.create_task(self.project.id, self.org.id, title="Gone")
+        TaskService.update_task(keep.id, self.org.id, status=TaskStatus.DONE)
+        Task.objects.get(id=gone.id).delete()
+        self.assertEqual(
+            ProjectService.get_project_statistics(self.project.id, self.org.id)['total_tasks'], 1
+        )
+        Task.objects.filter(project=self.project).delete()
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.total_tasks, self.project.done_task_count), (0, 0))
+
+    def test_admin_edits_adjust_the_counters(self):
+        admin_user = User.objects.create_superuser(username='admin', password='password')
+        self.client.force_login(admin_user)
+        task = TaskService.create_task(self.project.id, self.org.id, title="Edited")
+        response = self.client.post(f'/admin/tasks/task/{task.id}/change/', {
+            'project': str(self.project.id), 'title': "Edited", 'description': '',
+            'status': TaskStatus.IN_REVIEW, 'priority': task.priority, 'assignee_email': '',
+            'due_date': '', 'rank': task.rank,
+            'comments-TOTAL_FORMS': 0, 'comments-INITIAL_FORMS': 0,
+        })
+        self.assertEqual(response.status_code, 302)
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.todo_task_count, self.project.in_review_task_count), (0, 1))
+
+    def test_reconcile_counts_each_batch_under_its_lock(self):
+        other = Project.objects.create(organization=self.org, name="Other")
+        TaskService.create_task(other.id, self.org.id, title="Elsewhere")
+        Project.objects.update(todo_task_count=5)
+        with CaptureQueriesContext(connection) as queries:
+            fixed = ProjectService.reconcile_task_counters(batch_size=1)
+        self.assertEqual(fixed, 2)
+        # The project ids, then a locking read and a count per batch.
+        reads = [q['sql'] for q in queries if q['sql'].startswith('SELECT')]
+        self.assertEqual(len(reads), 5)
+        self.assertEqual(
+            dict(Project.objects.values_list('name', 'todo_task_count')), {"Counters": 0, "Other": 1}
+        )
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='pager', password='password')
+        self.client = Client(schema)
+        self.org = Organization.objects.create(name="Pager Org", slug="pager-org")
+        self.project = Project.objects.create(organization=self.org, name="Paged")
+        # Equal ranks force the created_at/id tie-breakers to be used.
+        for i in range(5):
+            Task.objects.create(project=self.project, title=f"Task {i}", rank=f'c10{i // 2}')
+
+    def test_tasks_connection_walks_every_task_once(self):
+        query = '''
+            query($projectId: UUID!, $orgId: UUID!, $after: String) {
+                tasksConnection(projectId: $projectId, organizationId: $orgId, first: 2, after: $after) {
+                    totalCount
+                    pageInfo { hasNextPage endCursor }
+                    edges { node { title } }
+                }
+            }
+        '''
+        titles, after = [], None
+        while True:
+            executed = self.client.execute(
+                query,
+                variables={'projectId': str(self.project.id), 'orgId': str(self.org.id), 'after': after},
+                context_value=SimpleNamespace(user=self.user),
+            )
+            self.assertNotIn('errors', executed)
+            connection = executed['data']['tasksConnection']
+            self.assertEqual(connection['totalCount'], 5)
+            titles += [edge['node']['title'] for edge in connection['edges']]
+            if not connection['pageInfo']['hasNextPage']:
+                break
+            after = connection['pageInfo']['endCursor']
+
+        expected = [t.title for t in Task.objects.filter(project=self.project).order_by('rank', '-created_at', 'id')]
+        self.assertEqual(titles, expected)
+
+    def test_after_cursor_bounds_the_leading_column(self):
+        first_page = TaskService.get_tasks_page(self.project.id, self.org.id, first=2)
+        with CaptureQueriesContext(connection) as queries:
+            TaskService.get_tasks_page(self.project.id, self.org.id, first=2, after=first_page.end_cursor)
+        # A range start on rank, not only the OR-expanded comparison.
+        self.assertIn('"tasks_task"."rank" >= ', queries[-1]['sql'])
+
+    def test_invalid_cursor_is_rejected(self):
+        with self.assertRaises(ValidationError):
+            TaskService.get_tasks_page(self.project.id, self.org.id, after='not-a-cursor')
+
+
+class QueryCostTests(TestCase):
+    nested_query = '''
+        query Board($orgId: UUID!) {
+            projects(organizationId: $orgId) {
+                statistics { totalTasks }
+                tasks { title comments { content } }
+            }
+        }
+    '''
+
+    def post(self, query, variables=None):
+        return self.client.post(
+            '/graphql/',
+            json.dumps({'query': query, 'variables': variables or {}}),
+            content_type='application/json',
+        )
+
+    def test_cost_is_reported_in_extensions(self):
+        response = self.post('query { me { username } }')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['extensions']['cost'], {'requested': 2, 'depth': 2})
+
+    @override_settings(GRAPHQL_MAX_COST=100)
+    def test_over_budget_operation_is_rejected(self):
+        response = self.post(self.nested_query, {'orgId': '00000000-0000-0000-0000-000000000000'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('exceeds the maximum of 100', response.json()['errors'][0]['message'])
+        self.assertNotIn('data', response.json())
+
+    @override_settings(GRAPHQL_MAX_DEPTH=2)
+    def test_over_deep_operation_is_rejected(self):
+        response = self.post(self.nested_query, {'orgId': '00000000-0000-0000-0000-000000000000'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Query depth 4 exceeds', response.json()['errors'][0]['message'])
+
+
+class StatementTimeoutTransactionTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='timed', password='password')
+        self.client.force_login(self.user)
+        self.org = Organization.objects.create(name="Timed Org", slug="timed-org")
+        OrganizationMembership.objects.create(user=self.user, organization=self.org, role='owner')
+
+    def test_failing_mutation_field_keeps_earlier_fields_committed(self):
+        create_project = ProjectService.create_project
+        in_atomic_block = []
+
+        def create_or_fail(**kwargs):
+            in_atomic_block.append(connection.in_atomic_block)
+            if kwargs['name'] == "Broken":
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT * FROM no_such_table")
+            return create_project(**kwargs)
+
+        with mock.patch('api.mutations.ProjectService.create_project', side_effect=create_or_fail):
+            response = self.client.post('/graphql/', json.dumps({
+                'query': '''mutation($orgId: UUID!) {
+                    kept: createProject(organizationId: $orgId, input: {name: "Kept"}) { success }
+                    broken: createProject(organizationId: $orgId, input: {name: "Broken"}) { success }
+                }''',
+                'variables': {'orgId': str(self.org.id)},
+            }), content_type='application/json').json()
+
+        self.assertTrue(response['data']['kept']['success'])
+        self.assertIsNone(response['data']['broken'])
+        # Each field runs in autocommit, so the failure cannot roll back "Kept".
+        self.assertEqual(in_atomic_block, [False, False])
+        self.assertEqual(list(Project.objects.values_list('name', flat=True)), ["Kept"])
+
+
+class PersistedQueryTests(TestCase):
+    query = 'query Me { me { username } }'
+
+    def setUp(self):
+        caches['default'].clear()
+
+    def post(self, payload):
+        return self.client.post('/graphql/', json.dumps(payload), content_type='application/json')
+
+    def persisted(self, query=None):
+        payload = {'extensions': {'persistedQuery': {'version': 1, 'sha256Hash': hash_query(self.query)}}}
+        if query:
+            payload['query'] = query
+        return payload
+
+    def test_unknown_hash_then_register_then_hash_only(self):
+        response = self.post(self.persisted())
+        self.assertEqual(response.json()['errors'][0]['message'], 'PersistedQueryNotFound')
+
+        response = self.post(self.persisted(self.query))
+        self.assertEqual(response.json()['data'], {'me': None})
+
+        response = self.post(self.persisted())
+        self.assertEqual(response.json()['data'], {'me': None})
+
+    def test_hash_must_match_query(self):
+        payload = self.persisted('query { me { email } }')
+        response = self.post(payload)
+        self.assertEqual(response.json()['errors'][0]['extensions']['code'], 'BAD_REQUEST')
+
+    @override_settings(GRAPHQL_PERSISTED_QUERIES_ALLOWLIST_ONLY=True)
+    def test_allowlist_mode_only_runs_registered_queries(self):
+        self.assertEqual(
+            self.post({'query': self.query}).json()['errors'][0]['message'], 'PersistedQueryRequired'
+        )
+        self.assertEqual(
+            self.post(self.persisted(self.query)).json()['errors'][0]['message'], 'PersistedQueryNotAllowed'
+        )
+        PersistedQueryRegistry.register(self.query, allowlisted=True)
+        self.assertEqual(self.post(self.persisted()).json()['data'], {'me': None})
+
+
+class DocumentCacheTests(TestCase):
+    def setUp(self):
+        document_cache.documents.clear()
+        document_cache.introspection_results.clear()
+
+    def post(self, query):
+        return self.client.post('/graphql/', json.dumps({'query': query}), content_type='application/json')
+
+    def test_repeat_documents_hit_the_cache(self):
+        self.post('query { me { username } }')
+        self.post('query { me { username } }')
+        stats = document_cache.stats()['documents']
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_invalid_documents_are_cached_with_their_errors(self):
+        for _ in range(2):
+            response = self.post('query { nope }')
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(document_cache.stats()['documents']['hits'], 1)
+
+    def test_introspection_result_is_cached(self):
+        first = self.post('query { __schema { queryType { name } } }').json()
+        second = self.post('query { __schema { queryType { name } } }').json()
+        self.assertEqual(first['data'], second['data'])
+        self.assertEqual(document_cache.stats()['introspection']['hits'], 1)
+
+
+@override_settings(GRAPHQL_RESPONSE_CACHE_ENABLED=True)
+class ResponseCacheTests(TestCase):
+    projects_query = '''
+        query Projects($orgId: UUID!) {
+            projects(organizationId: $orgId) { name statistics { totalTasks } }
+        }
+    '''
+
+    def setUp(self):
+        caches['default'].clear()
+        self.user = User.objects.create_user(username='cached', password='password')
+        self.client.force_login(self.user)
+        self.org = Organization.objects.create(name="Cache Org", slug="cache-org")
+        OrganizationMembership.objects.create(user=self.user, organization=self.org, role='member')
+        self.project = Project.objects.create(organization=self.org, name="Cached")
+
+    def post(self, query, variables):
+        return self.client.post(
+            '/graphql/', json.dumps({'query': query, 'variables': variables}), content_type='application/json'
+        ).json()
+
+    def test_hit_until_a_mutation_invalidates_the_project(self):
+        variables = {'orgId': str(self.org.id)}
+        self.assertEqual(self.post(self.projects_query, variables)['extensions']['responseCache'], 'MISS')
+        hit = self.post(self.projects_query, variables)
+        self.assertEqual(hit['extensions']['responseCache'], 'HIT')
+        self.assertEqual(hit['data']['projects'][0]['statistics']['totalTasks'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post('''
+                mutation($projectId: UUID!, $orgId: UUID!) {
+                    createTask(projectId: $projectId, organizationId: $orgId, input: {title: "New"}) { success }
+                }
+            ''', {'projectId': str(self.project.id), 'orgId': str(self.org.id)})
+
+        fresh = self.post(self.projects_query, variables)
+        self.assertEqual(fresh['extensions']['responseCache'], 'MISS')
+        self.assertEqual(fresh['data']['projects'][0]['statistics']['totalTasks'], 1)
+
+    def test_changes_committed_during_execution_leave_the_entry_stale(self):
+        variables = {'orgId': str(self.org.id)}
+        original = optimize_queryset
+
+        def read_then_commit_a_change(queryset, info):
+            projects = list(original(queryset, info))
+            # A mutation commits after the rows were read, before the entry is stored.
+            caches['default'].incr(TAG_PREFIX + project_tag(self.project.id))
+            return projects
+
+        with mock.patch('api.queries.optimize_queryset', read_then_commit_a_change):
+            self.assertEqual(self.post(self.projects_query, variables)['extensions']['responseCache'], 'MISS')
+        self.assertEqual(self.post(self.projects_query, variables)['extensions']['responseCache'], 'MISS')
+        self.assertEqual(self.post(self.projects_query, variables)['extensions']['responseCache'], 'HIT')
+
+    def test_anonymous_callers_are_not_cached(self):
+        self.client.logout()
+        response = self.post(self.projects_query, {'orgId': str(self.org.id)})
+        self.assertNotIn('responseCache', response['extensions'])
+
+
+class MembershipCacheTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.user = User.objects.create_user(username='member', password='password')
+        self.client.force_login(self.user)
+        self.org = Organization.objects.create(name="Roles Org", slug="roles-org")
+        OrganizationMembership.objects.create(user=self.user, organization=self.org, role='owner')
+
+    def post(self, query, variables=None):
+        return self.client.post(
+            '/graphql/', json.dumps({'query': query, 'variables': variables or {}}), content_type='application/json'
+        ).json()
+
+    def test_roles_are_cached_and_invalidated_on_membership_changes(self):
+        self.post('{ organizations { name } }')
+        with CaptureQueriesContext(connection) as queries:
+            data = self.post('{ organizations { name } }')['data']
+        self.assertEqual(data['organizations'], [{'name': "Roles Org"}])
+        self.assertFalse([q for q in queries if 'organizations_organizationmembership' in q['sql']])
+
+        other = Organization.objects.create(name="Joined Org", slug="joined-org")
+        invite = OrganizationInvite.objects.create(
+            organization=other, email='member@example.com', invited_by=self.user,
+        )
+        joined = self.post(
+            'mutation($code: String!) { joinOrganization(inviteCode: $code) { success } }',
+            {'code': str(invite.invite_code)},
+        )
+        self.assertTrue(joined['data']['joinOrganization']['success'])
+        names = [org['name'] for org in self.post('{ organizations { name } }')['data']['organizations']]
+        self.assertEqual(names, ["Joined Org", "Roles Org"])
+
+    def test_non_members_are_not_served_cached_responses(self):
+        query = 'query($id: UUID!) { projects(organizationId: $id) { name } }'
+        with self.settings(GRAPHQL_RESPONSE_CACHE_ENABLED=True):
+            self.post(query, {'id': str(self.org.id)})
+            self.assertEqual(self.post(query, {'id': str(self.org.id)})['extensions']['responseCache'], 'HIT')
+
+            outsider = User.objects.create_user(username='outsider', password='password')
+            self.client.force_login(outsider)
+            response = self.post(query, {'id': str(self.org.id)})
+            self.assertNotIn('responseCache', response.get('extensions') or {})
+            self.assertIsNone(self.post(
+                'query($id: UUID!) { organization(id: $id) { name } }', {'id': str(self.org.id)}
+            )['data']['organization'])
+
+
+class BatchRequestTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='batcher', password='password')
+        self.client.force_login(self.user)
+        self.org = Organization.objects.create(name="Batch Org", slug="batch-org")
+        OrganizationMembership.objects.create(user=self.user, organization=self.org, role='owner')
+
+    def test_operations_run_in_order_with_isolated_failures(self):
+        response = self.client.post('/graphql/', json.dumps([
+            {'query': 'query Me { me { username } }'},
+            {'query': 'query Broken { nope }'},
+            {'query': 'query Orgs { organizations { name } }'},
+        ]), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        me, broken, orgs = response.json()
+        self.assertEqual(me['data'], {'me': {'username': 'batcher'}})
+        self.assertEqual(broken['status'], 400)
+        self.assertIn('errors', broken)
+        self.assertEqual(orgs['data'], {'organizations': [{'name': 'Batch Org'}]})
+
+    def test_entry_without_query_does_not_fail_the_batch(self):
+        response = self.client.post('/graphql/', json.dumps([
+            {'query': 'query Me { me { username } }'},
+            {'variables': {}},
+        ]), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[1]['status'], 400)
+
+    @override_settings(GRAPHQL_MAX_BATCH_SIZE=1)
+    def test_batch_size_is_limited(self):
+        response = self.client.post('/graphql/', json.dumps([
+            {'query': '{ me { username } }'}, {'query': '{ me { username } }'},
+        ]), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='async', password='password')
+        self.org = Organization.objects.create(name="Async Org", slug="async-org")
+        OrganizationMembership.objects.create(user=self.user, organization=self.org, role='owner')
+        for i in range(2):
+            project = Project.objects.create(organization=self.org, name=f"Project {i}")
+            task = TaskService.create_task(project.id, self.org.id, title=f"Task {i}")
+            TaskService.add_comment(task.id, self.org.id, content="Hi")
+        self.view = AsyncProjectHubGraphQLView.as_view()
+
+    async def post(self, query, variables=None):
+        request = AsyncRequestFactory().post(
+            '/graphql/', json.dumps({'query': query, 'variables': variables or {}}),
+            content_type='application/json'
+        )
+        request.user = self.user
+        response = await self.view(request)
+        return json.loads(response.content)
+
+    async def test_nested_query_batches_on_the_event_loop(self):
+        response = await self.post('''
+            query($orgId: UUID!) {
+                projectsConnection(organizationId: $orgId, first: 5) {
+                    totalCount
+                    edges { node { name tasks { title comments { content } } } }
+                }
+            }
+        ''', {'orgId': str(self.org.id)})
+        self.assertNotIn('errors', response)
+        connection_data = response['data']['projectsConnection']
+        self.assertEqual(connection_data['totalCount'], 2)
+        for edge in connection_data['edges']:
+            self.assertEqual(edge['node']['tasks'][0]['comments'], [{'content': 'Hi'}])
+
+    async def test_cache_tags_are_recorded_off_the_event_loop(self):
+        project = await Project.objects.filter(organization=self.org).afirst()
+        on_event_loop = []
+
+        def record(info, *tags):
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                on_event_loop.append(False)
+            else:
+                on_event_loop.append(True)
+
+        with mock.patch('api.queries.record_cache_tags', side_effect=record):
+            response = await self.post('''
+                query($id: UUID!, $orgId: UUID!) {
+                    project(id: $id, organizationId: $orgId) { name }
+                    projectStatistics(projectId: $id, organizationId: $orgId) { totalTasks }
+                    tasks(projectId: $id, organizationId: $orgId) { title }
+                    tasksConnection(projectId: $id, organizationId: $orgId) { totalCount }
+                }
+            ''', {'id': str(project.id), 'orgId': str(self.org.id)})
+        self.assertNotIn('errors', response)
+        self.assertEqual(on_event_loop, [False] * 4)
+
+    async def test_mutations_run_in_a_worker_thread(self):
+        response = await self.post('''
+            mutation($orgId: UUID!) {
+                createProject(organizationId: $orgId, input: {name: "Async"}) { success }
+            }
+        ''', {'orgId': str(self.org.id)})
+        self.assertTrue(response['data']['createProject']['success'])
+        self.assertEqual(await Project.objects.filter(name="Async").acount(), 1)
+
+
+class IncrementalDeliveryTests(TestCase):
+    project_query = '''
+        query($id: UUID!, $orgId: UUID!) {
+            project(id: $id, organizationId: $orgId) {
+                name
+                ... @defer(label: "stats") { statistics { totalTasks } }
+                tasks @stream(initialCount: 1) { title }
+            }
+        }
+    '''
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='deferred', password='password')
+        self.client.force_login(self.user)
+        self.org = Organization.objects.create(name="Defer Org", slug="defer-org")
+        OrganizationMembership.objects.create(user=self.user, organization=self.org, role='owner')
+        self.project = Project.objects.create(organization=self.org, name="Deferred")
+        for i in range(3):
+            TaskService.create_task(self.project.id, self.org.id, title=f"Task {i}")
+        self.variables = {'id': str(self.project.id), 'orgId': str(self.org.id)}
+
+    def post(self, accept):
+        return self.client.post(
+            '/graphql/', json.dumps({'query': self.project_query, 'variables': self.variables}),
+            content_type='application/json', HTTP_ACCEPT=accept,
+        )
+
+    @staticmethod
+    def parts(content):
+        return [
+            json.loads(part.split(b'\r\n\r\n', 1)[1])
+            for part in content.split(b'\r\n---') if b'\r\n\r\n' in part
+        ]
+
+    def test_multipart_response_delivers_deferred_and_streamed_fields_later(self):
+        response = self.post('multipart/mixed;deferSpec=20220824, application/json')
+        self.assertTrue(response['Content-Type'].startswith('multipart/mixed'))
+        initial, *subsequent = self.parts(b''.join(response.streaming_content))
+
+        self.assertTrue(initial['hasNext'])
+        self.assertEqual(initial['data']['project'], {'name': "Deferred", 'tasks': [{'title': "Task 0"}]})
+        self.assertFalse(subsequent[-1]['hasNext'])
+        incremental = [entry for part in subsequent for entry in part['incremental']]
+        self.assertIn({'data': {'statistics': {'totalTasks': 3}}, 'path': ['project'], 'label': 'stats'}, incremental)
+        self.assertIn({'items': [{'title': "Task 1"}, {'title': "Task 2"}], 'path': ['project', 'tasks', 1]}, incremental)
+
+    def test_directives_are_ignored_without_multipart_accept(self):
+        response = self.post('application/json').json()
+        self.assertNotIn('errors', response)
+        self.assertEqual(response['data']['project']['statistics'], {'totalTasks': 3})
+        self.assertEqual(len(response['data']['project']['tasks']), 3)
+
+
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+class SubscriptionTests(TestCase):
+    subscription = '''
+        subscription($projectId: UUID!, $orgId: UUID!) {
+            taskCreated(projectId: $projectId, organizationId: $orgId) { title status }
+        }
+    '''
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='subscriber', password='password')
+        self.org = Organization.objects.create(name="Live Org", slug="live-org")
+        OrganizationMembership.objects.create(user=self.user, organization=self.org, role='member')
+        self.project = Project.objects.create(organization=self.org, name="Live")
+
+    async def connect(self, user):
+        communicator = ApplicationCommunicator(GraphQLSubscriptionConsumer.as_asgi(), {
+            'type': 'websocket',
+            'path': '/graphql/',
+            'headers': [],
+            'subprotocols': ['graphql-transport-ws'],
+            'user': user,
+        })
+        await communicator.send_input({'type': 'websocket.connect'})
+        accept = await communicator.receive_output()
+        self.assertEqual(accept, {'type': 'websocket.accept', 'subprotocol': 'graphql-transport-ws'})
+        await self.send(communicator, {'type': 'connection_init'})
+        self.assertEqual(await self.receive(communicator), {'type': 'connection_ack'})
+        return communicator
+
+    async def send(self, communicator, message):
+        await communicator.send_input({'type': 'websocket.receive', 'text': json.dumps(message)})
+
+    async def receive(self, communicator):
+        return json.loads((await communicator.receive_output())['text'])
+
+    def create_task(self, title):
+        with self.captureOnCommitCallbacks(execute=True):
+            TaskService.create_task(self.project.id, self.org.id, title=title)
+
+    async def test_created_tasks_are_pushed_to_project_subscribers(self):
+        communicator = await self.connect(self.user)
+        await self.send(communicator, {'id': '1', 'type': 'subscribe', 'payload': {
+            'query': self.subscription,
+            'variables': {'projectId': str(self.project.id), 'orgId': str(self.org.id)},
+        }})
+        # Let the subscription join its group before publishing.
+        self.assertTrue(await communicator.receive_nothing())
+
+        await sync_to_async(self.create_task)("Pushed")
+        message = await self.receive(communicator)
+        self.assertEqual(message['type'], 'next')
+        self.assertEqual(message['payload']['data']['taskCreated'], {'title': 'Pushed', 'status': 'TODO'})
+
+        await self.send(communicator, {'id': '1', 'type': 'complete'})
+        await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await communicator.wait()
+
+    async def test_moved_tasks_are_removed_from_the_source_board(self):
+        communicator = await self.connect(self.user)
+        await self.send(communicator, {'id': '1', 'type': 'subscribe', 'payload': {
+            'query': '''
+                subscription($projectId: UUID!, $orgId: UUID!) {
+                    taskRemoved(projectId: $projectId, organizationId: $orgId) { id }
+                }
+            ''',
+            'variables': {'projectId': str(self.project.id), 'orgId': str(self.org.id)},
+        }})
+        self.assertTrue(await communicator.receive_nothing())
+
+        def move_task():
+            task = TaskService.create_task(self.project.id, self.org.id, title="Moving")
+            other = Project.objects.create(organization=self.org, name="Other")
+            with self.captureOnCommitCallbacks(execute=True):
+                TaskService.bulk_move_tasks([task.id], other.id, self.org.id)
+            return task
+
+        task = await sync_to_async(move_task)()
+        message = await self.receive(communicator)
+        self.assertEqual(message['payload']['data']['taskRemoved'], {'id': str(task.id)})
+
+        await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await communicator.wait()
+
+    async def assert_subscribe_rejected(self, user):
+        communicator = await self.connect(user)
+        await self.send(communicator, {'id': '1', 'type': 'subscribe', 'payload': {
+            'query': self.subscription,
+            'variables': {'projectId': str(self.project.id), 'orgId': str(self.org.id)},
+        }})
+        message = await self.receive(communicator)
+        self.assertEqual(message['type'], 'error')
+        await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await communicator.wait()
+
+    async def test_anonymous_subscribers_are_rejected(self):
+        await self.assert_subscribe_rejected(AnonymousUser())
+
+    async def test_non_members_are_rejected(self):
+        outsider = await sync_to_async(User.objects.create_user)(username='outsider', password='password')
+        await self.assert_subscribe_rejected(outsider)
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='metrics', password='password')
+        self.client.force_login(self.user)
+        self.org = Organization.objects.create(name="Metrics Org", slug="metrics-org")
+        OrganizationMembership.objects.create(user=self.user, organization=self.org, role='owner')
+        Project.objects.create(organization=self.org, name="Measured")
+
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    @override_settings(METRICS_FIELD_SAMPLE_RATE=1.0, METRICS_OPERATION_NAMES=['Measured'], METRICS_TOKEN='secret')
+    def test_operation_resolver_and_sql_metrics_are_exposed(self):
+        requests_before = self.sample('projecthub_graphql_request_duration_seconds_count', operation='Measured')
+        resolvers_before = self.sample(
+            'projecthub_graphql_resolver_duration_seconds_count', field='Query.projects'
+        )
+        queries_before = self.sample('projecthub_sql_queries_per_request_sum', operation='Measured')
+
+        response = self.client.post('/graphql/', json.dumps({
+            'query': 'query Measured($orgId: UUID!) { projects(organizationId: $orgId) { name tasks { title } } }',
+            'variables': {'orgId': str(self.org.id)},
+        }), content_type='application/json')
+        self.assertNotIn('errors', response.json())
+
+        self.assertEqual(
+            self.sample('projecthub_graphql_request_duration_seconds_count', operation='Measured'),
+            requests_before + 1,
+        )
+        self.assertEqual(
+            self.sample('projecthub_graphql_resolver_duration_seconds_count', field='Query.projects'),
+            resolvers_before + 1,
+        )
+        self.assertGreater(self.sample('projecthub_sql_queries_per_request_sum', operation='Measured'), queries_before)
+        # Scalar fields are never timed.
+        self.assertIsNone(REGISTRY.get_sample_value(
+            'projecthub_graphql_resolver_duration_seconds_count', {'field': 'ProjectType.name'}
+        ))
+
+        metrics = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(metrics.status_code, 200)
+        self.assertIn(b'projecthub_graphql_request_duration_seconds_bucket{le="0.005",operation="Measured"}', metrics.content)
+
+    def test_unknown_operation_names_are_grouped(self):
+        query = 'query Arbitrary%s($orgId: UUID!) { projects(organizationId: $orgId) { name } }'
+        allowlisted = query % 'Allowlisted'
+        PersistedQueryRegistry.register(allowlisted, allowlisted=True)
+        other_before = self.sample('projecthub_graphql_request_duration_seconds_count', operation='(other)')
+
+        for name in ('One', 'Two'):
+            self.client.post('/graphql/', json.dumps({
+                'query': query % name, 'variables': {'orgId': str(self.org.id)},
+            }), content_type='application/json')
+        self.client.post('/graphql/', json.dumps({
+            'query': allowlisted,
+            'variables': {'orgId': str(self.org.id)},
+            'extensions': {'persistedQuery': {'version': 1, 'sha256Hash': hash_query(allowlisted)}},
+        }), content_type='application/json')
+
+        self.assertEqual(
+            self.sample('projecthub_graphql_request_duration_seconds_count', operation='(other)'),
+            other_before + 2,
+        )
+        self.assertIsNone(REGISTRY.get_sample_value(
+            'projecthub_graphql_request_duration_seconds_count', {'operation': 'ArbitraryOne'}
+        ))
+        self.assertEqual(
+            self.sample('projecthub_graphql_request_duration_seconds_count', operation='ArbitraryAllowlisted'), 1
+        )
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_token_is_required_when_configured(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+
+    def test_metrics_are_closed_without_a_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        with self.settings(DEBUG=True):
+            self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+
+class SQLDiagnosticsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='sqldiag', password='password')
+        self.client.force_login(self.user)
+        self.org = Organization.objects.create(name="Diag Org", slug="diag-org")
+        OrganizationMembership.objects.create(user=self.user, organization=self.org, role='owner')
+        self.project = Project.objects.create(organization=self.org, name="Diagnosed")
+        for i in range(8):
+            task = TaskService.create_task(self.project.id, self.org.id, title=f"Task {i}")
+            TaskService.add_comment(task.id, self.org.id, content="Hi")
+
+    def test_batched_nested_query_reports_no_n_plus_one(self):
+        response = self.client.post('/graphql/', json.dumps({
+            'query': '''query($id: UUID!, $orgId: UUID!) {
+                project(id: $id, organizationId: $orgId) {
+                    name statistics { totalTasks } tasks { title comments { content } }
+                }
+            }''',
+            'variables': {'id': str(self.project.id), 'orgId': str(self.org.id)},
+        }), content_type='application/json').json()
+        report = response['extensions']['sqlDiagnostics']
+        self.assertGreater(report['queries'], 0)
+        self.assertLess(report['queries'], 8)
+        self.assertEqual(report['nPlusOne'], [])
+
+    def test_repeated_fingerprint_from_one_resolver_is_flagged(self):
+        diagnostics = SQLDiagnostics()
+        for task_id in range(6):
+            diagnostics.record(
+                f'SELECT * FROM "tasks_taskcomment" WHERE "task_id" = {task_id}', 0.001, 'TaskType.comments'
+            )
+        diagnostics.record('SELECT * FROM "tasks_task" WHERE "id" IN (%s, %s)', 0.001, 'ProjectType.tasks')
+
+        report = diagnostics.report(threshold=5)
+        self.assertEqual(report['queries'], 7)
+        self.assertEqual(report['nPlusOne'], [{
+            'field': 'TaskType.comments',
+            'sql': 'SELECT * FROM "tasks_taskcomment" WHERE "task_id" = ?',
+            'count': 6,
+        }])
+        self.assertEqual(report['duplicates'][0]['fields'], ['TaskType.comments'])
+
+
+class SyntheticDataTests(TestCase):
+    def test_generated_tenants_feed_the_benchmark_report(self):
+        call_command(
+            'generate_synthetic_data', orgs=2, projects=2, tasks=3, comments=2, members=3, stdout=StringIO()
+        )
+        self.assertEqual(Organization.objects.filter(slug__startswith='synthetic-').count(), 2)
+        self.assertEqual(Task.objects.filter(project__organization__slug='synthetic-0').count(), 6)
+        self.assertEqual(TaskComment.objects.count(), 24)
+        project = Project.objects.filter(organization__slug='synthetic-1').first()
+        self.assertEqual(project.total_tasks, 3)
+
+        with tempfile.NamedTemporaryFile(suffix='.json') as output:
+            call_command('benchmark_graphql', iterations=2, warmup=0, output=output.name, stdout=StringIO())
+            report = json.load(open(output.name))
+
+        self.assertEqual(
+            set(report['operations']),
+            {'organizations', 'projects', 'tasks', 'createTask', 'updateTask', 'addTaskComment'},
+        )
+        for name, result in report['operations'].items():
+            self.assertEqual(result['errors'], 0, name)
+            self.assertGreater(result['sqlQueries'], 0, name)
+        # Benchmark mutations are rolled back.
+        self.assertEqual(TaskComment.objects.count(), 24)
+
+
+class BulkTaskMutationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='bulk', password='password')
+        self.client.force_login(self.user)
+        self.org = Organization.objects.create(name="Bulk Org", slug="bulk-org")
+        self.other_org = Organization.objects.create(name="Other Org", slug="other-org")
+        self.project = Project.objects.create(organization=self.org, name="Backlog")
+        self.sprint = Project.objects.create(organization=self.org, name="Sprint")
+        self.foreign_task = TaskService.create_task(
+            Project.objects.create(organization=self.other_org, name="Foreign").id, self.other_org.id, title="Theirs"
+        )
+
+    def post(self, query, variables):
+        return self.client.post(
+            '/graphql/', json.dumps({'query': query, 'variables': variables}), content_type='application/json'
+        ).json()['data']
+
+    def test_bulk_create_reports_per_item_errors_in_one_transaction(self):
+        items = [{'title': f"Task {i}", 'status': 'DONE' if i % 2 else 'TODO'} for i in range(20)]
+        items.insert(3, {'title': "  "})
+        with CaptureQueriesContext(connection) as queries:
+            data = self.post('''
+                mutation($projectId: UUID!, $orgId: UUID!, $input: [TaskInput!]!) {
+                    bulkCreateTasks(projectId: $projectId, organizationId: $orgId, input: $input) {
+                        success results { error task { title rank } }
+                    }
+                }
+            ''', {'projectId': str(self.project.id), 'orgId': str(self.org.id), 'input': items})['bulkCreateTasks']
+
+        self.assertTrue(data['success'])
+        self.assertEqual(len(data['results']), 21)
+        self.assertEqual(data['results'][3], {'error': "Task title is required", 'task': None})
+        self.assertEqual(data['results'][4]['task'], {'title': "Task 3", 'rank': 'c103'})
+        self.assertLess(len(queries), 15)
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.todo_task_count, self.project.done_task_count), (10, 10))
+
+    def test_bulk_update_and_move_keep_counters_in_sync(self):
+        first, second = (TaskService.create_task(self.project.id, self.org.id, title=t) for t in ("A", "B"))
+        data = self.post('''
+            mutation($orgId: UUID!, $input: [TaskBulkUpdateInput!]!) {
+                bulkUpdateTasks(organizationId: $orgId, input: $input) { results { error task { status } } }
+            }
+        ''', {'orgId': str(self.org.id), 'input': [
+            {'id': str(first.id), 'status': 'DONE', 'priority': 'HIGH'},
+            {'id': str(self.foreign_task.id), 'status': 'DONE'},
+        ]})['bulkUpdateTasks']
+        self.assertEqual(data['results'][0], {'error': None, 'task': {'status': 'DONE'}})
+        self.assertEqual(data['results'][1], {'error': "Access denied to this task", 'task': None})
+
+        data = self.post('''
+            mutation($taskIds: [UUID!]!, $projectId: UUID!, $orgId: UUID!) {
+                bulkMoveTasks(taskIds: $taskIds, projectId: $projectId, organizationId: $orgId) {
+                    results { error task { rank } }
+                }
+            }
+        ''', {
+            'taskIds': [str(first.id), str(second.id)], 'projectId': str(self.sprint.id), 'orgId': str(self.org.id),
+        })['bulkMoveTasks']
+        self.assertEqual([r['task']['rank'] for r in data['results']], ['c100', 'c101'])
+
+        self.project.refresh_from_db()
+        self.sprint.refresh_from_db()
+        self.assertEqual(self.project.total_tasks, 0)
+        self.assertEqual((self.sprint.todo_task_count, self.sprint.done_task_count), (1, 1))
+        self.assertEqual(Task.objects.get(id=first.id).priority, 'HIGH')
+
+
+class TaskRankTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='ranker', password='password')
+        self.client.force_login(self.user)
+        self.org = Organization.objects.create(name="Rank Org", slug="rank-org")
+        self.project = Project.objects.create(organization=self.org, name="Board")
+        self.tasks = [TaskService.create_task(self.project.id, self.org.id, title=t) for t in "ABCD"]
+
+    def titles(self):
+        return list(Task.objects.filter(project=self.project).values_list('title', flat=True))
+
+    def test_rank_between_always_finds_a_key(self):
+        ranks = [rank_between(None, None)]
+        for i in range(300):
+            index = (i * 7) % (len(ranks) + 1)
+            before = ranks[index - 1] if index else None
+            after = ranks[index] if index < len(ranks) else None
+            ranks.insert(index, rank_between(before, after))
+        self.assertEqual(ranks, sorted(set(ranks)))
+        with self.assertRaises(ValueError):
+            rank_between('c101', 'c101')
+
+    def test_repeated_prepends_keep_decreasing(self):
+        ranks = [rank_sequence(1)[0]]
+        for _ in range(1500):
+            ranks.append(rank_between(None, ranks[-1]))
+        self.assertTrue(all(lower < higher for higher, lower in zip(ranks, ranks[1:])))
+
+    def test_move_task_writes_one_row(self):
+        a, b, c, d = self.tasks
+        with CaptureQueriesContext(connection) as queries:
+            data = self.client.post('/graphql/', json.dumps({
+                'query': '''
+                    mutation($taskId: UUID!, $orgId: UUID!, $beforeId: UUID) {
+                        moveTask(taskId: $taskId, organizationId: $orgId, beforeId: $beforeId) {
+                            success error task { rank }
+                        }
+                    }
+                ''',
+                'variables': {'taskId': str(d.id), 'orgId': str(self.org.id), 'beforeId': str(a.id)},
+            }), content_type='application/json').json()['data']['moveTask']
+
+        self.assertTrue(data['success'], data['error'])
+        self.assertEqual(self.titles(), ['A', 'D', 'B', 'C'])
+        writes = [q['sql'] for q in queries if q['sql'].startswith(('UPDATE', 'INSERT', 'DELETE'))]
+        self.assertEqual(len(writes), 1)
+        self.assertIn('"tasks_task"', writes[0])
+
+        TaskService.move_task(a.id, self.org.id, after_id=d.id)
+        TaskService.move_task(c.id, self.org.id, after_id=a.id)
+        self.assertEqual(self.titles(), ['C', 'A', 'D', 'B'])
+
+    def test_move_rejects_tasks_of_other_projects(self):
+        other = Project.objects.create(organization=self.org, name="Other")
+        stranger = TaskService.create_task(other.id, self.org.id, title="X")
+        with self.assertRaises(ValidationError):
+            TaskService.move_task(self.tasks[0].id, self.org.id, before_id=stranger.id)
+
+    def test_ties_and_long_keys_are_rebalanced(self):
+        a, b, c, d = self.tasks
+        # Repeatedly inserting right after A halves the same gap each time.
+        for i in range(200):
+            moving, anchor = (d, c) if i % 2 else (c, d)
+            TaskService.move_task(moving.id, self.org.id, before_id=a.id, after_id=anchor.id)
+        self.assertGreater(max(len(rank) for rank in Task.objects.values_list('rank', flat=True)), 32)
+
+        self.assertEqual(TaskService.rebalance_ranks(self.project.id), 3)
+        self.assertEqual(self.titles(), ['A', 'D', 'C', 'B'])
+        self.assertEqual(list(Task.objects.values_list('rank', flat=True)), ['c100', 'c101', 'c102', 'c103'])
+
+        # Concurrent appends can produce equal ranks (the newer task sorts
+        # first); moving between them still works.
+        Task.objects.filter(id__in=[c.id, d.id]).update(rank='c101')
+        TaskService.move_task(b.id, self.org.id, before_id=d.id, after_id=c.id)
+        self.assertEqual(self.titles(), ['A', 'D', 'B', 'C'])
+        self.assertEqual(len(set(Task.objects.values_list('rank', flat=True))), 4)
+
+
+    @override_settings(TASK_RANK_REBALANCE_LENGTH=255, TASK_RANK_MAX_LENGTH=12)
+    def test_keys_near_the_cap_rebalance_within_the_move(self):
+        a, b, c, d = self.tasks
+        # No background rebalance runs, as if its jobs were lost.
+        for i in range(200):
+            moving, anchor = (d, c) if i % 2 else (c, d)
+            TaskService.move_task(moving.id, self.org.id, before_id=a.id, after_id=anchor.id)
+            self.assertLessEqual(max(len(rank) for rank in Task.objects.values_list('rank', flat=True)), 12)
+        self.assertEqual(self.titles(), ['A', 'D', 'C', 'B'])
+
+
+class SearchTests(TestCase):
+    QUERY = '''
+        query($orgId: UUID!, $query: String!, $first: Int, $after: String) {
+            search(organizationId: $orgId, query: $query, first: $first, after: $after) {
+                totalCount
+                pageInfo { hasNextPage endCursor }
+                edges { node { titleHighlight task { title } comments { highlight comment { id } } } }
+            }
+        }
+    '''
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='searcher', password='password')
+        self.client.force_login(self.user)
+        self.org = Organization.objects.create(name="Search Org", slug="search-org")
+        OrganizationMembership.objects.create(user=self.user, organization=self.org, role='member')
+        project = Project.objects.create(organization=self.org, name="Site")
+        self.login_task = TaskService.create_task(project.id, self.org.id, title="Fix login redirect")
+        other = TaskService.create_task(project.id, self.org.id, title="Write docs")
+        TaskService.add_comment(other.id, self.org.id, content="Document the login flow", author_name="Ann")
+        TaskService.create_task(project.id, self.org.id, title="Unrelated")
+        foreign_org = Organization.objects.create(name="Foreign", slug="foreign")
+        foreign_project = Project.objects.create(organization=foreign_org, name="Theirs")
+        TaskService.create_task(foreign_project.id, foreign_org.id, title="Their login page")
+
+    def search(self, **variables):
+        response = self.client.post('/graphql/', json.dumps({
+            'query': self.QUERY, 'variables': {'orgId': str(self.org.id), **variables},
+        }), content_type='application/json').json()
+        self.assertNotIn('errors', response)
+        return response['data']['search']
+
+    def test_matches_titles_and_comments_within_the_organization(self):
+        result = self.search(query="login")
+        self.assertEqual(result['totalCount'], 2)
+        nodes = {edge['node']['task']['title']: edge['node'] for edge in result['edges']}
+        self.assertEqual(set(nodes), {"Fix login redirect", "Write docs"})
+        self.assertEqual(nodes["Fix login redirect"]['titleHighlight'], "Fix <mark>login</mark> redirect")
+        self.assertEqual(nodes["Write docs"]['comments'][0]['highlight'], "Document the <mark>login</mark> flow")
+
+    def test_highlights_escape_user_content(self):
+        TaskService.create_task(
+            self.login_task.project_id, self.org.id, title='<img src=x onerror=alert(1)> login & more'
+        )
+        result = self.search(query="onerror")
+        self.assertEqual(
+            result['edges'][0]['node']['titleHighlight'],
+            '&lt;img src=x <mark>onerror</mark>=alert(1)&gt; login &amp; more',
+        )
+
+    def test_results_are_paginated(self):
+        first = self.search(query="login", first=1)
+        self.assertTrue(first['pageInfo']['hasNextPage'])
+        second = self.search(query="login", first=1, after=first['pageInfo']['endCursor'])
+        self.assertFalse(second['pageInfo']['hasNextPage'])
+        titles = {page['edges'][0]['node']['task']['title'] for page in (first, second)}
+        self.assertEqual(len(titles), 2)
+
+    @skipUnless(connection.vendor == 'postgresql', "Ranked search needs Postgres")
+    def test_pagination_over_distinct_ranks_returns_every_match_once(self):
+        project = Project.objects.create(organization=self.org, name="Ranks")
+        for count in range(1, 6):
+            TaskService.create_task(
+                project.id, self.org.id, title=f"Deploy {count}", description=" ".join(["deploy"] * count)
+            )
+        titles, after = [], None
+        while True:
+            page = self.search(query="deploy", first=1, after=after)
+            titles += [edge['node']['task']['title'] for edge in page['edges']]
+            if not page['pageInfo']['hasNextPage']:
+                break
+            after = page['pageInfo']['endCursor']
+        self.assertEqual(titles, [f"Deploy {count}" for count in range(5, 0, -1)])
+
+    def test_search_vector_is_not_loaded_by_default(self):
+        comment = TaskComment.objects.create(task=Task.objects.first(), content="Looks good")
+        with CaptureQueriesContext(connection) as queries:
+            list(Task.objects.all())
+            list(TaskComment.objects.all())
+            TaskComment.objects.get(id=comment.id).task
+        self.assertEqual(len(queries), 4)
+        for query in queries:
+            self.assertNotIn('search_vector', query['sql'])
+
+    def test_non_members_cannot_search(self):
+        outsider = User.objects.create_user(username='outsider', password='password')
+        self.client.force_login(outsider)
+        self.assertIsNone(self.search(query="login"))
+
+    def test_empty_query_is_rejected(self):
+        response = self.client.post('/graphql/', json.dumps({
+            'query': self.QUERY, 'variables': {'orgId': str(self.org.id), 'query': "  "},
+        }), content_type='application/json').json()
+        self.assertEqual(response['errors'][0]['message'], "Search query is required")
+
+
+class TaskFilterTests(TestCase):
+    QUERY = '''
+        query($projectId: UUID!, $orgId: UUID!, $status: [TaskStatus!], $assignee: String,
+              $dueBefore: Date, $overdue: Boolean, $sortBy: TaskSort) {
+            tasks(projectId: $projectId, organizationId: $orgId, status: $status, assigneeEmail: $assignee,
+                  dueBefore: $dueBefore, overdue: $overdue, sortBy: $sortBy) { title }
+        }
+    '''
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='filterer', password='password')
+        self.client.force_login(self.user)
+        self.org = Organization.objects.create(name="Filter Org", slug="filter-org")
+        self.project = Project.objects.create(organization=self.org, name="Filtered")
+        today = date.today()
+        for title, status, priority, due, assignee in [
+            ("Late", 'TODO', 'LOW', today - timedelta(days=2), 'ann@example.com'),
+            ("Late but done", 'DONE', 'URGENT', today - timedelta(days=1), ''),
+            ("Soon", 'IN_PROGRESS', 'HIGH', today + timedelta(days=3), 'Ann@Example.com'),
+            ("Someday", 'TODO', 'MEDIUM', None, 'bob@example.com'),
+        ]:
+            TaskService.create_task(
+                self.project.id, self.org.id, title=title, status=status, priority=priority,
+                due_date=due, assignee_email=assignee,
+            )
+
+    def titles(self, **variables):
+        response = self.client.post('/graphql/', json.dumps({
+            'query': self.QUERY,
+            'variables': {'projectId': str(self.project.id), 'orgId': str(self.org.id), **variables},
+        }), content_type='application/json').json()
+        self.assertNotIn('errors', response)
+        return [task['title'] for task in response['data']['tasks']]
+
+    def test_filters_and_sorting(self):
+        self.assertEqual(self.titles(status=['TODO']), ["Late", "Someday"])
+        self.assertEqual(self.titles(assignee="ANN@example.com"), ["Late", "Soon"])
+        self.assertEqual(self.titles(overdue=True), ["Late"])
+        self.assertEqual(self.titles(dueBefore=str(date.today()), sortBy='DUE_DATE'), ["Late", "Late but done"])
+        self.assertEqual(self.titles(sortBy='PRIORITY'), ["Late but done", "Soon", "Someday", "Late"])
+        self.assertEqual(self.titles(sortBy='DUE_DATE')[-1], "Someday")
+
+    def test_filters_are_index_backed(self):
+        index_names = {tuple(index.fields): index.name for index in Task._meta.indexes}
+        cases = [
+            (TaskFilters(status=['TODO', 'IN_REVIEW']), index_names[('project', 'status')]),
+            (TaskFilters(priority=['HIGH']), index_names[('project', 'priority')]),
+            (TaskFilters(assignee_email='ann@example.com'), 'task_project_assignee_idx'),
+            (TaskFilters(due_before=date.today()), 'task_project_due_idx'),
+            (TaskFilters(due_after=date.today()), 'task_project_due_idx'),
+            (TaskFilters(overdue=True), 'task_project_open_due_idx'),
+        ]
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                # Tiny test tables are cheaper to scan; ask whether an index applies at all.
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+            for filters, index_name in cases:
+                queryset = TaskService.filter_tasks(Task.objects.filter(project=self.project), filters)
+                with self.subTest(filters=filters):
+                    self.assertIn(index_name, queryset.order_by().explain())
+
+
+@override_settings(SESSION_TOKENS_ENABLED=True)
+class SessionTokenTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.user = User.objects.create_user(username='tokened', password='password')
+
+    def post(self, query, token=None):
+        headers = {'HTTP_X_SESSION_ID': token} if token else {}
+        return self.client.post(
+            '/graphql/', json.dumps({'query': query}), content_type='application/json', **headers
+        ).json()['data']
+
+    def login(self):
+        data = self.post('mutation { login(username: "tokened", password: "password") { success sessionKey } }')
+        self.assertTrue(data['login']['success'])
+        return data['login']['sessionKey']
+
+    def test_authenticated_requests_skip_the_database(self):
+        token = self.login()
+        self.assertIn(':', token)
+        self.assertEqual(self.post('{ me { username } }', token)['me'], {'username': 'tokened'})
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.post('{ me { username } }', token)['me'], {'username': 'tokened'})
+        self.assertEqual(len(queries), 0)
+
+    def test_logout_and_password_change_revoke_tokens(self):
+        first, second = self.login(), self.login()
+        self.assertTrue(self.post('mutation { logout { success } }', first)['logout']['success'])
+        self.assertIsNone(self.post('{ me { username } }', first)['me'])
+        self.assertIsNotNone(self.post('{ me { username } }', second)['me'])
+
+        self.user.set_password('changed-password')
+        self.user.save()
+        self.assertIsNone(self.post('{ me { username } }', second)['me'])
+
+    def test_tokens_survive_secret_key_rotation(self):
+        token = self.login()
+        with self.settings(SECRET_KEY='rotated-secret-key', SECRET_KEY_FALLBACKS=[settings.SECRET_KEY]):
+            self.assertEqual(self.post('{ me { username } }', token)['me'], {'username': 'tokened'})
+        with self.settings(SECRET_KEY='rotated-secret-key', SECRET_KEY_FALLBACKS=[]):
+            self.assertIsNone(self.post('{ me { username } }', token)['me'])
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionRefusedError("SMTP server unavailable")
+
+
+class SessionCountingEmailBackend(locmem.EmailBackend):
+    sessions = 0
+
+    def open(self):
+        if not getattr(self, 'is_open', False):
+            self.is_open = True
+            SessionCountingEmailBackend.sessions += 1
+            return True
+        return False
+
+    def close(self):
+        self.is_open = False
+
+
+@override_settings(WORK_QUEUE_URL='', EMAIL_OUTBOX_RETRY_BASE_DELAY=0, EMAIL_OUTBOX_MAX_ATTEMPTS=3)
+class EmailOutboxTests(TestCase):
+    def setUp(self):
+        work_queue._queues.clear()
+        self.user = User.objects.create_user(username='owner', password='password')
+        self.client.force_login(self.user)
+        self.org = Organization.objects.create(name="Outbox Org", slug="outbox-org")
+        OrganizationMembership.objects.create(user=self.user, organization=self.org, role='owner')
+
+    def invite(self, email='new@example.com'):
+        with self.captureOnCommitCallbacks(execute=True):
+            data = self.client.post('/graphql/', json.dumps({
+                'query': 'mutation($id: UUID!, $email: String!) { '
+                         'inviteToOrganization(organizationId: $id, email: $email) { success inviteCode } }',
+                'variables': {'id': str(self.org.id), 'email': email},
+            }), content_type='application/json').json()['data']['inviteToOrganization']
+        self.assertTrue(data['success'])
+        return OrganizationInvite.objects.get(invite_code=data['inviteCode'])
+
+    def test_invite_email_is_queued_and_sent_by_the_worker(self):
+        invite = self.invite()
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(invite.email_status, EmailStatus.PENDING)
+
+        call_command('process_email_outbox', burst=True, concurrency=1, stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['new@example.com'])
+        self.assertIn(str(invite.invite_code), mail.outbox[0].body)
+        invite.refresh_from_db()
+        self.assertEqual(invite.email_status, EmailStatus.SENT)
+        self.assertIsNotNone(invite.email_sent_at)
+
+        # A duplicate delivery of the job is skipped.
+        EmailOutbox.queue().push({'kind': 'organization_invite', 'invite_ids': [str(invite.id)]})
+        call_command('process_email_outbox', burst=True, concurrency=1, stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_failed_sends_are_retried_then_marked_failed(self):
+        invite = self.invite()
+        with self.settings(EMAIL_BACKEND='api.tests.FailingEmailBackend'):
+            call_command('process_email_outbox', burst=True, concurrency=1, stdout=StringIO())
+        invite.refresh_from_db()
+        self.assertEqual(invite.email_status, EmailStatus.FAILED)
+        self.assertEqual(invite.email_attempts, 3)
+        self.assertIn("SMTP server unavailable", invite.email_error)
+        self.assertEqual(EmailOutbox.queue().pending(), (0, 0))
+
+        # Recovery re-queues invites that are still pending.
+        OrganizationInvite.objects.filter(id=invite.id).update(email_status=EmailStatus.RETRYING)
+        call_command('process_email_outbox', burst=True, recover=True, concurrency=1, stdout=StringIO())
+        invite.refresh_from_db()
+        self.assertEqual(invite.email_status, EmailStatus.SENT)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_invite_many_dedupes_and_sends_over_one_session(self):
+        member = User.objects.create_user(username='member', email='Member@example.com', password='password')
+        OrganizationMembership.objects.create(user=member, organization=self.org, role='member')
+        self.invite('pending@example.com')
+        mail.outbox = []
+        EmailOutbox.queue().pop(timeout=0)
+
+        emails = ['a@example.com', 'member@example.com', 'PENDING@example.com', 'not-an-email', 'b@example.com',
+                  'A@example.com']
+        with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+            data = self.client.post('/graphql/', json.dumps({
+                'query': 'mutation($id: UUID!, $emails: [String!]!) { '
+                         'inviteManyToOrganization(organizationId: $id, emails: $emails) '
+                         '{ success results { email outcome inviteCode } } }',
+                'variables': {'id': str(self.org.id), 'emails': emails},
+            }), content_type='application/json').json()['data']['inviteManyToOrganization']
+        self.assertTrue(data['success'])
+        self.assertEqual(
+            [result['outcome'] for result in data['results']],
+            ['INVITED', 'ALREADY_MEMBER', 'ALREADY_INVITED', 'INVALID_EMAIL', 'INVITED', 'DUPLICATE'],
+        )
+        self.assertEqual(len([q for q in queries if 'INSERT INTO "organizations_organizationinvite"' in q['sql']]), 1)
+        self.assertEqual(EmailOutbox.queue().pending(), (1, 0))
+
+        SessionCountingEmailBackend.sessions = 0
+        with self.settings(EMAIL_BACKEND='api.tests.SessionCountingEmailBackend'):
+            call_command('process_email_outbox', burst=True, concurrency=1, stdout=StringIO())
+        self.assertEqual(SessionCountingEmailBackend.sessions, 1)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['a@example.com', 'b@example.com'])
+        self.assertEqual(
+            OrganizationInvite.objects.filter(email_status=EmailStatus.SENT, email__endswith='@example.com').count(), 2
+        )
+
+
+class ImportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='importer', password='password')
+        self.client.force_login(self.user)
+        self.org = Organization.objects.create(name="Import Org", slug="import-org")
+        OrganizationMembership.objects.create(user=self.user, organization=self.org, role='owner')
+
+    def write(self, suffix, content):
+        f = tempfile.NamedTemporaryFile('w', suffix=suffix, delete=False)
+        self.addCleanup(os.remove, f.name)
+        with f:
+            f.write(content)
+        return f.name
+
+    def test_command_imports_jsonl_in_chunks(self):
+        records = [
+            {'type': 'project', 'key': 'P1', 'name': 'Migrated', 'status': 'active'},
+            {'type': 'task', 'key': 'T1', 'project': 'P1', 'title': 'First', 'status': 'In Progress'},
+            {'type': 'task', 'key': 'T2', 'project': 'P1', 'title': 'Second', 'priority': 'urgent',
+             'due_date': '2030-01-31'},
+            {'type': 'task', 'key': 'T3', 'project': 'P1', 'title': 'Bad', 'status': 'WONTFIX'},
+            {'type': 'task', 'key': 'T4', 'project': 'missing', 'title': 'Orphan'},
+            {'type': 'comment', 'task': 'T2', 'content': 'Imported comment', 'created_at': '2020-05-01T10:00:00'},
+        ]
+        path = self.write('.jsonl', '\n'.join(json.dumps(record) for record in records) + '\nnot json\n')
+        out, err = StringIO(), StringIO()
+        call_command('import_data', path, organization='import-org', chunk_size=3, stdout=out, stderr=err)
+
+        self.assertEqual(out.getvalue().count('Read '), 3)
+        self.assertIn('Imported 1 projects, 2 tasks, 1 comments', out.getvalue())
+        self.assertIn('Line 4: Invalid status: WONTFIX', err.getvalue())
+        self.assertIn('Line 5: Unknown project: missing', err.getvalue())
+        self.assertIn('Line 7: Invalid JSON', err.getvalue())
+
+        project = Project.objects.get(organization=self.org)
+        self.assertEqual(project.status, ProjectStatus.ACTIVE)
+        self.assertEqual((project.todo_task_count, project.in_progress_task_count), (1, 1))
+        tasks = list(Task.objects.filter(project=project).order_by('rank'))
+        self.assertEqual([task.title for task in tasks], ['First', 'Second'])
+        self.assertEqual((tasks[1].priority, tasks[1].due_date), (TaskPriority.URGENT, date(2030, 1, 31)))
+        comment = TaskComment.objects.get(task=tasks[1])
+        self.assertEqual((comment.author_name, comment.created_at.year), ('Anonymous', 2020))
+
+    def test_duplicate_keys_abort_the_import(self):
+        path = self.write('.csv', 'type,key,name\nproject,P1,One\nproject,P1,Two\n')
+        with self.assertRaisesMessage(CommandError, "Duplicate project key 'P1'"):
+            call_command('import_data', path, organization=str(self.org.id), stdout=StringIO())
+        self.assertFalse(Project.objects.filter(organization=self.org).exists())
+
+    def test_upload_mutation_imports_csv(self):
+        upload = SimpleUploadedFile('export.csv', (
+            'type,key,project,name,title,task,content\n'
+            'project,P1,,Uploaded,,,\n'
+            'task,T1,P1,,Upload task,,\n'
+            'comment,,,,,T1,Hello\n'
+        ).encode())
+        response = self.client.post('/graphql/', {
+            'query': 'mutation($id: UUID!) { importData(organizationId: $id) '
+                     '{ success error result { rows projects tasks comments errorCount } } }',
+            'variables': json.dumps({'id': str(self.org.id)}),
+            'file': upload,
+        })
+        data = response.json()['data']['importData']
+        self.assertTrue(data['success'], data['error'])
+        self.assertEqual(data['result'], {'rows': 3, 'projects': 1, 'tasks': 1, 'comments': 1, 'errorCount': 0})
+        self.assertEqual(Task.objects.get(title='Upload task').comments.get().content, 'Hello')
+
+    @skipUnless(connection.vendor == 'postgresql', "statement_timeout needs Postgres")
+    @override_settings(IMPORT_STATEMENT_TIMEOUT_MS=120000)
+    def test_import_replaces_the_operation_statement_timeout(self):
+        timeouts = []
+
+        def record_timeout(report):
+            with connection.cursor() as cursor:
+                cursor.execute("SHOW statement_timeout")
+                timeouts.append(cursor.fetchone()[0])
+
+        path = self.write('.csv', 'type,key,name\nproject,P1,One\n')
+        with statement_timeout(1), open(path, 'rb') as f:
+            ImportService.import_file(self.org.id, f, 'csv', progress=record_timeout)
+        self.assertEqual(timeouts, ['2min'])
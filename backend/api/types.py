@@ -7,7 +7,10 @@ from graphene_django import DjangoObjectType
 from organizations.models import Organization
 from projects.models import Project
 from tasks.models import Task, TaskComment
-from core.constants import TaskStatus, TaskPriority, ProjectStatus
+from core.constants import InviteOutcome, TaskStatus, TaskPriority, ProjectStatus, TaskSort
+from services.project_service import ProjectService
+from .loaders import get_loaders
+from .optimizer import get_prefetched
 
 
 from django.contrib.auth.models import User
@@ -16,6 +19,8 @@ from django.contrib.auth.models import User
 TaskStatusEnum = graphene.Enum.from_enum(TaskStatus)
 TaskPriorityEnum = graphene.Enum.from_enum(TaskPriority)
 ProjectStatusEnum = graphene.Enum.from_enum(ProjectStatus)
+TaskSortEnum = graphene.Enum.from_enum(TaskSort)
+InviteOutcomeEnum = graphene.Enum.from_enum(InviteOutcome)
 
 
 # Object Types
@@ -45,10 +50,81 @@ class TaskType(DjangoObjectType):
     class Meta:
         model = Task
         fields = ['id', 'title', 'description', 'status', 'priority', 'assignee_email', 'due_date', 
-                  'order', 'created_at', 'updated_at', 'comments']
+                  'rank', 'created_at', 'updated_at', 'comments']
 
     def resolve_comments(self, info):
-        return self.comments.all()
+        prefetched = get_prefetched(self, 'comments')
+        if prefetched is not None:
+            return prefetched
+        return get_loaders(info).comments_by_task.load(self.id)
+
+
+class TaskCommentAddedType(graphene.ObjectType):
+    """A comment added to a task, as delivered to subscribers."""
+    task_id = graphene.UUID()
+    comment = graphene.Field(TaskCommentType)
+
+
+class BulkTaskResultType(graphene.ObjectType):
+    """Result of one item of a bulk task mutation, in input order."""
+    task = graphene.Field(TaskType)
+    error = graphene.String()
+
+
+class BulkInviteResultType(graphene.ObjectType):
+    """Result for one address of a bulk invite, in input order."""
+    email = graphene.String()
+    outcome = graphene.Field(InviteOutcomeEnum)
+    invite_code = graphene.String()
+
+
+class ImportRowErrorType(graphene.ObjectType):
+    """A record skipped by an import."""
+    line = graphene.Int()
+    message = graphene.String()
+
+
+class ImportResultType(graphene.ObjectType):
+    """Summary of a bulk import (resolved from an ImportReport)."""
+    rows = graphene.Int()
+    projects = graphene.Int()
+    tasks = graphene.Int()
+    comments = graphene.Int()
+    error_count = graphene.Int()
+    errors = graphene.List(ImportRowErrorType, description="The first 100 errors, by line.")
+
+    def resolve_projects(self, info):
+        return self.imported['project']
+
+    def resolve_tasks(self, info):
+        return self.imported['task']
+
+    def resolve_comments(self, info):
+        return self.imported['comment']
+
+
+class CommentSearchHitType(graphene.ObjectType):
+    """A comment matching a search."""
+    comment = graphene.Field(TaskCommentType)
+    highlight = graphene.String(description="HTML-escaped content with matches wrapped in <mark>.")
+
+
+class TaskSearchResultType(graphene.ObjectType):
+    """A task matching a search (resolved from a task annotated by SearchService)."""
+    task = graphene.Field(TaskType)
+    rank = graphene.Float()
+    title_highlight = graphene.String(description="HTML-escaped title with matches wrapped in <mark>.")
+    description_highlight = graphene.String(description="Best matching description fragments, escaped likewise.")
+    comments = graphene.List(CommentSearchHitType, description="Best matching comments.")
+
+    def resolve_task(self, info):
+        return self
+
+    def resolve_rank(self, info):
+        return self.search_rank
+
+    def resolve_comments(self, info):
+        return self.comment_hits
 
 
 class ProjectStatisticsType(graphene.ObjectType):
@@ -70,17 +146,65 @@ class ProjectType(DjangoObjectType):
                   'created_at', 'updated_at', 'tasks', 'statistics']
 
     def resolve_tasks(self, info):
-        return self.tasks.all()
+        prefetched = get_prefetched(self, 'tasks')
+        if prefetched is not None:
+            return prefetched
+        return get_loaders(info).tasks_by_project.load(self.id)
 
     def resolve_statistics(self, info):
         return ProjectStatisticsType(
-            total_tasks=self.total_tasks,
-            completed_tasks=self.completed_tasks,
-            pending_tasks=self.total_tasks - self.completed_tasks,
-            completion_percentage=self.completion_percentage
+            **ProjectService.build_statistics(self.total_tasks, self.completed_tasks)
         )
 
 
+# Connections (keyset-paginated, Relay-style)
+class CountableConnection(graphene.relay.Connection):
+    """Connection built from a core.pagination.Page."""
+    total_count = graphene.Int(required=True)
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_page(cls, page):
+        connection = cls(
+            edges=[cls.Edge(node=item, cursor=page.cursor_for(item)) for item in page.items],
+            page_info=graphene.relay.PageInfo(
+                has_next_page=page.has_next_page,
+                has_previous_page=page.has_previous_page,
+                start_cursor=page.start_cursor,
+                end_cursor=page.end_cursor,
+            ),
+        )
+        connection.page = page
+        return connection
+
+    def resolve_total_count(self, info):
+        if get_loaders(info).is_async:
+            return self.page.atotal_count()
+        return self.page.total_count
+
+
+class ProjectConnection(CountableConnection):
+    class Meta:
+        node = ProjectType
+
+
+class TaskConnection(CountableConnection):
+    class Meta:
+        node = TaskType
+
+
+class TaskCommentConnection(CountableConnection):
+    class Meta:
+        node = TaskCommentType
+
+
+class TaskSearchConnection(CountableConnection):
+    class Meta:
+        node = TaskSearchResultType
+
+
 # Input Types
 class ProjectInput(graphene.InputObjectType):
     """Input type for creating/updating projects."""
@@ -105,3 +229,12 @@ class CommentInput(graphene.InputObjectType):
     content = graphene.String(required=True)
     author_name = graphene.String()
     author_email = graphene.String()
+
+
+class TaskBulkUpdateInput(graphene.InputObjectType):
+    """Input type for one task of a bulk update."""
+    id = graphene.UUID(required=True)
+    status = graphene.Argument(TaskStatusEnum)
+    priority = graphene.Argument(TaskPriorityEnum)
+    assignee_email = graphene.String()
+    due_date = graphene.Date()
@@ -0,0 +1,522 @@
+"""
+GraphQL HTTP view for the project management API.
+"""
+import json
+from inspect import isawaitable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.http import HttpResponse, HttpResponseNotAllowed, StreamingHttpResponse
+from django.http.response import HttpResponseBadRequest
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.settings import graphene_settings
+from graphene_django.utils.utils import set_rollback
+from graphene_django.views import GraphQLView, HttpError
+from graphql import (
+    ExecutionResult,
+    GraphQLError,
+    OperationType,
+    execute,
+    get_operation_ast,
+    validate,
+    validate_schema,
+)
+
+from core.metrics import operation_label, record_cache
+
+from . import document_cache, sql_diagnostics
+from .cost import astatement_timeout, statement_timeout
+from .incremental import (
+    MULTIPART_CONTENT_TYPE,
+    MULTIPART_END,
+    MULTIPART_START,
+    accepts_multipart,
+    build_execution_context,
+    has_incremental_directives,
+    multipart_part,
+)
+from .loaders import Loaders
+from .response_cache import ResponseCache
+from .sql_diagnostics import SQLDiagnostics
+from .persisted_queries import (
+    PersistedQueryError,
+    PersistedQueryRegistry,
+    get_request_extensions,
+    resolve_persisted_query,
+)
+from .schema import async_schema, get_request_validation_rules
+
+
+class PreparedOperation:
+    """A validated operation ready to execute, with its response metadata."""
+
+    def __init__(self, schema, document, operation_ast, variables, operation_name, cost):
+        self.schema = schema
+        self.document = document
+        self.operation_ast = operation_ast
+        self.variables = variables
+        self.operation_name = operation_name
+        self.cost = cost
+        self.extensions = {}
+        self.introspection_key = None
+        self.response_cache_key = None
+        self.sql_diagnostics = None
+        # Set for @defer/@stream operations answered with a multipart response.
+        self.incremental = False
+        self.execution_context = None
+        self.initial_result = None
+
+    @property
+    def is_mutation(self):
+        return (
+            self.operation_ast is not None
+            and self.operation_ast.operation == OperationType.MUTATION
+        )
+
+
+class ProjectHubGraphQLView(GraphQLView):
+    """
+    GraphQLView that attaches per-request state to the resolver context,
+    serves persisted queries and cached responses, enforces query cost
+    budgets and reports ``extensions`` in responses.
+
+    A JSON array body is executed as a batch: every operation shares the
+    request's session, user and loaders, and the response is an array in
+    the same order with per-operation ``status``.
+
+    Queries using ``@defer``/``@stream`` are answered with a multipart
+    response when the client accepts one (see api/incremental.py).
+    """
+
+    # Operation whose deferred payloads are still to be streamed.
+    incremental_operation = None
+
+    def dispatch(self, request, *args, **kwargs):
+        response = super().dispatch(request, *args, **kwargs)
+        if self.incremental_operation is not None:
+            return StreamingHttpResponse(
+                self._multipart_payloads(request), content_type=MULTIPART_CONTENT_TYPE
+            )
+        return response
+
+    def get_context(self, request):
+        # Loaders live for the whole HTTP request so batched operations share
+        # them; they are created here so results never leak between requests.
+        if getattr(request, 'loaders', None) is None:
+            request.loaders = Loaders()
+        request.cache_tags = {}
+        return request
+
+    def parse_body(self, request):
+        if self.get_content_type(request) == 'application/json':
+            try:
+                request_json = json.loads(request.body.decode('utf-8'))
+            except (TypeError, ValueError):
+                raise HttpError(HttpResponseBadRequest("POST body sent invalid JSON."))
+
+            if isinstance(request_json, list):
+                if not request_json:
+                    raise HttpError(HttpResponseBadRequest("Received an empty list in the batch request."))
+                if len(request_json) > settings.GRAPHQL_MAX_BATCH_SIZE:
+                    raise HttpError(HttpResponseBadRequest(
+                        f"Batch requests are limited to {settings.GRAPHQL_MAX_BATCH_SIZE} operations."
+                    ))
+                if not all(isinstance(entry, dict) for entry in request_json):
+                    raise HttpError(HttpResponseBadRequest("Every batch entry must be a JSON object."))
+                self.batch = True
+                return request_json
+            if not isinstance(request_json, dict):
+                raise HttpError(HttpResponseBadRequest("The received data is not a valid JSON query."))
+            return request_json
+        return super().parse_body(request)
+
+    def get_response(self, request, data, show_graphiql=False):
+        if not self.batch:
+            return self._get_operation_response(request, data, show_graphiql)
+
+        # Isolate failures per operation: an invalid entry reports its own
+        # errors and status while the batch as a whole still succeeds.
+        try:
+            result, _status_code = self._get_operation_response(request, data, show_graphiql)
+        except HttpError as e:
+            result = self._batch_error_response(request, data, e)
+        return result, 200
+
+    def _batch_error_response(self, request, data, error):
+        return self.json_encode(request, {
+            'errors': [self.format_error(error)],
+            'id': data.get('id'),
+            'status': error.response.status_code,
+        })
+
+    def _get_operation_response(self, request, data, show_graphiql=False):
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+
+        execution_result = self.execute_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+
+        if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+            set_rollback()
+        if execution_result and execution_result.errors:
+            set_rollback()
+
+        return self._format_response(request, execution_result, id, show_graphiql)
+
+    def _format_response(self, request, execution_result, id, show_graphiql=False):
+        if not execution_result:
+            return None, 200
+
+        response, status_code = self._response_data(execution_result)
+        if self.batch:
+            response['id'] = id
+            response['status'] = status_code
+        return self.json_encode(request, response, pretty=show_graphiql), status_code
+
+    def _response_data(self, execution_result):
+        status_code = 200
+        response = {}
+        if execution_result.errors:
+            response['errors'] = [self.format_error(e) for e in execution_result.errors]
+
+        if execution_result.errors and any(
+            not getattr(e, 'path', None) for e in execution_result.errors
+        ):
+            status_code = 400
+        else:
+            response['data'] = execution_result.data
+
+        if execution_result.extensions:
+            response['extensions'] = execution_result.extensions
+
+        return response, status_code
+
+    def _multipart_parts(self, request, initial_result):
+        """Return the encoded initial payload and a function encoding later ones."""
+        prepared = self.incremental_operation
+        response, _status_code = self._response_data(initial_result)
+        response['hasNext'] = True
+
+        def encode(entries):
+            for entry in entries:
+                if 'errors' in entry:
+                    entry['errors'] = [self.format_error(e) for e in entry['errors']]
+            return multipart_part(self.json_encode(request, {
+                'incremental': entries,
+                'hasNext': prepared.execution_context.has_next,
+            }).encode('utf-8'))
+
+        return multipart_part(self.json_encode(request, response).encode('utf-8')), encode
+
+    def _multipart_payloads(self, request):
+        prepared = self.incremental_operation
+        initial, encode = self._multipart_parts(request, prepared.initial_result)
+        yield MULTIPART_START
+        yield initial
+        while prepared.execution_context.has_next:
+            with statement_timeout(prepared.cost):
+                entries = prepared.execution_context.execute_pending()
+            yield encode(entries)
+        yield MULTIPART_END
+
+    def execute_graphql_request(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        prepared = self._prepare_operation(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+        if not isinstance(prepared, PreparedOperation):
+            return prepared
+        return self._finish_operation(request, prepared, self._execute_prepared(request, prepared))
+
+    def _prepare_operation(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        """
+        Resolve, parse and validate an operation.
+
+        Returns a PreparedOperation to execute, or the ExecutionResult (or
+        None for GraphiQL) to respond with when execution is not needed.
+        """
+        try:
+            query, hash_to_register, allowlisted = resolve_persisted_query(
+                query, get_request_extensions(request, data)
+            )
+        except PersistedQueryError as e:
+            return ExecutionResult(errors=[GraphQLError(str(e), extensions={'code': e.code})])
+
+        if not query:
+            if show_graphiql:
+                return None
+            raise HttpError(HttpResponseBadRequest("Must provide query string."))
+
+        schema = self.schema.graphql_schema
+
+        schema_validation_errors = validate_schema(schema)
+        if schema_validation_errors:
+            return ExecutionResult(data=None, errors=schema_validation_errors)
+
+        cached = document_cache.get_document(query)
+        if cached.document is None:
+            return ExecutionResult(errors=cached.errors)
+        document = cached.document
+
+        operation_ast = get_operation_ast(document, operation_name)
+
+        if (
+            request.method.lower() == 'get'
+            and operation_ast is not None
+            and operation_ast.operation != OperationType.QUERY
+        ):
+            if show_graphiql:
+                return None
+            raise HttpError(
+                HttpResponseNotAllowed(
+                    ['POST'],
+                    f"Can only perform a {operation_ast.operation.value} operation from a POST request.",
+                )
+            )
+
+        if cached.errors:
+            return ExecutionResult(data=None, errors=cached.errors)
+
+        if operation_ast is not None and operation_ast.operation == OperationType.SUBSCRIPTION:
+            return ExecutionResult(errors=[
+                GraphQLError("Subscriptions are only served over WebSocket (graphql-transport-ws).")
+            ])
+
+        cost_report = {}
+        validation_errors = validate(
+            schema,
+            document,
+            get_request_validation_rules(variables, cost_report),
+            graphene_settings.MAX_VALIDATION_ERRORS,
+        )
+        if validation_errors:
+            return ExecutionResult(data=None, errors=validation_errors)
+
+        if hash_to_register:
+            PersistedQueryRegistry.register(query)
+
+        operation_name_key = operation_ast.name.value if operation_ast and operation_ast.name else None
+        # Metrics label (see core.middleware.MetricsMiddleware).
+        request.graphql_operation = (
+            '(batch)' if self.batch else operation_label(operation_name_key, allowlisted)
+        )
+        cost, depth = cost_report.get(operation_name_key, (0, 0))
+        prepared = PreparedOperation(schema, document, operation_ast, variables, operation_name, cost)
+        prepared.extensions = {'cost': {'requested': cost, 'depth': depth}}
+
+        if operation_ast is not None and document_cache.is_introspection(operation_ast):
+            prepared.introspection_key = document_cache.introspection_key(query, operation_name, variables)
+            cached_result = document_cache.introspection_results.get(prepared.introspection_key)
+            record_cache('introspection', cached_result is not None)
+            if cached_result is not None:
+                return ExecutionResult(data=cached_result, extensions=prepared.extensions)
+
+        if settings.GRAPHQL_SQL_DIAGNOSTICS:
+            sql_diagnostics.install(connection)
+            prepared.sql_diagnostics = SQLDiagnostics()
+
+        prepared.incremental = (
+            not self.batch
+            and operation_ast is not None
+            and operation_ast.operation == OperationType.QUERY
+            and accepts_multipart(request)
+            and has_incremental_directives(document)
+        )
+        if prepared.incremental:
+            return prepared
+
+        prepared.response_cache_key = ResponseCache.cache_key(
+            schema, operation_ast, query, operation_name, variables, request.user
+        )
+        if prepared.response_cache_key:
+            cached_data = ResponseCache.get(prepared.response_cache_key)
+            record_cache('response', cached_data is not None)
+            prepared.extensions['responseCache'] = 'HIT' if cached_data is not None else 'MISS'
+            if cached_data is not None:
+                return ExecutionResult(data=cached_data, extensions=prepared.extensions)
+
+        return prepared
+
+    def _execute_options(self, request, prepared):
+        # Read by record_cache_tags to snapshot tag versions.
+        request.response_cache_key = prepared.response_cache_key
+        execute_options = {
+            'root_value': self.get_root_value(request),
+            'context_value': self.get_context(request),
+            'variable_values': prepared.variables,
+            'operation_name': prepared.operation_name,
+            'middleware': self.get_middleware(request),
+        }
+        if self.execution_context_class:
+            execute_options['execution_context_class'] = self.execution_context_class
+        return execute_options
+
+    def _execute_prepared(self, request, prepared):
+        try:
+            execute_options = self._execute_options(request, prepared)
+            with statement_timeout(prepared.cost), sql_diagnostics.collect(prepared.sql_diagnostics):
+                if prepared.is_mutation and (
+                    graphene_settings.ATOMIC_MUTATIONS is True
+                    or connection.settings_dict.get('ATOMIC_MUTATIONS', False) is True
+                ):
+                    with transaction.atomic():
+                        result = execute(prepared.schema, prepared.document, **execute_options)
+                        if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+                            transaction.set_rollback(True)
+                else:
+                    result = self._execute(prepared, execute_options)
+        except Exception as e:
+            result = ExecutionResult(errors=[e])
+        return result
+
+    def _execute(self, prepared, execute_options):
+        if not prepared.incremental:
+            return execute(prepared.schema, prepared.document, **execute_options)
+        context = build_execution_context(prepared.schema, prepared.document, **execute_options)
+        if isinstance(context, list):
+            return ExecutionResult(errors=context)
+        prepared.execution_context = context
+        return context.execute_initial()
+
+    def _finish_operation(self, request, prepared, result):
+        loaders = getattr(request, 'loaders', None)
+        if loaders and prepared.is_mutation:
+            # Later operations in the same batch must not see pre-mutation rows.
+            loaders.clear()
+
+        if prepared.introspection_key and not result.errors:
+            document_cache.introspection_results.set(prepared.introspection_key, result.data)
+        if prepared.response_cache_key and not result.errors:
+            ResponseCache.set(prepared.response_cache_key, result.data, request.cache_tags)
+
+        if prepared.sql_diagnostics is not None:
+            prepared.extensions['sqlDiagnostics'] = prepared.sql_diagnostics.report(
+                settings.GRAPHQL_SQL_N_PLUS_ONE_THRESHOLD
+            )
+        result.extensions = {**(result.extensions or {}), **prepared.extensions}
+        if prepared.execution_context and prepared.execution_context.has_next and result.data is not None:
+            prepared.initial_result = result
+            self.incremental_operation = prepared
+        return result
+
+
+class AsyncProjectHubGraphQLView(ProjectHubGraphQLView):
+    """
+    ProjectHubGraphQLView for ASGI deployments.
+
+    Queries execute ``async_schema`` on the event loop, so a worker keeps
+    serving other requests while one waits on the database. Mutations,
+    which need transactions, and the sync-only request preparation (session,
+    persisted query and response cache lookups) run in the request's
+    database thread through ``sync_to_async``.
+    """
+
+    def __init__(self, schema=None, **kwargs):
+        super().__init__(schema=schema or async_schema, **kwargs)
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # csrf_exempt() returns a sync wrapper in Django 4.2; mark it directly.
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            if request.method.lower() not in ('get', 'post'):
+                raise HttpError(
+                    HttpResponseNotAllowed(
+                        ['GET', 'POST'], "GraphQL only supports GET and POST requests."
+                    )
+                )
+
+            data = self.parse_body(request)
+            if self.graphiql and self.can_display_graphiql(request, data):
+                return await sync_to_async(super().dispatch)(request, *args, **kwargs)
+
+            # Load the session and user now; resolvers must not hit the
+            # database synchronously from the event loop.
+            await sync_to_async(lambda: request.user.is_authenticated)()
+
+            if self.batch:
+                responses = [await self.aget_response(request, entry) for entry in data]
+                result = '[{}]'.format(','.join(response[0] for response in responses))
+                status_code = 200
+            else:
+                result, status_code = await self.aget_response(request, data)
+                if self.incremental_operation is not None:
+                    return StreamingHttpResponse(
+                        self._amultipart_payloads(request), content_type=MULTIPART_CONTENT_TYPE
+                    )
+
+            return HttpResponse(status=status_code, content=result, content_type='application/json')
+
+        except HttpError as e:
+            response = e.response
+            response['Content-Type'] = 'application/json'
+            response.content = self.json_encode(request, {'errors': [self.format_error(e)]})
+            return response
+
+    # View.as_view() marks the view async when its method handlers are.
+    get = post = dispatch
+
+    async def aget_response(self, request, data):
+        try:
+            query, variables, operation_name, id = self.get_graphql_params(request, data)
+            execution_result = await self.aexecute_graphql_request(
+                request, data, query, variables, operation_name
+            )
+            return self._format_response(request, execution_result, id)
+        except HttpError as e:
+            if not self.batch:
+                raise
+            return self._batch_error_response(request, data, e), 200
+
+    async def aexecute_graphql_request(self, request, data, query, variables, operation_name):
+        prepared = await sync_to_async(self._prepare_operation)(
+            request, data, query, variables, operation_name
+        )
+        if not isinstance(prepared, PreparedOperation):
+            return prepared
+
+        loaders = self.get_context(request).loaders
+        if prepared.is_mutation:
+            loaders.is_async = False
+            result = await sync_to_async(self._execute_prepared)(request, prepared)
+        else:
+            loaders.is_async = True
+            try:
+                async with astatement_timeout(prepared.cost):
+                    with sql_diagnostics.collect(prepared.sql_diagnostics):
+                        result = self._execute(prepared, self._execute_options(request, prepared))
+                        if isawaitable(result):
+                            result = await result
+            except Exception as e:
+                result = ExecutionResult(errors=[e])
+            finally:
+                loaders.is_async = False
+
+        return await sync_to_async(self._finish_operation)(request, prepared, result)
+
+    async def _amultipart_payloads(self, request):
+        prepared = self.incremental_operation
+        initial, encode = self._multipart_parts(request, prepared.initial_result)
+        yield MULTIPART_START
+        yield initial
+        loaders = request.loaders
+        while prepared.execution_context.has_next:
+            loaders.is_async = True
+            try:
+                async with astatement_timeout(prepared.cost):
+                    entries = prepared.execution_context.execute_pending()
+                    if isawaitable(entries):
+                        entries = await entries
+            finally:
+                loaders.is_async = False
+            yield encode(entries)
+        yield MULTIPART_END
+
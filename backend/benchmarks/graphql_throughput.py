@@ -0,0 +1,102 @@
+"""
+Concurrent throughput benchmark for the GraphQL endpoint.
+
+Sends the same query from many client threads and reports requests per
+second and latency percentiles. Run it once against the WSGI entry point
+and once against the ASGI one, with the same number of workers:
+
+    uvicorn config.wsgi:application --interface wsgi --workers 2 --port 8001
+    uvicorn config.asgi:application --workers 2 --port 8002
+
+    python benchmarks/graphql_throughput.py --url http://localhost:8001/graphql/ \\
+        --session <session id> --variables '{"orgId": "<uuid>"}'
+    python benchmarks/graphql_throughput.py --url http://localhost:8002/graphql/ \\
+        --session <session id> --variables '{"orgId": "<uuid>"}'
+
+Only the standard library is used so it runs from any environment.
+"""
+import argparse
+import json
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+DEFAULT_QUERY = '''
+query Projects($orgId: UUID!) {
+  projectsConnection(organizationId: $orgId, first: 20) {
+    totalCount
+    edges { node { name statistics { totalTasks completedTasks } } }
+  }
+}
+'''
+
+
+def send(url, body, headers):
+    request = urllib.request.Request(url, data=body, headers=headers, method='POST')
+    started = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        payload = json.loads(response.read())
+    elapsed = time.perf_counter() - started
+    return elapsed, 'errors' not in payload
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run(url, query, variables, session, concurrency, requests):
+    body = json.dumps({'query': query, 'variables': variables}).encode('utf-8')
+    headers = {'Content-Type': 'application/json'}
+    if session:
+        headers['X-Session-ID'] = session
+
+    # Warm up connections, caches and lazy imports on the server.
+    for _ in range(min(concurrency, requests)):
+        send(url, body, headers)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: send(url, body, headers), range(requests)))
+    wall_time = time.perf_counter() - started
+
+    latencies = sorted(elapsed for elapsed, _ok in results)
+    return {
+        'url': url,
+        'concurrency': concurrency,
+        'requests': requests,
+        'errors': sum(1 for _elapsed, ok in results if not ok),
+        'requests_per_second': round(requests / wall_time, 1),
+        'latency_ms': {
+            'mean': round(statistics.mean(latencies) * 1000, 1),
+            'p50': round(percentile(latencies, 0.50) * 1000, 1),
+            'p95': round(percentile(latencies, 0.95) * 1000, 1),
+            'p99': round(percentile(latencies, 0.99) * 1000, 1),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--url', default='http://localhost:8000/graphql/')
+    parser.add_argument('--query', default=DEFAULT_QUERY, help='GraphQL document to send.')
+    parser.add_argument('--variables', default='{}', help='Variables as a JSON object.')
+    parser.add_argument('--session', help='Session id sent as X-Session-ID.')
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    report = run(
+        args.url,
+        args.query,
+        json.loads(args.variables),
+        args.session,
+        args.concurrency,
+        args.requests,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
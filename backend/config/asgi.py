@@ -0,0 +1,28 @@
+"""
+ASGI config for project management system.
+
+Serves GraphQL queries with the async view and subscriptions over
+WebSockets; run with e.g. ``uvicorn config.asgi:application --workers 4``.
+"""
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+os.environ.setdefault('GRAPHQL_ASYNC_VIEW', 'True')
+django_application = get_asgi_application()
+
+# Imported after the app registry is ready.
+from channels.auth import AuthMiddlewareStack  # noqa: E402
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from channels.security.websocket import OriginValidator  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+from api.routing import websocket_urlpatterns  # noqa: E402
+
+application = ProtocolTypeRouter({
+    'http': django_application,
+    'websocket': OriginValidator(
+        AuthMiddlewareStack(URLRouter(websocket_urlpatterns)),
+        settings.CORS_ALLOWED_ORIGINS,
+    ),
+})
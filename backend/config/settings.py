@@ -10,6 +10,8 @@ load_dotenv()
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = os.getenv('DJANGO_SECRET_KEY', 'dev-secret-key-change-in-production')
+# Previous secret keys, comma separated; signatures made with them stay valid
+SECRET_KEY_FALLBACKS = [key for key in os.getenv('DJANGO_SECRET_KEY_FALLBACKS', '').split(',') if key]
 
 DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
 
@@ -40,6 +42,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.SessionTokenMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -99,8 +102,71 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # GraphQL
 GRAPHENE = {
     'SCHEMA': 'api.schema.schema',
+    'MIDDLEWARE': [],
 }
 
+# Prometheus metrics served at /metrics (see core/metrics.py)
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+# Fraction of nested object field resolutions timed; root fields always are
+METRICS_FIELD_SAMPLE_RATE = float(os.getenv('METRICS_FIELD_SAMPLE_RATE', 0.05))
+# Scrapers must send "Authorization: Bearer <token>"; without a token
+# /metrics is only served with DEBUG on
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+# Operation names used as metric labels besides those of allow-listed
+# persisted queries; other names are recorded as "(other)"
+METRICS_OPERATION_NAMES = [name for name in os.getenv('METRICS_OPERATION_NAMES', '').split(',') if name]
+
+if METRICS_ENABLED:
+    MIDDLEWARE.insert(0, 'core.middleware.MetricsMiddleware')
+    GRAPHENE['MIDDLEWARE'].append('api.middleware.ResolverMetricsMiddleware')
+
+# Report SQL counts, duplicated queries and likely N+1 resolvers in response
+# extensions (see api/sql_diagnostics.py); meant for development and staging
+GRAPHQL_SQL_DIAGNOSTICS = os.getenv('GRAPHQL_SQL_DIAGNOSTICS', str(DEBUG)).lower() == 'true'
+GRAPHQL_SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv('GRAPHQL_SQL_N_PLUS_ONE_THRESHOLD', 5))
+
+if GRAPHQL_SQL_DIAGNOSTICS:
+    GRAPHENE['MIDDLEWARE'].append('api.middleware.SQLDiagnosticsMiddleware')
+
+# Task rank keys longer than this trigger a background rebalance of the project
+TASK_RANK_REBALANCE_LENGTH = int(os.getenv('TASK_RANK_REBALANCE_LENGTH', 32))
+# Moves producing longer keys rebalance synchronously first (Task.rank is 255 chars)
+TASK_RANK_MAX_LENGTH = int(os.getenv('TASK_RANK_MAX_LENGTH', 128))
+
+# Serve /graphql/ with the async view (set by config/asgi.py)
+GRAPHQL_ASYNC_VIEW = os.getenv('GRAPHQL_ASYNC_VIEW', 'False').lower() == 'true'
+
+# GraphQL query cost budgets (see api/cost.py)
+GRAPHQL_MAX_DEPTH = int(os.getenv('GRAPHQL_MAX_DEPTH', 8))
+GRAPHQL_MAX_COST = int(os.getenv('GRAPHQL_MAX_COST', 5000))
+GRAPHQL_DEFAULT_LIST_SIZE = int(os.getenv('GRAPHQL_DEFAULT_LIST_SIZE', 20))
+GRAPHQL_BASE_STATEMENT_TIMEOUT_MS = int(os.getenv('GRAPHQL_BASE_STATEMENT_TIMEOUT_MS', 1000))
+GRAPHQL_STATEMENT_TIMEOUT_MS_PER_COST = float(os.getenv('GRAPHQL_STATEMENT_TIMEOUT_MS_PER_COST', 2))
+GRAPHQL_MAX_STATEMENT_TIMEOUT_MS = int(os.getenv('GRAPHQL_MAX_STATEMENT_TIMEOUT_MS', 15000))
+
+# Maximum number of operations in one batched (JSON array) request
+GRAPHQL_MAX_BATCH_SIZE = int(os.getenv('GRAPHQL_MAX_BATCH_SIZE', 20))
+
+# Process-local caches of parsed/validated documents (see api/document_cache.py)
+GRAPHQL_DOCUMENT_CACHE_SIZE = int(os.getenv('GRAPHQL_DOCUMENT_CACHE_SIZE', 500))
+GRAPHQL_INTROSPECTION_CACHE_SIZE = int(os.getenv('GRAPHQL_INTROSPECTION_CACHE_SIZE', 20))
+
+# Response cache for read-only operations (see api/response_cache.py)
+GRAPHQL_RESPONSE_CACHE_ENABLED = os.getenv('GRAPHQL_RESPONSE_CACHE_ENABLED', 'False').lower() == 'true'
+GRAPHQL_RESPONSE_CACHE = 'default'
+GRAPHQL_RESPONSE_CACHE_TTL = int(os.getenv('GRAPHQL_RESPONSE_CACHE_TTL', 300))
+
+# Cached organization roles per user (see organizations/membership_cache.py)
+ORGANIZATION_ROLES_CACHE = 'default'
+ORGANIZATION_ROLES_CACHE_TTL = int(os.getenv('ORGANIZATION_ROLES_CACHE_TTL', 60 * 60))
+
+# Persisted queries (see api/persisted_queries.py)
+GRAPHQL_PERSISTED_QUERIES_CACHE = 'default'
+GRAPHQL_PERSISTED_QUERIES_TTL = int(os.getenv('GRAPHQL_PERSISTED_QUERIES_TTL', 60 * 60 * 24 * 30))
+GRAPHQL_PERSISTED_QUERIES_ALLOWLIST_ONLY = (
+    os.getenv('GRAPHQL_PERSISTED_QUERIES_ALLOWLIST_ONLY', 'False').lower() == 'true'
+)
+
 # Caching - Redis
 CACHES = {
     "default": {
@@ -112,11 +178,29 @@ CACHES = {
     }
 }
 
+# Channel layer for subscription fan-out (see services/task_event_service.py)
+CHANNEL_LAYERS = {
+    "default": {
+        "BACKEND": "channels_redis.pubsub.RedisPubSubChannelLayer",
+        "CONFIG": {
+            "hosts": [os.getenv('REDIS_URL', "redis://127.0.0.1:6379/1")],
+        },
+    }
+}
+
 # Sessions
 SESSION_ENGINE = "django.contrib.sessions.backends.cache"
 SESSION_CACHE_ALIAS = "default"
 SESSION_COOKIE_AGE = 86400  # 1 day
 
+# Stateless signed session tokens instead of server-side sessions (see core/session_tokens.py)
+SESSION_TOKENS_ENABLED = os.getenv('SESSION_TOKENS_ENABLED', 'False').lower() == 'true'
+SESSION_TOKEN_MAX_AGE = int(os.getenv('SESSION_TOKEN_MAX_AGE', SESSION_COOKIE_AGE))
+SESSION_TOKENS_CACHE = 'default'
+# Cached users for token authentication, in seconds (see core/user_cache.py)
+USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 300))
+USER_CACHE_LOCAL_TTL = int(os.getenv('USER_CACHE_LOCAL_TTL', 30))
+
 
 # CORS
 CORS_ALLOWED_ORIGINS = [
@@ -158,3 +242,19 @@ EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True').lower() == 'true'
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'ProjectHub <noreply@projecthub.com>')
+
+# Invite emails are sent by `manage.py process_email_outbox` (see services/email_outbox.py).
+# An empty WORK_QUEUE_URL keeps the queue in process memory (tests, single-process dev).
+WORK_QUEUE_URL = os.getenv('WORK_QUEUE_URL', os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/1'))
+# Worker threads, each holding one reusable SMTP connection
+EMAIL_OUTBOX_CONCURRENCY = int(os.getenv('EMAIL_OUTBOX_CONCURRENCY', 4))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 5))
+# Retry delay in seconds: base * 2 ** (attempt - 1), capped at the max
+EMAIL_OUTBOX_RETRY_BASE_DELAY = int(os.getenv('EMAIL_OUTBOX_RETRY_BASE_DELAY', 30))
+EMAIL_OUTBOX_RETRY_MAX_DELAY = int(os.getenv('EMAIL_OUTBOX_RETRY_MAX_DELAY', 3600))
+
+# Records validated and staged per chunk by the bulk import (see services/import_service.py)
+IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', 5000))
+# Postgres statement_timeout of each statement of a bulk import; replaces the
+# cost-based GraphQL timeout for the importData mutation (0 disables it)
+IMPORT_STATEMENT_TIMEOUT_MS = int(os.getenv('IMPORT_STATEMENT_TIMEOUT_MS', 300000))
@@ -1,12 +1,23 @@
 """
 URL configuration for project management system.
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path
 from django.views.decorators.csrf import csrf_exempt
-from graphene_django.views import GraphQLView
+
+from api.views import AsyncProjectHubGraphQLView, ProjectHubGraphQLView
+from core.metrics import metrics_view
+
+if settings.GRAPHQL_ASYNC_VIEW:
+    graphql_view = AsyncProjectHubGraphQLView.as_view(graphiql=True)
+else:
+    graphql_view = csrf_exempt(ProjectHubGraphQLView.as_view(graphiql=True))
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('graphql/', csrf_exempt(GraphQLView.as_view(graphiql=True))),
+    path('graphql/', graphql_view),
 ]
+
+if settings.METRICS_ENABLED:
+    urlpatterns.append(path('metrics', metrics_view, name='metrics'))
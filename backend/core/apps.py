@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.contrib.auth.models import User
+        from .user_cache import invalidate_user_cache
+        post_save.connect(invalidate_user_cache, sender=User)
+        post_delete.connect(invalidate_user_cache, sender=User)
+
+        if settings.METRICS_ENABLED:
+            from .metrics import install_sql_stats_wrapper
+            connection_created.connect(install_sql_stats_wrapper)
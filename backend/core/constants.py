@@ -27,3 +27,30 @@ class TaskPriority(models.TextChoices):
     MEDIUM = 'MEDIUM', 'Medium'
     HIGH = 'HIGH', 'High'
     URGENT = 'URGENT', 'Urgent'
+
+
+class EmailStatus(models.TextChoices):
+    """Delivery status of an outbox email."""
+    PENDING = 'PENDING', 'Pending'
+    RETRYING = 'RETRYING', 'Retrying'
+    SENT = 'SENT', 'Sent'
+    FAILED = 'FAILED', 'Failed'
+
+
+class InviteOutcome(models.TextChoices):
+    """Per-address result of a bulk organization invite."""
+    INVITED = 'INVITED', 'Invited'
+    ALREADY_MEMBER = 'ALREADY_MEMBER', 'Already a member'
+    ALREADY_INVITED = 'ALREADY_INVITED', 'Already has an open invite'
+    DUPLICATE = 'DUPLICATE', 'Listed more than once'
+    INVALID_EMAIL = 'INVALID_EMAIL', 'Invalid email address'
+
+
+class TaskSort(models.TextChoices):
+    """Orderings offered by the tasks query."""
+    RANK = 'RANK', 'Board order'
+    DUE_DATE = 'DUE_DATE', 'Due date, earliest first'
+    PRIORITY = 'PRIORITY', 'Priority, most urgent first'
+    CREATED_AT = 'CREATED_AT', 'Newest first'
+    UPDATED_AT = 'UPDATED_AT', 'Recently updated first'
+    TITLE = 'TITLE', 'Title'
@@ -0,0 +1,228 @@
+"""
+Benchmark GraphQL operations against generated data.
+"""
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from organizations.models import Organization, OrganizationMembership
+from projects.models import Project
+from tasks.models import Task, TaskComment
+
+
+ORGANIZATIONS_QUERY = '''
+query BenchOrganizations {
+  organizations { id name slug }
+}
+'''
+
+PROJECTS_QUERY = '''
+query BenchProjects($organizationId: UUID!) {
+  projects(organizationId: $organizationId) {
+    id name status
+    statistics { totalTasks completedTasks completionPercentage }
+  }
+}
+'''
+
+TASKS_QUERY = '''
+query BenchTasks($projectId: UUID!, $organizationId: UUID!) {
+  tasks(projectId: $projectId, organizationId: $organizationId) {
+    id title status priority
+    comments { id content authorName }
+  }
+}
+'''
+
+CREATE_TASK = '''
+mutation BenchCreateTask($projectId: UUID!, $organizationId: UUID!) {
+  createTask(projectId: $projectId, organizationId: $organizationId, input: {title: "Benchmark task"}) {
+    success error task { id }
+  }
+}
+'''
+
+UPDATE_TASK = '''
+mutation BenchUpdateTask($id: UUID!, $organizationId: UUID!, $status: TaskStatus) {
+  updateTask(id: $id, organizationId: $organizationId, input: {status: $status}) {
+    success error task { id status }
+  }
+}
+'''
+
+ADD_COMMENT = '''
+mutation BenchAddComment($taskId: UUID!, $organizationId: UUID!) {
+  addTaskComment(taskId: $taskId, organizationId: $organizationId, input: {content: "Benchmark comment"}) {
+    success error comment { id }
+  }
+}
+'''
+
+STATUSES = ['TODO', 'IN_PROGRESS', 'IN_REVIEW', 'DONE']
+
+
+def operations(organization, project, task):
+    """Return ``{name: (query, variables for iteration i)}``."""
+    org_id = str(organization.id)
+    return {
+        'organizations': (ORGANIZATIONS_QUERY, lambda i: {}),
+        'projects': (PROJECTS_QUERY, lambda i: {'organizationId': org_id}),
+        'tasks': (TASKS_QUERY, lambda i: {'projectId': str(project.id), 'organizationId': org_id}),
+        'createTask': (CREATE_TASK, lambda i: {'projectId': str(project.id), 'organizationId': org_id}),
+        'updateTask': (UPDATE_TASK, lambda i: {
+            'id': str(task.id), 'organizationId': org_id, 'status': STATUSES[i % len(STATUSES)],
+        }),
+        'addTaskComment': (ADD_COMMENT, lambda i: {'taskId': str(task.id), 'organizationId': org_id}),
+    }
+
+
+def percentiles(samples):
+    if len(samples) < 2:
+        return {'p50': samples[0], 'p95': samples[0], 'p99': samples[0]}
+    cuts = statistics.quantiles(samples, n=100, method='inclusive')
+    return {'p50': cuts[49], 'p95': cuts[94], 'p99': cuts[98]}
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the main GraphQL queries and mutations against an organization "
+        "(see generate_synthetic_data) and write p50/p95/p99 latency, SQL "
+        "query counts and peak memory to a JSON report. Mutations are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organization', default='synthetic-0', help="Slug of the organization to use.")
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--only', nargs='+', help="Only run these operations.")
+        parser.add_argument('--output', help="Write the JSON report to this file.")
+        parser.add_argument('--compare', help="Previous report to print differences against.")
+
+    def handle(self, *args, **options):
+        organization = Organization.objects.filter(slug=options['organization']).first()
+        if organization is None:
+            raise CommandError(f"Organization '{options['organization']}' not found; run generate_synthetic_data.")
+        membership = (
+            OrganizationMembership.objects.filter(organization=organization, role='owner')
+            .select_related('user').first()
+        )
+        project = Project.objects.filter(organization=organization).order_by('-created_at', 'id').first()
+        task = Task.objects.filter(project=project).order_by('rank', 'id').first() if project else None
+        if membership is None or task is None:
+            raise CommandError("The organization needs an owner and a project with tasks.")
+        if options['iterations'] < 1:
+            raise CommandError("--iterations must be at least 1.")
+
+        client = Client(SERVER_NAME='localhost')
+        client.force_login(membership.user)
+
+        selected = operations(organization, project, task)
+        if options['only']:
+            unknown = set(options['only']) - set(selected)
+            if unknown:
+                raise CommandError(f"Unknown operations: {', '.join(sorted(unknown))}")
+            selected = {name: selected[name] for name in options['only']}
+
+        results = {}
+        with transaction.atomic():
+            for name, (query, variables) in selected.items():
+                results[name] = self._run(client, query, variables, options['iterations'], options['warmup'])
+                self.stdout.write(
+                    f"{name:<16} p50 {results[name]['p50Ms']:>8.2f} ms  p95 {results[name]['p95Ms']:>8.2f} ms  "
+                    f"p99 {results[name]['p99Ms']:>8.2f} ms  {results[name]['sqlQueries']:>3} queries  "
+                    f"{results[name]['peakMemoryKb']:>8.1f} KiB"
+                )
+            transaction.set_rollback(True)
+
+        report = {
+            'generatedAt': datetime.now(timezone.utc).isoformat(),
+            'organization': organization.slug,
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'asyncView': settings.GRAPHQL_ASYNC_VIEW,
+            'iterations': options['iterations'],
+            'dataset': {
+                'projects': Project.objects.filter(organization=organization).count(),
+                'tasks': Task.objects.filter(project__organization=organization).count(),
+                'comments': TaskComment.objects.filter(task__project__organization=organization).count(),
+                'members': OrganizationMembership.objects.filter(organization=organization).count(),
+            },
+            'operations': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+        if options['compare']:
+            self._compare(options['compare'], report)
+
+    def _post(self, client, query, variables):
+        response = client.post(
+            '/graphql/', json.dumps({'query': query, 'variables': variables}), content_type='application/json'
+        )
+        payload = response.json()
+        data = payload.get('data') or {}
+        failed = bool(payload.get('errors')) or any(
+            isinstance(value, dict) and value.get('success') is False for value in data.values()
+        )
+        return failed
+
+    def _run(self, client, query, variables, iterations, warmup):
+        for i in range(warmup):
+            self._post(client, query, variables(i))
+
+        latencies, errors = [], 0
+        for i in range(iterations):
+            started = time.perf_counter()
+            failed = self._post(client, query, variables(i))
+            latencies.append((time.perf_counter() - started) * 1000)
+            errors += failed
+
+        # Query capture and tracemalloc slow execution down, so they get a
+        # separate run that is not part of the latency samples.
+        tracemalloc.start()
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                self._post(client, query, variables(iterations))
+            _current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        cuts = percentiles(latencies)
+        return {
+            'p50Ms': round(cuts['p50'], 3),
+            'p95Ms': round(cuts['p95'], 3),
+            'p99Ms': round(cuts['p99'], 3),
+            'meanMs': round(statistics.mean(latencies), 3),
+            'sqlQueries': len(queries),
+            'peakMemoryKb': round(peak / 1024, 1),
+            'errors': errors,
+        }
+
+    def _compare(self, path, report):
+        try:
+            with open(path) as f:
+                baseline = json.load(f)['operations']
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f"Cannot read baseline report: {e}")
+
+        self.stdout.write(f"\nCompared with {path}:")
+        for name, current in report['operations'].items():
+            previous = baseline.get(name)
+            if previous is None:
+                continue
+            changes = []
+            for key in ('p50Ms', 'p95Ms', 'p99Ms', 'peakMemoryKb'):
+                if previous[key]:
+                    changes.append(f"{key} {(current[key] - previous[key]) / previous[key]:+.1%}")
+            changes.append(f"sqlQueries {current['sqlQueries'] - previous['sqlQueries']:+d}")
+            self.stdout.write(f"{name:<16} " + '  '.join(changes))
@@ -0,0 +1,146 @@
+"""
+Generate synthetic tenants for load testing and benchmarks.
+"""
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.constants import ProjectStatus, TaskPriority, TaskStatus
+from core.ranking import rank_sequence
+from organizations.models import Organization, OrganizationMembership
+from projects.models import Project
+from tasks.models import Task, TaskComment
+
+
+# orgs x projects per org x tasks per project x comments per task, members per org
+SHAPES = {
+    'small': {'orgs': 2, 'projects': 5, 'tasks': 50, 'comments': 2, 'members': 5},
+    'medium': {'orgs': 10, 'projects': 20, 'tasks': 200, 'comments': 3, 'members': 20},
+    'large': {'orgs': 50, 'projects': 40, 'tasks': 500, 'comments': 5, 'members': 50},
+}
+
+TASK_STATUSES = [choice for choice, _label in TaskStatus.choices]
+TASK_PRIORITIES = [choice for choice, _label in TaskPriority.choices]
+PROJECT_STATUSES = [choice for choice, _label in ProjectStatus.choices]
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-insert synthetic organizations with projects, tasks, comments and "
+        "members. Pick a --shape and override any dimension."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shape', choices=sorted(SHAPES), default='small')
+        for dimension in ('orgs', 'projects', 'tasks', 'comments', 'members'):
+            parser.add_argument(f'--{dimension}', type=int, help=f"Override the shape's {dimension}.")
+        parser.add_argument('--prefix', default='synthetic', help="Prefix of generated slugs and usernames.")
+        parser.add_argument('--password', default='password', help="Password of every generated user.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--clear', action='store_true', help="Delete data generated with --prefix first.")
+
+    def handle(self, *args, **options):
+        shape = dict(SHAPES[options['shape']])
+        for dimension in shape:
+            if options[dimension] is not None:
+                shape[dimension] = options[dimension]
+        if any(value < 0 for value in shape.values()) or shape['orgs'] < 1:
+            raise CommandError("Dimensions must be non-negative and --orgs at least 1.")
+
+        prefix = options['prefix']
+        if options['clear']:
+            Organization.objects.filter(slug__startswith=f'{prefix}-').delete()
+            User.objects.filter(username__startswith=f'{prefix}-').delete()
+        if Organization.objects.filter(slug__startswith=f'{prefix}-').exists():
+            raise CommandError(f"Data with prefix '{prefix}' already exists; use --clear or another --prefix.")
+
+        rng = random.Random(options['seed'])
+        # Hashing is deliberately slow; every generated user shares one hash.
+        password = make_password(options['password'])
+        totals = dict.fromkeys(('orgs', 'projects', 'tasks', 'comments', 'members'), 0)
+
+        for org_index in range(shape['orgs']):
+            with transaction.atomic():
+                counts = self._generate_organization(
+                    prefix, org_index, shape, rng, password, options['batch_size']
+                )
+            for key, value in counts.items():
+                totals[key] += value
+
+        self.stdout.write(self.style.SUCCESS(
+            "Generated {orgs} organizations, {members} members, {projects} projects, "
+            "{tasks} tasks and {comments} comments.".format(**totals)
+        ))
+        if shape['members']:
+            self.stdout.write(f"Log in as '{prefix}-0-0' (owner of '{prefix}-0') with the given password.")
+
+    def _generate_organization(self, prefix, org_index, shape, rng, password, batch_size):
+        organization = Organization.objects.create(
+            name=f"Synthetic Org {org_index}",
+            slug=f'{prefix}-{org_index}',
+            contact_email=f'admin@{prefix}-{org_index}.example.com',
+        )
+
+        users = User.objects.bulk_create([
+            User(
+                username=f'{prefix}-{org_index}-{member_index}',
+                email=f'member{member_index}@{prefix}-{org_index}.example.com',
+                password=password,
+            )
+            for member_index in range(shape['members'])
+        ], batch_size=batch_size)
+        OrganizationMembership.objects.bulk_create([
+            OrganizationMembership(
+                user=user,
+                organization=organization,
+                role='owner' if index == 0 else rng.choice(('admin', 'member', 'member')),
+            )
+            for index, user in enumerate(users)
+        ], batch_size=batch_size)
+
+        projects, tasks, comments = [], [], []
+        for project_index in range(shape['projects']):
+            project = Project(
+                organization=organization,
+                name=f"Project {project_index}",
+                description=f"Synthetic project {project_index} of {organization.name}.",
+                status=rng.choice(PROJECT_STATUSES),
+            )
+            projects.append(project)
+            for task_index, rank in enumerate(rank_sequence(shape['tasks'])):
+                status = rng.choice(TASK_STATUSES)
+                counter = Project.TASK_COUNTER_FIELDS[status]
+                setattr(project, counter, getattr(project, counter) + 1)
+                task = Task(
+                    project=project,
+                    title=f"Task {task_index}",
+                    description=f"Synthetic task {task_index}.",
+                    status=status,
+                    priority=rng.choice(TASK_PRIORITIES),
+                    rank=rank,
+                )
+                tasks.append(task)
+                comments.extend(
+                    TaskComment(
+                        task=task,
+                        content=f"Synthetic comment {comment_index}.",
+                        author_name=f"Member {rng.randrange(max(shape['members'], 1))}",
+                    )
+                    for comment_index in range(shape['comments'])
+                )
+
+        # Counters are set above because bulk_create bypasses TaskService.
+        Project.objects.bulk_create(projects, batch_size=batch_size)
+        Task.objects.bulk_create(tasks, batch_size=batch_size)
+        TaskComment.objects.bulk_create(comments, batch_size=batch_size)
+        return {
+            'orgs': 1,
+            'members': len(users),
+            'projects': len(projects),
+            'tasks': len(tasks),
+            'comments': len(comments),
+        }
@@ -0,0 +1,56 @@
+"""
+Import projects, tasks and comments from a CSV or JSON Lines export.
+"""
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from organizations.models import Organization
+from services.import_service import FORMATS, ImportService
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-import projects, tasks and comments into an organization. "
+        "See services/import_service.py for the record format."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Path to the .csv or .jsonl file.")
+        parser.add_argument('--organization', required=True, help="Organization id or slug.")
+        parser.add_argument('--format', choices=FORMATS, help="Defaults to the file extension.")
+        parser.add_argument('--chunk-size', type=int, help="Records validated and staged at a time.")
+
+    def handle(self, *args, **options):
+        organization = Organization.objects.filter(slug=options['organization']).first()
+        if organization is None:
+            try:
+                organization = Organization.objects.filter(id=options['organization']).first()
+            except ValidationError:
+                organization = None
+        if organization is None:
+            raise CommandError(f"Organization {options['organization']!r} not found")
+
+        format = options['format'] or ImportService.detect_format(options['path'])
+        if format is None:
+            raise CommandError("Cannot tell the format from the file name; pass --format")
+
+        def progress(report):
+            staged = ', '.join(f"{count} {record_type}s" for record_type, count in report.staged.items())
+            self.stdout.write(f"Read {report.rows} records: staged {staged}, {report.error_count} errors")
+
+        try:
+            with open(options['path'], 'rb') as f:
+                report = ImportService.import_file(
+                    organization.id, f, format, chunk_size=options['chunk_size'], progress=progress
+                )
+        except OSError as e:
+            raise CommandError(f"Cannot read {options['path']}: {e}")
+        except ValidationError as e:
+            raise CommandError(e.messages[0])
+
+        for error in report.errors:
+            self.stderr.write(f"Line {error.line}: {error.message}")
+        if report.error_count > len(report.errors):
+            self.stderr.write(f"... and {report.error_count - len(report.errors)} more errors")
+        imported = ', '.join(f"{count} {record_type}s" for record_type, count in report.imported.items())
+        self.stdout.write(self.style.SUCCESS(f"Imported {imported} into {organization.name}."))
@@ -0,0 +1,101 @@
+"""
+Deliver queued outbox emails (see services/email_outbox.py).
+"""
+import logging
+import signal
+import threading
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from services.email_outbox import EmailOutbox
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Drain the email outbox queue with a bounded number of SMTP connections."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=settings.EMAIL_OUTBOX_CONCURRENCY,
+            help="Worker threads, each holding one reusable connection.",
+        )
+        parser.add_argument('--burst', action='store_true', help="Exit once the queue is empty.")
+        parser.add_argument(
+            '--recover', action='store_true',
+            help="Re-queue invites whose email is still pending before starting.",
+        )
+
+    def handle(self, *args, **options):
+        concurrency = options['concurrency']
+        if concurrency < 1:
+            raise CommandError("--concurrency must be at least 1")
+        if options['recover']:
+            self.stdout.write(f"Re-queued {EmailOutbox.recover()} pending invite emails.")
+
+        self.stopping = threading.Event()
+        self.processed = 0
+        self.failed = 0
+        self.lock = threading.Lock()
+        in_main_thread = threading.current_thread() is threading.main_thread()
+        if in_main_thread:
+            previous_handler = signal.signal(signal.SIGTERM, lambda *_: self.stopping.set())
+
+        try:
+            if concurrency == 1:
+                self.work(options['burst'])
+            else:
+                workers = [
+                    threading.Thread(target=self.work_thread, args=(options['burst'],), daemon=True)
+                    for _ in range(concurrency)
+                ]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    while worker.is_alive():
+                        worker.join(1)
+        except KeyboardInterrupt:
+            self.stopping.set()
+        finally:
+            if in_main_thread:
+                signal.signal(signal.SIGTERM, previous_handler)
+        self.stdout.write(self.style.SUCCESS(f"Processed {self.processed} jobs, {self.failed} failed sends."))
+
+    def work_thread(self, burst):
+        try:
+            self.work(burst)
+        finally:
+            connections.close_all()
+
+    def work(self, burst):
+        queue = EmailOutbox.queue()
+        # Opened lazily by the first send and kept open between jobs.
+        connection = get_connection()
+        try:
+            while not self.stopping.is_set():
+                job = queue.pop(timeout=0 if burst else 5)
+                if job is None:
+                    # Idle: don't hold the SMTP session open until the server drops it.
+                    connection.close()
+                    if burst:
+                        return
+                    continue
+                try:
+                    ok = EmailOutbox.process(job, connection)
+                except Exception:
+                    logger.exception("Outbox job %r crashed", job)
+                    ok = False
+                with self.lock:
+                    if ok:
+                        self.processed += 1
+                    else:
+                        self.failed += 1
+                if not ok:
+                    # The session may be broken; the next send reconnects.
+                    connection.close()
+        finally:
+            connection.close()
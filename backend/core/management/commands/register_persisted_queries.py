@@ -0,0 +1,48 @@
+"""
+Register GraphQL documents in the persisted query allow-list.
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from graphql import parse, validate, specified_rules, GraphQLSyntaxError
+
+from api.persisted_queries import PersistedQueryRegistry, hash_query
+from api.schema import schema
+
+
+class Command(BaseCommand):
+    help = (
+        "Register the operations of an Apollo persisted query manifest "
+        "(or a {sha256: query} JSON map) as allow-listed persisted queries."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('manifest', help="Path to the manifest JSON file.")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['manifest']) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Cannot read manifest: {e}")
+
+        if isinstance(manifest, dict) and 'operations' in manifest:
+            entries = [(op.get('id'), op['body']) for op in manifest['operations']]
+        elif isinstance(manifest, dict):
+            entries = list(manifest.items())
+        else:
+            raise CommandError("Unrecognised manifest format")
+
+        for expected_hash, query in entries:
+            if expected_hash and expected_hash != hash_query(query):
+                raise CommandError(f"Hash mismatch for operation {expected_hash}")
+            try:
+                errors = validate(schema.graphql_schema, parse(query), specified_rules)
+            except GraphQLSyntaxError as e:
+                errors = [e]
+            if errors:
+                raise CommandError(f"Invalid operation {expected_hash}: {errors[0].message}")
+
+        for _, query in entries:
+            PersistedQueryRegistry.register(query, allowlisted=True)
+        self.stdout.write(self.style.SUCCESS(f"Registered {len(entries)} persisted queries."))
@@ -0,0 +1,129 @@
+"""
+Prometheus metrics, exposed in the text format at ``/metrics``.
+
+Metrics are recorded by ``core.middleware.MetricsMiddleware`` (request
+latency and SQL per GraphQL operation), ``api.middleware.ResolverMetricsMiddleware``
+(resolver latency) and the cache and email code paths.
+
+Operation names are sent by clients, so only the names of allow-listed
+persisted queries and ``METRICS_OPERATION_NAMES`` become labels; the rest
+are recorded as ``(other)`` to keep the number of series bounded.
+
+With several worker processes set ``PROMETHEUS_MULTIPROC_DIR`` to an empty
+directory shared by the workers so ``/metrics`` aggregates all of them.
+"""
+import os
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+
+
+REQUEST_LATENCY = Histogram(
+    'projecthub_graphql_request_duration_seconds',
+    'GraphQL HTTP request latency by operation name.',
+    ['operation'],
+)
+RESOLVER_LATENCY = Histogram(
+    'projecthub_graphql_resolver_duration_seconds',
+    'Sampled latency of root fields and fields returning objects.',
+    ['field'],
+    buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5),
+)
+SQL_QUERIES = Histogram(
+    'projecthub_sql_queries_per_request',
+    'SQL queries executed per GraphQL request.',
+    ['operation'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+SQL_DURATION = Histogram(
+    'projecthub_sql_duration_seconds_per_request',
+    'Total SQL time per GraphQL request.',
+    ['operation'],
+)
+CACHE_REQUESTS = Counter(
+    'projecthub_cache_requests_total',
+    'Cache lookups by cache and result.',
+    ['cache', 'result'],
+)
+EMAIL_LATENCY = Histogram(
+    'projecthub_email_send_duration_seconds',
+    'Time spent sending email by kind and status.',
+    ['kind', 'status'],
+    buckets=(.05, .1, .25, .5, 1, 2.5, 5, 10, 30),
+)
+
+
+class SQLStats:
+    """Query count and time accumulated for one request."""
+
+    __slots__ = ('count', 'duration')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+
+# Set by MetricsMiddleware; shared with sync_to_async threads, which run in
+# a copy of the request's context.
+current_sql_stats = ContextVar('current_sql_stats', default=None)
+
+
+def sql_stats_wrapper(execute, sql, params, many, context):
+    """Connection execute wrapper adding each query to the current request's stats."""
+    stats = current_sql_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.duration += time.perf_counter() - started
+        stats.count += 1
+
+
+def install_sql_stats_wrapper(sender, connection, **kwargs):
+    """``connection_created`` receiver installing ``sql_stats_wrapper``."""
+    if sql_stats_wrapper not in connection.execute_wrappers:
+        # Outermost, so connection.execute_wrapper() blocks still pop their own.
+        connection.execute_wrappers.insert(0, sql_stats_wrapper)
+
+
+def operation_label(operation_name, allowlisted: bool) -> str:
+    """Metrics label of a GraphQL operation (see the module docstring)."""
+    if not operation_name:
+        return '(anonymous)'
+    if allowlisted or operation_name in settings.METRICS_OPERATION_NAMES:
+        return operation_name
+    return '(other)'
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def metrics_view(request):
+    """Serve every metric in the Prometheus text format."""
+    token = settings.METRICS_TOKEN
+    if token:
+        if request.headers.get('Authorization') != f'Bearer {token}':
+            return HttpResponseForbidden()
+    elif not settings.DEBUG:
+        return HttpResponseForbidden()
+
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -1,7 +1,18 @@
 """
-Custom middleware for header-based session management.
+Custom middleware for header-based session management and metrics.
 """
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
 from django.contrib.sessions.middleware import SessionMiddleware
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
+
+from . import metrics
+from .session_tokens import SessionTokens
+
 
 class HeaderSessionMiddleware(SessionMiddleware):
     """
@@ -11,10 +22,72 @@ class HeaderSessionMiddleware(SessionMiddleware):
     def process_request(self, request):
         # Try to get session key from header
         session_key = request.headers.get('X-Session-ID')
-        
-        if session_key:
+
+        if session_key and settings.SESSION_TOKENS_ENABLED and SessionTokens.looks_like_token(session_key):
+            # Authenticated by SessionTokenMiddleware; the session stays
+            # empty and is never loaded from the session store.
+            request.session_token = session_key
+            request.session = self.SessionStore()
+        elif session_key:
             request.session_engine = __import__(self.SessionStore.__module__, {}, {}, ['SessionStore'])
             request.session = self.SessionStore(session_key)
         else:
             # Fallback to default behavior (cookies)
             super().process_request(request)
+
+
+class SessionTokenMiddleware(MiddlewareMixin):
+    """
+    Authenticate requests carrying a signed session token (see
+    core/session_tokens.py). Must come after AuthenticationMiddleware.
+    """
+    def process_request(self, request):
+        token = getattr(request, 'session_token', None)
+        if token:
+            request.user = SimpleLazyObject(lambda: SessionTokens.authenticate(token) or AnonymousUser())
+
+
+class MetricsMiddleware:
+    """
+    Records latency and SQL query count/time of GraphQL requests under the
+    operation name the view sets on ``request.graphql_operation``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = metrics.SQLStats()
+        token = metrics.current_sql_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            return self.get_response(request)
+        finally:
+            metrics.current_sql_stats.reset(token)
+            self._observe(request, time.perf_counter() - started, stats)
+
+    async def __acall__(self, request):
+        stats = metrics.SQLStats()
+        token = metrics.current_sql_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            return await self.get_response(request)
+        finally:
+            metrics.current_sql_stats.reset(token)
+            self._observe(request, time.perf_counter() - started, stats)
+
+    @staticmethod
+    def _observe(request, elapsed, stats):
+        operation = getattr(request, 'graphql_operation', None)
+        if operation is None:
+            # Not a GraphQL request, or one rejected before validation.
+            return
+        metrics.REQUEST_LATENCY.labels(operation).observe(elapsed)
+        metrics.SQL_QUERIES.labels(operation).observe(stats.count)
+        metrics.SQL_DURATION.labels(operation).observe(stats.duration)
@@ -0,0 +1,133 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Pages are cut with a ``WHERE a >= x AND (a > x OR (a = x AND b > y) ...)``
+predicate built from the queryset ordering instead of OFFSET. The leading
+bound lets the database start an index range scan at the cursor, so fetching
+page N costs the same as fetching page 1 when a matching index exists.
+"""
+import base64
+import json
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class Page:
+    """One page of a keyset-paginated queryset."""
+
+    def __init__(self, items, has_next_page, has_previous_page, queryset, ordering):
+        self.items = items
+        self.has_next_page = has_next_page
+        self.has_previous_page = has_previous_page
+        self._queryset = queryset
+        self._ordering = ordering
+        self._total_count = None
+
+    @property
+    def total_count(self):
+        """Size of the full result set; only queried when asked for."""
+        if self._total_count is None:
+            self._total_count = self._queryset.order_by().count()
+        return self._total_count
+
+    async def atotal_count(self):
+        """Async variant of ``total_count``."""
+        if self._total_count is None:
+            self._total_count = await self._queryset.order_by().acount()
+        return self._total_count
+
+    def cursor_for(self, item):
+        return encode_cursor(item, self._ordering)
+
+    @property
+    def start_cursor(self):
+        return self.cursor_for(self.items[0]) if self.items else None
+
+    @property
+    def end_cursor(self):
+        return self.cursor_for(self.items[-1]) if self.items else None
+
+
+def _field_name(term):
+    return term.lstrip('-')
+
+
+def encode_cursor(item, ordering):
+    """Encode the ordering key of ``item`` as an opaque cursor string."""
+    values = []
+    for term in ordering:
+        value = getattr(item, _field_name(term))
+        values.append(value.isoformat() if hasattr(value, 'isoformat') else str(value))
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor, ordering):
+    """Decode a cursor produced by ``encode_cursor`` for the same ordering."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValidationError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(ordering):
+        raise ValidationError("Invalid cursor")
+    return values
+
+
+def _after_predicate(ordering, values):
+    """
+    Build ``f1 >= v1 AND ((f1 > v1) OR (f1 = v1 AND f2 > v2) OR ...)``
+    honouring the direction of each ordering term.
+
+    The expansion alone is not sargable: the redundant bound on the first
+    term is what the planner uses as the start of the index range.
+    """
+    predicate = Q()
+    equal = Q()
+    for term, value in zip(ordering, values):
+        field = _field_name(term)
+        lookup = 'lt' if term.startswith('-') else 'gt'
+        predicate |= equal & Q(**{f'{field}__{lookup}': value})
+        equal &= Q(**{field: value})
+    if len(ordering) > 1:
+        first_term = ordering[0]
+        lookup = 'lte' if first_term.startswith('-') else 'gte'
+        predicate = Q(**{f'{_field_name(first_term)}__{lookup}': values[0]}) & predicate
+    return predicate
+
+
+def keyset_paginate(queryset, ordering, first=None, after=None) -> Page:
+    """
+    Return the page of ``queryset`` that follows the ``after`` cursor.
+
+    ``ordering`` must be a total order; ``id`` is appended as a tie-breaker
+    when it is not already the last term.
+    """
+    ordering = list(ordering)
+    if _field_name(ordering[-1]) != 'id':
+        ordering.append('id')
+
+    if first is None:
+        first = DEFAULT_PAGE_SIZE
+    if first < 0:
+        raise ValidationError("first must be non-negative")
+    first = min(first, MAX_PAGE_SIZE)
+
+    page_queryset = queryset.order_by(*ordering)
+    if after:
+        page_queryset = page_queryset.filter(
+            _after_predicate(ordering, decode_cursor(after, ordering))
+        )
+
+    # Fetch one extra row to learn whether another page follows.
+    items = list(page_queryset[:first + 1])
+    has_next_page = len(items) > first
+    return Page(
+        items=items[:first],
+        has_next_page=has_next_page,
+        has_previous_page=bool(after),
+        queryset=queryset,
+        ordering=ordering,
+    )
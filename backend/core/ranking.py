@@ -0,0 +1,109 @@
+"""
+Fractional rank keys for manually ordered lists.
+
+A rank is a string compared lexicographically; there is always a rank
+between two others, so moving an item rewrites only that item. Keys are
+``<head><integer><fraction>`` in base 36 (``0-9a-z``):
+
+* ``head`` is ``a``-``z`` and gives the number of integer digits (1-26), so
+  longer integers sort after shorter ones;
+* appending after the last item increments the integer, which keeps keys
+  short (``c100``, ``c101``, ...) however many items are appended;
+* inserting between two items with adjacent integers extends the fraction.
+
+Only lowercase letters and digits are used so the byte order matches the
+order of any Postgres collation.
+"""
+from typing import Optional
+
+
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+BASE = len(DIGITS)
+
+# First rank of an empty list; integers below it leave room for prepends.
+START = BASE ** 2
+
+
+def _encode_integer(value: int) -> str:
+    digits = ''
+    while True:
+        value, remainder = divmod(value, BASE)
+        digits = DIGITS[remainder] + digits
+        if not value:
+            break
+    return chr(ord('a') + len(digits) - 1) + digits
+
+
+def _split(rank: str) -> tuple[int, str]:
+    """Return the integer and fraction parts of ``rank``."""
+    length = ord(rank[0]) - ord('a') + 1
+    if not 1 <= length <= 26 or len(rank) < 1 + length:
+        raise ValueError(f"Invalid rank: {rank!r}")
+    return int(rank[1:1 + length], BASE), rank[1 + length:]
+
+
+def _midpoint(low: str, high: Optional[str]) -> str:
+    """
+    Fraction digits strictly between ``low`` and ``high`` (``None`` meaning
+    1), read as base-36 fractions without trailing zeros.
+    """
+    if high is not None:
+        common = 0
+        while common < len(high) and (low[common] if common < len(low) else '0') == high[common]:
+            common += 1
+        if common:
+            return high[:common] + _midpoint(low[common:], high[common:])
+
+    low_digit = DIGITS.index(low[0]) if low else 0
+    high_digit = DIGITS.index(high[0]) if high is not None else BASE
+    if high_digit - low_digit > 1:
+        return DIGITS[(low_digit + high_digit) // 2]
+    if high is not None and len(high) > 1:
+        return high[0]
+    return DIGITS[low_digit] + _midpoint(low[1:], None)
+
+
+def rank_between(before: Optional[str], after: Optional[str]) -> str:
+    """
+    Return a rank sorting after ``before`` and before ``after``; either may
+    be None for the start or end of the list. Raises ValueError unless
+    ``before < after``.
+    """
+    if before is None and after is None:
+        return _encode_integer(START)
+
+    if after is None:
+        integer, _fraction = _split(before)
+        return _encode_integer(integer + 1)
+
+    integer_after, fraction_after = _split(after)
+    if before is None:
+        if fraction_after and integer_after > 0:
+            return _encode_integer(integer_after)
+        if integer_after > 1:
+            return _encode_integer(integer_after - 1)
+        if integer_after == 0 and not fraction_after:
+            # Nothing sorts before the bare floor key; callers rebalance.
+            raise ValueError(f"Nothing sorts before {after!r}")
+        # Integer 0 is only used with a fraction, so there is always room below.
+        return _encode_integer(0) + _midpoint('', fraction_after or None)
+
+    if before >= after:
+        raise ValueError(f"{before!r} does not sort before {after!r}")
+    integer_before, fraction_before = _split(before)
+    if integer_before == integer_after:
+        return _encode_integer(integer_before) + _midpoint(fraction_before, fraction_after)
+    candidate = _encode_integer(integer_before + 1)
+    if candidate < after:
+        return candidate
+    return _encode_integer(integer_before) + _midpoint(fraction_before, None)
+
+
+def rank_at(index: int) -> str:
+    """Return the ``index``-th rank of ``rank_sequence``, for streamed inserts."""
+    return _encode_integer(START + index)
+
+
+def rank_sequence(count: int) -> list[str]:
+    """Return ``count`` evenly spaced, increasing ranks for a fresh list."""
+    return [rank_at(index) for index in range(count)]
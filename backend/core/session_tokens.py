@@ -0,0 +1,117 @@
+"""
+Stateless signed session tokens (``SESSION_TOKENS_ENABLED``).
+
+Login returns a token instead of a server-side session key. The client
+sends it in ``X-Session-ID`` as before. A token is the user id, a session
+version, a token id and the issue time, signed with ``SECRET_KEY`` and
+timestamped. Keys listed in ``SECRET_KEY_FALLBACKS`` are still accepted, so
+the secret can be rotated without logging everybody out.
+
+Verifying a token costs no database round trip. The revocation entries and
+the cached user (see ``core/user_cache.py``) are read in a single
+``get_many``:
+
+* ``auth:revoked:<token id>`` is set by logout.
+* ``auth:revoked-before:<user id>`` is set to log a user out everywhere.
+* The session version is derived from the password hash, so changing the
+  password invalidates every token of the user.
+"""
+import secrets
+import time
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.auth import user_logged_in
+from django.core import signing
+from django.core.cache import caches
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from .user_cache import UserCache
+
+
+SALT = 'projecthub.session-token'
+REVOKED_PREFIX = 'auth:revoked:'
+REVOKED_BEFORE_PREFIX = 'auth:revoked-before:'
+
+
+class SessionTokens:
+    """Issue, verify and revoke signed session tokens."""
+
+    @staticmethod
+    def _cache():
+        return caches[settings.SESSION_TOKENS_CACHE]
+
+    @staticmethod
+    def looks_like_token(value: str) -> bool:
+        # Server-side session keys are plain [a-z0-9]; signed values contain ':'.
+        return ':' in value
+
+    @staticmethod
+    def _session_version(user, secret=None) -> str:
+        return salted_hmac(SALT, user.password, secret=secret, algorithm='sha256').hexdigest()[:16]
+
+    @staticmethod
+    def _version_matches(user, version) -> bool:
+        for secret in [settings.SECRET_KEY, *settings.SECRET_KEY_FALLBACKS]:
+            if constant_time_compare(SessionTokens._session_version(user, secret), version):
+                return True
+        return False
+
+    @staticmethod
+    def issue(user, request=None) -> str:
+        """Return a new token for ``user`` and record the login."""
+        token = signing.dumps(
+            {
+                'u': str(user.pk),
+                'v': SessionTokens._session_version(user),
+                'j': secrets.token_urlsafe(12),
+                'i': time.time_ns() // 1_000_000,
+            },
+            salt=SALT,
+        )
+        user_logged_in.send(sender=user.__class__, request=request, user=user)
+        return token
+
+    @staticmethod
+    def claims(token: str) -> Optional[dict]:
+        """Return the payload of a valid, unexpired token, or None."""
+        try:
+            return signing.loads(token, salt=SALT, max_age=settings.SESSION_TOKEN_MAX_AGE)
+        except signing.BadSignature:
+            return None
+
+    @staticmethod
+    def authenticate(token: str):
+        """Return the active user a token belongs to, or None."""
+        claims = SessionTokens.claims(token)
+        if claims is None:
+            return None
+        user_id = claims['u']
+        user = UserCache.get_local(user_id)
+
+        keys = [REVOKED_PREFIX + claims['j'], REVOKED_BEFORE_PREFIX + user_id]
+        if user is None:
+            keys.append(UserCache.key(user_id))
+        values = SessionTokens._cache().get_many(keys)
+        if keys[0] in values or values.get(keys[1], 0) >= claims['i']:
+            return None
+
+        if user is None:
+            user = UserCache.load(user_id, values.get(UserCache.key(user_id)))
+        if user is None or not user.is_active or not SessionTokens._version_matches(user, claims['v']):
+            return None
+        return user
+
+    @staticmethod
+    def revoke(token: str) -> None:
+        """Revoke one token until it would have expired anyway."""
+        claims = SessionTokens.claims(token)
+        if claims is not None:
+            SessionTokens._cache().set(REVOKED_PREFIX + claims['j'], 1, settings.SESSION_TOKEN_MAX_AGE)
+
+    @staticmethod
+    def revoke_all(user_id) -> None:
+        """Revoke every token of a user issued until now."""
+        SessionTokens._cache().set(
+            REVOKED_BEFORE_PREFIX + str(user_id), time.time_ns() // 1_000_000, settings.SESSION_TOKEN_MAX_AGE
+        )
@@ -0,0 +1,86 @@
+"""
+Two-level cache of ``User`` rows for token authentication.
+
+Users are kept for ``USER_CACHE_LOCAL_TTL`` seconds in process memory and
+``USER_CACHE_TTL`` seconds in the shared cache. Saving or deleting a user
+drops both (see ``CoreConfig.ready``); other processes notice within the
+local TTL.
+"""
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+
+from .metrics import record_cache
+
+
+KEY_PREFIX = 'auth:user:'
+
+# Upper bound on process-local entries; the oldest half is dropped when full.
+MAX_LOCAL_ENTRIES = 10000
+
+
+class UserCache:
+    """Read-through cache of active users by id."""
+
+    _local = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _cache():
+        return caches[settings.SESSION_TOKENS_CACHE]
+
+    @staticmethod
+    def key(user_id) -> str:
+        return KEY_PREFIX + str(user_id)
+
+    @classmethod
+    def get_local(cls, user_id):
+        """Return a private copy of the process-local entry, or None."""
+        entry = cls._local.get(str(user_id))
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        # Copies keep per-request attributes (e.g. memos) off the shared instance.
+        return copy.copy(entry[1])
+
+    @classmethod
+    def remember(cls, user, shared=True) -> None:
+        """Store ``user`` locally and, unless ``shared`` is False, in the shared cache."""
+        if shared:
+            cls._cache().set(cls.key(user.pk), user, settings.USER_CACHE_TTL)
+        with cls._lock:
+            if len(cls._local) >= MAX_LOCAL_ENTRIES:
+                for user_id in sorted(cls._local, key=lambda k: cls._local[k][0])[:MAX_LOCAL_ENTRIES // 2]:
+                    del cls._local[user_id]
+            cls._local[str(user.pk)] = (time.monotonic() + settings.USER_CACHE_LOCAL_TTL, user)
+
+    @classmethod
+    def load(cls, user_id, shared_value=None):
+        """
+        Return the active user ``user_id`` from ``shared_value`` (the shared
+        cache entry, if the caller fetched it already) or the database.
+        """
+        record_cache('user', shared_value is not None)
+        user = shared_value
+        if user is None:
+            user = User.objects.filter(pk=user_id, is_active=True).first()
+            if user is None:
+                return None
+            cls.remember(user)
+        else:
+            cls.remember(user, shared=False)
+        return copy.copy(user)
+
+    @classmethod
+    def invalidate(cls, user_id) -> None:
+        cls._cache().delete(cls.key(user_id))
+        with cls._lock:
+            cls._local.pop(str(user_id), None)
+
+
+def invalidate_user_cache(sender, instance, **kwargs):
+    """``post_save``/``post_delete`` receiver for ``User``."""
+    UserCache.invalidate(instance.pk)
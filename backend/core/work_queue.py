@@ -0,0 +1,117 @@
+"""
+Minimal Redis work queue.
+
+Each queue is a list of ready jobs (``LPUSH``/``BRPOP``) plus a sorted set
+of delayed jobs scored by due time. Due jobs are moved to the list by a
+Lua script before every pop. Jobs are JSON objects.
+
+With an empty ``WORK_QUEUE_URL`` the queues live in process memory, which
+suits tests and single-process development (enqueue and work in the same
+process).
+"""
+import heapq
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Optional
+
+import redis
+from django.conf import settings
+
+
+KEY_PREFIX = 'queue:'
+
+# Moves up to ARGV[2] jobs due by ARGV[1] from the delayed set to the list.
+_PROMOTE_DUE = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+for _, job in ipairs(due) do
+    redis.call('ZREM', KEYS[2], job)
+    redis.call('LPUSH', KEYS[1], job)
+end
+return #due
+"""
+
+
+def _encode(payload: dict) -> str:
+    # The id keeps identical payloads distinct in the delayed set.
+    return json.dumps({'id': uuid.uuid4().hex, **payload}, sort_keys=True, default=str)
+
+
+class RedisWorkQueue:
+    def __init__(self, name: str, client):
+        self.ready_key = f'{KEY_PREFIX}{name}'
+        self.delayed_key = f'{KEY_PREFIX}{name}:delayed'
+        self.client = client
+        self._promote = client.register_script(_PROMOTE_DUE)
+
+    def push(self, payload: dict, delay: float = 0) -> None:
+        job = _encode(payload)
+        if delay > 0:
+            self.client.zadd(self.delayed_key, {job: time.time() + delay})
+        else:
+            self.client.lpush(self.ready_key, job)
+
+    def pop(self, timeout: float = 1) -> Optional[dict]:
+        """Return the next ready job, waiting up to ``timeout`` seconds."""
+        self._promote(keys=[self.ready_key, self.delayed_key], args=[time.time(), 100])
+        item = self.client.brpop([self.ready_key], timeout=max(int(timeout), 1))
+        return json.loads(item[1]) if item else None
+
+    def pending(self) -> tuple[int, int]:
+        """Return the number of (ready, delayed) jobs."""
+        return self.client.llen(self.ready_key), self.client.zcard(self.delayed_key)
+
+
+class MemoryWorkQueue:
+    def __init__(self, name: str):
+        self.name = name
+        self._ready = deque()
+        self._delayed = []
+        self._condition = threading.Condition()
+
+    def push(self, payload: dict, delay: float = 0) -> None:
+        job = _encode(payload)
+        with self._condition:
+            if delay > 0:
+                heapq.heappush(self._delayed, (time.time() + delay, job))
+            else:
+                self._ready.appendleft(job)
+                self._condition.notify()
+
+    def pop(self, timeout: float = 1) -> Optional[dict]:
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                now = time.time()
+                while self._delayed and self._delayed[0][0] <= now:
+                    self._ready.appendleft(heapq.heappop(self._delayed)[1])
+                if self._ready:
+                    return json.loads(self._ready.pop())
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._condition.wait(min(remaining, 0.1))
+
+    def pending(self) -> tuple[int, int]:
+        with self._condition:
+            return len(self._ready), len(self._delayed)
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def get_queue(name: str):
+    """Return the queue ``name`` on ``WORK_QUEUE_URL`` (memory when empty)."""
+    url = settings.WORK_QUEUE_URL
+    with _queues_lock:
+        queue = _queues.get((url, name))
+        if queue is None:
+            if url:
+                queue = RedisWorkQueue(name, redis.Redis.from_url(url))
+            else:
+                queue = MemoryWorkQueue(name)
+            _queues[(url, name)] = queue
+        return queue
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Organization
+from .models import Organization, OrganizationInvite
 
 
 @admin.register(Organization)
@@ -8,3 +8,12 @@ class OrganizationAdmin(admin.ModelAdmin):
     list_filter = ['is_active']
     search_fields = ['name', 'slug']
     prepopulated_fields = {'slug': ('name',)}
+
+
+@admin.register(OrganizationInvite)
+class OrganizationInviteAdmin(admin.ModelAdmin):
+    list_display = ['email', 'organization', 'used', 'email_status', 'email_attempts', 'email_sent_at']
+    list_filter = ['used', 'email_status']
+    search_fields = ['email', 'organization__name']
+    readonly_fields = ['invite_code', 'email_status', 'email_attempts', 'email_sent_at', 'email_error']
+    raw_id_fields = ['organization', 'invited_by', 'used_by']
@@ -0,0 +1,80 @@
+"""
+Cached organization roles of a user.
+
+A user's memberships are read once as ``{organization_id: role}``, stored in
+the cache under ``org:roles:<user_id>`` and memoized on the user object for
+the rest of the request, so authorization checks do not query the database.
+Entries are deleted whenever a membership of the user is saved or deleted
+(see ``organizations/signals.py``).
+"""
+from typing import Optional
+from uuid import UUID
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from core.metrics import record_cache
+from .models import OrganizationMembership
+
+
+KEY_PREFIX = 'org:roles:'
+
+# Per-request memo on the user object.
+_MEMO_ATTRIBUTE = '_organization_roles'
+
+
+class MembershipCache:
+    """Read-through cache of ``{organization_id: role}`` per user."""
+
+    @staticmethod
+    def _cache():
+        return caches[settings.ORGANIZATION_ROLES_CACHE]
+
+    @staticmethod
+    def roles(user) -> dict[str, str]:
+        """Return the user's roles keyed by organization id (as a string)."""
+        if not user.is_authenticated:
+            return {}
+        roles = getattr(user, _MEMO_ATTRIBUTE, None)
+        if roles is not None:
+            return roles
+
+        key = KEY_PREFIX + str(user.pk)
+        roles = MembershipCache._cache().get(key)
+        record_cache('membership', roles is not None)
+        if roles is None:
+            roles = {
+                str(organization_id): role
+                for organization_id, role in OrganizationMembership.objects.filter(
+                    user_id=user.pk
+                ).values_list('organization_id', 'role')
+            }
+            MembershipCache._cache().set(key, roles, settings.ORGANIZATION_ROLES_CACHE_TTL)
+        setattr(user, _MEMO_ATTRIBUTE, roles)
+        return roles
+
+    @staticmethod
+    def role(user, organization_id: UUID) -> Optional[str]:
+        """Return the user's role in the organization, or None if not a member."""
+        return MembershipCache.roles(user).get(str(organization_id))
+
+    @staticmethod
+    def is_member(user, organization_id: UUID) -> bool:
+        return MembershipCache.role(user, organization_id) is not None
+
+    @staticmethod
+    def forget(user) -> None:
+        """Drop the per-request memo so the next lookup re-reads the cache."""
+        if hasattr(user, _MEMO_ATTRIBUTE):
+            delattr(user, _MEMO_ATTRIBUTE)
+
+    @staticmethod
+    def invalidate(user_id) -> None:
+        """
+        Delete the cached roles of a user now and again once the transaction
+        commits, so a concurrent read cannot re-cache the old memberships.
+        """
+        key = KEY_PREFIX + str(user_id)
+        MembershipCache._cache().delete(key)
+        transaction.on_commit(lambda: MembershipCache._cache().delete(key))
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-17 23:52
+
+from django.db import migrations, models
+
+
+def mark_existing_sent(apps, schema_editor):
+    # Invites created before the outbox were emailed inline.
+    apps.get_model('organizations', 'OrganizationInvite').objects.update(email_status='SENT')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0004_organizationinvite'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organizationinvite',
+            name='email_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='organizationinvite',
+            name='email_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='organizationinvite',
+            name='email_sent_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='organizationinvite',
+            name='email_status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('RETRYING', 'Retrying'), ('SENT', 'Sent'), ('FAILED', 'Failed')], default='PENDING', max_length=20),
+        ),
+        migrations.RunPython(mark_existing_sent, migrations.RunPython.noop),
+    ]
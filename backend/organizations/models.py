@@ -2,6 +2,7 @@
 Organization model for multi-tenancy.
 """
 from django.db import models
+from core.constants import EmailStatus
 from core.models import TimestampedModel
 
 
@@ -82,6 +83,11 @@ class OrganizationInvite(TimestampedModel):
         blank=True,
         related_name='used_invites'
     )
+    # Delivery of the invite email (see services/email_outbox.py)
+    email_status = models.CharField(max_length=20, choices=EmailStatus.choices, default=EmailStatus.PENDING)
+    email_attempts = models.PositiveSmallIntegerField(default=0)
+    email_sent_at = models.DateTimeField(null=True, blank=True)
+    email_error = models.TextField(blank=True)
 
     class Meta:
         ordering = ['-created_at']
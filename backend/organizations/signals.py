@@ -0,0 +1,17 @@
+"""
+Keep MembershipCache in sync with every membership change, including
+organization creation, joins, admin edits and cascading deletes.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .membership_cache import MembershipCache
+from .models import OrganizationMembership
+
+
+@receiver([post_save, post_delete], sender=OrganizationMembership)
+def invalidate_membership_cache(sender, instance, **kwargs):
+    MembershipCache.invalidate(instance.user_id)
+    if OrganizationMembership.user.is_cached(instance):
+        # Typically request.user, which may already hold a memo of the old roles.
+        MembershipCache.forget(instance.user)
@@ -0,0 +1,26 @@
+"""
+Reconcile the denormalized per-status task counters on projects.
+"""
+from django.core.management.base import BaseCommand
+
+from services.project_service import ProjectService
+
+
+class Command(BaseCommand):
+    help = "Recount tasks per status and fix any drifted Project task counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--project',
+            action='append',
+            dest='project_ids',
+            help="Only reconcile this project ID (may be repeated).",
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        fixed = ProjectService.reconcile_task_counters(
+            project_ids=options['project_ids'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {fixed} project(s)."))
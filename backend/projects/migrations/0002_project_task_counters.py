@@ -0,0 +1,57 @@
+# Generated by Django 4.2.30 on 2026-10-17 23:06
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+COUNTER_FIELDS = {
+    'TODO': 'todo_task_count',
+    'IN_PROGRESS': 'in_progress_task_count',
+    'IN_REVIEW': 'in_review_task_count',
+    'DONE': 'done_task_count',
+}
+
+
+def backfill_task_counters(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    Task = apps.get_model('tasks', 'Task')
+    rows = Task.objects.order_by().values('project_id', 'status').annotate(n=Count('id'))
+    counts = {}
+    for row in rows:
+        field = COUNTER_FIELDS.get(row['status'])
+        if field:
+            counts.setdefault(row['project_id'], {})[field] = row['n']
+    for project_id, fields in counts.items():
+        Project.objects.filter(id=project_id).update(**fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0001_initial'),
+        ('tasks', '0002_task_assignee_email_taskcomment_author_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='done_task_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='in_progress_task_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='in_review_task_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='todo_task_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_task_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 23:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_project_task_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['organization', '-created_at', 'id'], name='project_org_page_idx'),
+        ),
+    ]
@@ -3,7 +3,7 @@ Project model.
 """
 from django.db import models
 from core.models import TimestampedModel
-from core.constants import ProjectStatus
+from core.constants import ProjectStatus, TaskStatus
 from organizations.models import Organization
 
 
@@ -28,10 +28,27 @@ class Project(TimestampedModel):
     )
     due_date = models.DateField(null=True, blank=True)
 
+    # Denormalized task counters, maintained by TaskService, the task admin
+    # and a post_delete receiver (tasks/signals.py), and reconciled by the
+    # ``reconcile_task_counters`` management command.
+    todo_task_count = models.PositiveIntegerField(default=0)
+    in_progress_task_count = models.PositiveIntegerField(default=0)
+    in_review_task_count = models.PositiveIntegerField(default=0)
+    done_task_count = models.PositiveIntegerField(default=0)
+
+    TASK_COUNTER_FIELDS = {
+        TaskStatus.TODO: 'todo_task_count',
+        TaskStatus.IN_PROGRESS: 'in_progress_task_count',
+        TaskStatus.IN_REVIEW: 'in_review_task_count',
+        TaskStatus.DONE: 'done_task_count',
+    }
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['organization', 'status']),
+            # Keyset pagination over the default ordering.
+            models.Index(fields=['organization', '-created_at', 'id'], name='project_org_page_idx'),
         ]
 
     def __str__(self):
@@ -40,12 +57,12 @@ class Project(TimestampedModel):
     @property
     def total_tasks(self):
         """Get total number of tasks in this project."""
-        return self.tasks.count()
+        return sum(getattr(self, field) for field in self.TASK_COUNTER_FIELDS.values())
 
     @property
     def completed_tasks(self):
         """Get number of completed tasks."""
-        return self.tasks.filter(status='DONE').count()
+        return self.done_task_count
 
     @property
     def completion_percentage(self):
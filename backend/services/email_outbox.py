@@ -0,0 +1,145 @@
+"""
+Email outbox - invite emails are queued by the mutations and delivered by
+``manage.py process_email_outbox``.
+
+Jobs only carry invite ids; the worker reloads the invites, so a job that
+is delivered twice (e.g. after a worker crash) skips invites already marked
+SENT. All invites of a job are sent over one SMTP session. Failed sends
+are retried with exponential backoff until ``EMAIL_OUTBOX_MAX_ATTEMPTS``;
+the outcome is recorded on the invite.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.constants import EmailStatus
+from core.metrics import EMAIL_LATENCY
+from core.work_queue import get_queue
+from organizations.models import OrganizationInvite
+from .email_service import EmailService
+
+
+logger = logging.getLogger(__name__)
+
+QUEUE_NAME = 'email'
+INVITE_JOB = 'organization_invite'
+# Invites per job when re-queueing pending emails
+RECOVER_BATCH_SIZE = 100
+
+
+class EmailOutbox:
+    """Queue and deliver outbox emails."""
+
+    @staticmethod
+    def queue():
+        return get_queue(QUEUE_NAME)
+
+    @staticmethod
+    def enqueue_invite(invite: OrganizationInvite) -> None:
+        """Queue the invite email once the current transaction commits."""
+        EmailOutbox.enqueue_invites([invite])
+
+    @staticmethod
+    def enqueue_invites(invites: list[OrganizationInvite]) -> None:
+        """Queue the emails of ``invites`` as one job once the transaction commits."""
+        invite_ids = [str(invite.id) for invite in invites]
+        if invite_ids:
+            transaction.on_commit(lambda: EmailOutbox.queue().push({'kind': INVITE_JOB, 'invite_ids': invite_ids}))
+
+    @staticmethod
+    def retry_delay(attempts: int) -> float:
+        return min(
+            settings.EMAIL_OUTBOX_RETRY_BASE_DELAY * 2 ** (attempts - 1),
+            settings.EMAIL_OUTBOX_RETRY_MAX_DELAY,
+        )
+
+    @staticmethod
+    def process(job: dict, connection=None) -> bool:
+        """
+        Deliver one job over ``connection`` (a reusable email backend; a new
+        one is opened and closed when omitted). Returns False if a send
+        failed, so the caller can reset the connection.
+        """
+        if job.get('kind') != INVITE_JOB:
+            logger.warning('Dropping unknown outbox job %r', job)
+            return True
+        invites = list(
+            OrganizationInvite.objects.select_related('organization', 'invited_by')
+            .filter(id__in=job['invite_ids'])
+            .exclude(email_status__in=[EmailStatus.SENT, EmailStatus.FAILED])
+        )
+        if not invites:
+            return True
+
+        owns_connection = connection is None
+        if owns_connection:
+            connection = get_connection()
+        ok = True
+        sent = []
+        try:
+            for invite in invites:
+                email = EmailService.build_organization_invite(
+                    to_email=invite.email,
+                    organization_name=invite.organization.name,
+                    invite_code=str(invite.invite_code),
+                    invited_by_username=invite.invited_by.username,
+                )
+                started = time.perf_counter()
+                try:
+                    # One message per call, so a rejected address doesn't hide
+                    # the outcome of the others; the session stays open.
+                    connection.open()
+                    connection.send_messages([email])
+                except Exception as e:
+                    EMAIL_LATENCY.labels(INVITE_JOB, 'failed').observe(time.perf_counter() - started)
+                    EmailOutbox._record_failure(invite, e)
+                    ok = False
+                    # The session may be broken; the next send reconnects.
+                    connection.close()
+                else:
+                    EMAIL_LATENCY.labels(INVITE_JOB, 'sent').observe(time.perf_counter() - started)
+                    sent.append(invite.id)
+        finally:
+            if owns_connection:
+                connection.close()
+            OrganizationInvite.objects.filter(id__in=sent).update(
+                email_status=EmailStatus.SENT,
+                email_attempts=F('email_attempts') + 1,
+                email_sent_at=timezone.now(),
+                email_error='',
+            )
+        return ok
+
+    @staticmethod
+    def _record_failure(invite: OrganizationInvite, error: Exception) -> None:
+        attempts = invite.email_attempts + 1
+        retry = attempts < settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+        OrganizationInvite.objects.filter(id=invite.id).update(
+            email_status=EmailStatus.RETRYING if retry else EmailStatus.FAILED,
+            email_attempts=attempts,
+            email_error=str(error)[:1000],
+        )
+        if retry:
+            delay = EmailOutbox.retry_delay(attempts)
+            logger.warning('Invite email %s failed (attempt %d), retrying in %ss: %s', invite.id, attempts, delay, error)
+            EmailOutbox.queue().push({'kind': INVITE_JOB, 'invite_ids': [str(invite.id)]}, delay=delay)
+        else:
+            logger.error('Invite email %s failed after %d attempts: %s', invite.id, attempts, error)
+
+    @staticmethod
+    def recover() -> int:
+        """Re-queue invites whose email is still pending, e.g. after losing the queue."""
+        invite_ids = list(
+            OrganizationInvite.objects.filter(
+                email_status__in=[EmailStatus.PENDING, EmailStatus.RETRYING]
+            ).values_list('id', flat=True)
+        )
+        for start in range(0, len(invite_ids), RECOVER_BATCH_SIZE):
+            batch = [str(invite_id) for invite_id in invite_ids[start:start + RECOVER_BATCH_SIZE]]
+            EmailOutbox.queue().push({'kind': INVITE_JOB, 'invite_ids': batch})
+        return len(invite_ids)
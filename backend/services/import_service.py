@@ -0,0 +1,426 @@
+"""
+Import service - bulk import of projects, tasks and comments exported from
+other trackers.
+
+Records are streamed from CSV or JSON Lines, validated in chunks and
+appended to temporary staging tables (with ``COPY`` on Postgres). Once the
+whole file is staged, one ``INSERT ... SELECT`` per model moves the rows into
+place and resolves references between records in SQL, so memory use depends
+on the chunk size and not on the size of the file.
+
+Every record has a ``type``:
+
+* ``project``: ``key``, ``name``, ``description``, ``status``, ``due_date``
+* ``task``: ``key``, ``project`` (a project key), ``title``, ``description``,
+  ``status``, ``priority``, ``assignee_email``, ``due_date``
+* ``comment``: ``task`` (a task key), ``content``, ``author_name``,
+  ``author_email``
+
+All types accept an ISO ``created_at``. Keys are the ids of the source
+tracker and only need to be unique within the file. Tasks keep the order of
+the file on their board.
+"""
+import csv
+import io
+import json
+import logging
+import uuid
+from datetime import date
+from typing import IO, Callable, Iterator, NamedTuple, Optional
+from uuid import UUID
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import connection, models, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.constants import ProjectStatus, TaskPriority, TaskStatus
+from core.ranking import rank_at
+from organizations.models import Organization
+from projects.models import Project
+from tasks.models import Task, TaskComment
+
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('csv', 'jsonl')
+
+# Row errors kept in the report; later ones are only counted.
+MAX_REPORTED_ERRORS = 100
+
+# Staging table and columns per record type. Columns not listed in
+# STAGING_COLUMN_FIELDS are text.
+STAGING_TABLES = {
+    'project': ('import_project', ('line', 'key', 'id', 'created_at', 'name', 'description', 'status', 'due_date')),
+    'task': ('import_task', (
+        'line', 'key', 'project_key', 'id', 'created_at', 'title', 'description', 'status', 'priority',
+        'assignee_email', 'due_date', 'rank',
+    )),
+    'comment': ('import_comment', (
+        'line', 'task_key', 'id', 'created_at', 'content', 'author_name', 'author_email',
+    )),
+}
+STAGING_COLUMN_FIELDS = {
+    'line': models.IntegerField(),
+    'id': models.UUIDField(),
+    'created_at': models.DateTimeField(),
+    'due_date': models.DateField(),
+}
+
+INSERT_PROJECTS = f"""
+    INSERT INTO {Project._meta.db_table} (
+        id, created_at, updated_at, organization_id, name, description, status, due_date,
+        todo_task_count, in_progress_task_count, in_review_task_count, done_task_count
+    )
+    SELECT id, created_at, created_at, %s, name, description, status, due_date, 0, 0, 0, 0
+    FROM import_project
+"""
+INSERT_TASKS = f"""
+    INSERT INTO {Task._meta.db_table} (
+        id, created_at, updated_at, project_id, title, description, status, priority, assignee_email,
+        due_date, rank
+    )
+    SELECT t.id, t.created_at, t.created_at, p.id, t.title, t.description, t.status, t.priority,
+           t.assignee_email, t.due_date, t.rank
+    FROM import_task t JOIN import_project p ON p.key = t.project_key
+"""
+INSERT_COMMENTS = f"""
+    INSERT INTO {TaskComment._meta.db_table} (
+        id, created_at, updated_at, task_id, content, author_name, author_email
+    )
+    SELECT c.id, c.created_at, c.created_at, t.id, c.content, c.author_name, c.author_email
+    FROM import_comment c JOIN import_task t ON t.key = c.task_key
+    WHERE EXISTS (SELECT 1 FROM import_project p WHERE p.key = t.project_key)
+"""
+UNKNOWN_PROJECTS = """
+    SELECT {columns} FROM import_task t
+    WHERE NOT EXISTS (SELECT 1 FROM import_project p WHERE p.key = t.project_key)
+"""
+UNKNOWN_TASKS = """
+    SELECT {columns} FROM import_comment c
+    WHERE NOT EXISTS (
+        SELECT 1 FROM import_task t JOIN import_project p ON p.key = t.project_key WHERE t.key = c.task_key
+    )
+"""
+
+
+class ImportRowError(NamedTuple):
+    line: int
+    message: str
+
+
+class ImportReport:
+    """Running totals of an import; passed to the progress callback after each chunk."""
+
+    def __init__(self):
+        self.rows = 0
+        self.staged = {record_type: 0 for record_type in STAGING_TABLES}
+        self.imported = {record_type: 0 for record_type in STAGING_TABLES}
+        self.error_count = 0
+        self.errors: list[ImportRowError] = []
+
+    def add_error(self, line: int, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(ImportRowError(line, message))
+
+
+def _text(record: dict, name: str, required: bool = False, max_length: Optional[int] = None) -> str:
+    value = record.get(name)
+    value = '' if value is None else str(value).strip()
+    if required and not value:
+        raise ValidationError(f"{name} is required")
+    if max_length and len(value) > max_length:
+        raise ValidationError(f"{name} is longer than {max_length} characters")
+    return value
+
+
+def _choice(record: dict, name: str, choices, default: str) -> str:
+    raw = _text(record, name)
+    # Accept labels such as "In Progress" from other trackers.
+    value = raw.upper().replace(' ', '_').replace('-', '_') or default
+    if value not in choices.values:
+        raise ValidationError(f"Invalid {name}: {raw}")
+    return value
+
+
+def _date(record: dict, name: str) -> Optional[date]:
+    raw = _text(record, name)
+    if not raw:
+        return None
+    try:
+        return date.fromisoformat(raw)
+    except ValueError:
+        raise ValidationError(f"Invalid {name}: {raw}")
+
+
+def _created_at(record: dict, now):
+    raw = _text(record, 'created_at')
+    if not raw:
+        return now
+    try:
+        value = parse_datetime(raw)
+    except ValueError:
+        value = None
+    if value is None:
+        raise ValidationError(f"Invalid created_at: {raw}")
+    return timezone.make_aware(value) if timezone.is_naive(value) else value
+
+
+def _email(record: dict, name: str) -> str:
+    value = _text(record, name)
+    if value:
+        try:
+            validate_email(value)
+        except ValidationError:
+            raise ValidationError(f"Invalid {name}: {value}")
+    return value
+
+
+class ImportService:
+    @staticmethod
+    def detect_format(filename: str) -> Optional[str]:
+        extension = filename.rsplit('.', 1)[-1].lower()
+        return {'csv': 'csv', 'jsonl': 'jsonl', 'ndjson': 'jsonl'}.get(extension)
+
+    @staticmethod
+    def _records(file: IO[bytes], format: str) -> Iterator[tuple[int, Optional[dict], Optional[str]]]:
+        """Yield ``(line, record, error)`` for each record of ``file``."""
+        text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+        try:
+            if format == 'csv':
+                reader = csv.DictReader(text)
+                for record in reader:
+                    yield reader.line_num, record, None
+            else:
+                for line, raw in enumerate(text, 1):
+                    if not raw.strip():
+                        continue
+                    try:
+                        record = json.loads(raw)
+                    except ValueError as e:
+                        yield line, None, f"Invalid JSON: {e}"
+                        continue
+                    if isinstance(record, dict):
+                        yield line, record, None
+                    else:
+                        yield line, None, "Expected a JSON object"
+        except UnicodeDecodeError:
+            raise ValidationError("The file is not UTF-8 encoded")
+        finally:
+            # Leave the caller's file open.
+            text.detach()
+
+    @staticmethod
+    def _staging_row(line: int, record: dict, report: ImportReport, now) -> tuple[str, tuple]:
+        record_type = _text(record, 'type').lower()
+        if record_type == 'project':
+            return record_type, (
+                line,
+                _text(record, 'key', required=True),
+                uuid.uuid4(),
+                _created_at(record, now),
+                _text(record, 'name', required=True, max_length=255),
+                _text(record, 'description'),
+                _choice(record, 'status', ProjectStatus, ProjectStatus.PLANNING),
+                _date(record, 'due_date'),
+            )
+        if record_type == 'task':
+            return record_type, (
+                line,
+                _text(record, 'key', required=True),
+                _text(record, 'project', required=True),
+                uuid.uuid4(),
+                _created_at(record, now),
+                _text(record, 'title', required=True, max_length=255),
+                _text(record, 'description'),
+                _choice(record, 'status', TaskStatus, TaskStatus.TODO),
+                _choice(record, 'priority', TaskPriority, TaskPriority.MEDIUM),
+                _email(record, 'assignee_email'),
+                _date(record, 'due_date'),
+                # Increasing in file order, so every project keeps the file's order.
+                rank_at(report.staged['task']),
+            )
+        if record_type == 'comment':
+            return record_type, (
+                line,
+                _text(record, 'task', required=True),
+                uuid.uuid4(),
+                _created_at(record, now),
+                _text(record, 'content', required=True),
+                _text(record, 'author_name', max_length=100) or 'Anonymous',
+                _email(record, 'author_email'),
+            )
+        raise ValidationError(f"Unknown record type: {record_type or '(missing)'}")
+
+    @staticmethod
+    def _create_staging_tables(cursor) -> None:
+        for table, columns in STAGING_TABLES.values():
+            definitions = ', '.join(
+                f"{column} {STAGING_COLUMN_FIELDS[column].db_type(connection) if column in STAGING_COLUMN_FIELDS else 'text'}"
+                for column in columns
+            )
+            cursor.execute(f"CREATE TEMPORARY TABLE {table} ({definitions})")
+
+    @staticmethod
+    def _prepare(value):
+        if isinstance(value, UUID):
+            return STAGING_COLUMN_FIELDS['id'].get_db_prep_value(value, connection)
+        if isinstance(value, date):
+            field = 'due_date' if type(value) is date else 'created_at'
+            return STAGING_COLUMN_FIELDS[field].get_db_prep_value(value, connection, prepared=True)
+        return value
+
+    @staticmethod
+    def _stage(cursor, record_type: str, rows: list[tuple]) -> None:
+        table, columns = STAGING_TABLES[record_type]
+        if connection.vendor == 'postgresql':
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            buffer.seek(0)
+            # Empty text stays an empty string; only due_date may be NULL.
+            not_null = ', '.join(column for column in columns if column != 'due_date')
+            cursor.copy_expert(
+                f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, FORCE_NOT_NULL ({not_null}))",
+                buffer,
+            )
+        else:
+            cursor.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})",
+                [[ImportService._prepare(value) for value in row] for row in rows],
+            )
+
+    @staticmethod
+    def _stage_chunk(cursor, chunk: list, report: ImportReport, now) -> None:
+        rows = {record_type: [] for record_type in STAGING_TABLES}
+        for line, record, error in chunk:
+            report.rows += 1
+            if error is None:
+                try:
+                    record_type, row = ImportService._staging_row(line, record, report, now)
+                except ValidationError as e:
+                    error = e.messages[0]
+                else:
+                    rows[record_type].append(row)
+                    report.staged[record_type] += 1
+            if error is not None:
+                report.add_error(line, error)
+        for record_type, staged in rows.items():
+            if staged:
+                ImportService._stage(cursor, record_type, staged)
+
+    @staticmethod
+    def _check_duplicate_keys(cursor) -> None:
+        for record_type in ('project', 'task'):
+            table = STAGING_TABLES[record_type][0]
+            cursor.execute(
+                f"SELECT key, MIN(line) FROM {table} GROUP BY key HAVING COUNT(*) > 1 ORDER BY MIN(line)"
+            )
+            duplicate = cursor.fetchone()
+            if duplicate:
+                raise ValidationError(f"Duplicate {record_type} key {duplicate[0]!r} (first on line {duplicate[1]})")
+
+    @staticmethod
+    def _report_unresolved(cursor, report: ImportReport) -> None:
+        for unresolved, line_column, key_column, label in (
+            (UNKNOWN_PROJECTS, 't.line', 't.project_key', 'project'),
+            (UNKNOWN_TASKS, 'c.line', 'c.task_key', 'task'),
+        ):
+            cursor.execute(unresolved.format(columns='COUNT(*)'))
+            count = cursor.fetchone()[0]
+            if not count:
+                continue
+            cursor.execute(
+                unresolved.format(columns=f'{line_column}, {key_column}') + f" ORDER BY {line_column} LIMIT %s",
+                [max(MAX_REPORTED_ERRORS - len(report.errors), 0)],
+            )
+            rows = cursor.fetchall()
+            for line, key in rows:
+                report.add_error(line, f"Unknown {label}: {key}")
+            report.error_count += count - len(rows)
+
+    @staticmethod
+    def _refresh_task_counters() -> None:
+        """Set the per-status task counters of the imported projects."""
+        counts = Task.objects.filter(project=OuterRef('pk')).order_by().values('project')
+        Project.objects.filter(id__in=RawSQL('SELECT id FROM import_project', [])).update(**{
+            field: Coalesce(Subquery(counts.filter(status=status).annotate(n=Count('id')).values('n')), 0)
+            for status, field in Project.TASK_COUNTER_FIELDS.items()
+        })
+
+    @staticmethod
+    def import_file(
+        organization_id: UUID,
+        file: IO[bytes],
+        format: str,
+        chunk_size: Optional[int] = None,
+        progress: Optional[Callable[[ImportReport], None]] = None,
+    ) -> ImportReport:
+        """
+        Import the projects, tasks and comments of ``file`` into an
+        organization in one transaction.
+
+        Invalid rows and references to unknown keys are reported and skipped.
+        Duplicate keys abort the import with a ValidationError.
+        """
+        if format not in FORMATS:
+            raise ValidationError(f"Unsupported format: {format}")
+        organization_id = Project._meta.get_field('organization').to_python(organization_id)
+        if not Organization.objects.filter(id=organization_id).exists():
+            raise ValidationError("Organization not found")
+        chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+
+        report = ImportReport()
+        now = timezone.now()
+        with transaction.atomic(), connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # Lasts until the transaction ends, overriding the cost-based
+                # timeout the GraphQL view sets for the importData mutation.
+                cursor.execute("SET LOCAL statement_timeout = %s", [settings.IMPORT_STATEMENT_TIMEOUT_MS])
+            # Temporary tables created in the transaction vanish if it rolls back.
+            ImportService._create_staging_tables(cursor)
+            chunk = []
+            for item in ImportService._records(file, format):
+                chunk.append(item)
+                if len(chunk) >= chunk_size:
+                    ImportService._stage_chunk(cursor, chunk, report, now)
+                    chunk = []
+                    if progress:
+                        progress(report)
+            if chunk:
+                ImportService._stage_chunk(cursor, chunk, report, now)
+                if progress:
+                    progress(report)
+
+            ImportService._check_duplicate_keys(cursor)
+            cursor.execute("CREATE INDEX import_project_key ON import_project (key)")
+            cursor.execute("CREATE INDEX import_task_key ON import_task (key)")
+            if connection.vendor == 'postgresql':
+                # Temporary tables are never auto-analyzed; give the planner row counts.
+                cursor.execute("ANALYZE import_project, import_task, import_comment")
+
+            organization = Project._meta.get_field('organization').get_db_prep_value(organization_id, connection)
+            for record_type, sql, params in (
+                ('project', INSERT_PROJECTS, [organization]),
+                ('task', INSERT_TASKS, []),
+                ('comment', INSERT_COMMENTS, []),
+            ):
+                cursor.execute(sql, params)
+                report.imported[record_type] = cursor.rowcount
+            ImportService._report_unresolved(cursor, report)
+            ImportService._refresh_task_counters()
+
+            for table, _columns in STAGING_TABLES.values():
+                cursor.execute(f"DROP TABLE {table}")
+
+        report.errors.sort()
+        logger.info(
+            "Imported %s into organization %s (%d rows, %d errors)",
+            report.imported, organization_id, report.rows, report.error_count,
+        )
+        return report
@@ -1,9 +1,31 @@
+from datetime import timedelta
+from typing import NamedTuple, Optional
+from uuid import UUID
+
+from django.utils import timezone
 from django.utils.text import slugify
 from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
 from django.contrib.auth.models import User
-from organizations.models import Organization, OrganizationMembership
+from django.db import transaction
+from django.db.models import CharField, Value
+from django.db.models.functions import Lower
+from core.constants import InviteOutcome
+from organizations.models import Organization, OrganizationInvite, OrganizationMembership
+from .email_outbox import EmailOutbox
+
+
+class InviteResult(NamedTuple):
+    """Outcome for one address of a bulk invite, in input order."""
+    email: str
+    outcome: str
+    invite: Optional[OrganizationInvite] = None
+
 
 class OrganizationService:
+    MAX_BULK_INVITES = 500
+    INVITE_LIFETIME = timedelta(days=7)
+
     @staticmethod
     def create_organization(name: str, user: User, description: str = "") -> Organization:
         """
@@ -37,3 +59,80 @@ class OrganizationService:
         )
 
         return organization
+
+    @staticmethod
+    def _existing_addresses(organization_id: UUID, addresses: list[str]) -> dict[str, str]:
+        """
+        Return ``{lowercased email: outcome}`` for addresses that already belong
+        to a member or have an open invite, in one query.
+        """
+        members = OrganizationMembership.objects.filter(organization_id=organization_id).annotate(
+            address=Lower('user__email'),
+            outcome=Value(InviteOutcome.ALREADY_MEMBER, output_field=CharField()),
+        ).filter(address__in=addresses).order_by().values_list('address', 'outcome')
+        invites = OrganizationInvite.objects.filter(
+            organization_id=organization_id, used=False, expires_at__gt=timezone.now()
+        ).annotate(
+            address=Lower('email'),
+            outcome=Value(InviteOutcome.ALREADY_INVITED, output_field=CharField()),
+        ).filter(address__in=addresses).order_by().values_list('address', 'outcome')
+
+        existing = {}
+        for address, outcome in members.union(invites, all=True):
+            if outcome == InviteOutcome.ALREADY_MEMBER or address not in existing:
+                existing[address] = outcome
+        return existing
+
+    @staticmethod
+    def invite_many(organization_id: UUID, invited_by: User, emails: list[str]) -> list[InviteResult]:
+        """
+        Invite many addresses to an organization.
+
+        Addresses of members, with an open invite, repeated or malformed are
+        reported and skipped. The others get invites created with one
+        ``bulk_create`` and their emails are queued as one outbox job.
+        """
+        if not emails:
+            raise ValidationError("At least one email is required")
+        if len(emails) > OrganizationService.MAX_BULK_INVITES:
+            raise ValidationError(f"Bulk invites are limited to {OrganizationService.MAX_BULK_INVITES} emails")
+
+        addresses = []
+        for raw in emails:
+            email = raw.strip()
+            try:
+                validate_email(email)
+            except ValidationError:
+                email = None
+            addresses.append((raw, email))
+
+        with transaction.atomic():
+            existing = OrganizationService._existing_addresses(
+                organization_id, [email.lower() for _, email in addresses if email]
+            )
+            expires_at = timezone.now() + OrganizationService.INVITE_LIFETIME
+            results = []
+            invites = []
+            seen = set()
+            for raw, email in addresses:
+                if email is None:
+                    results.append(InviteResult(raw, InviteOutcome.INVALID_EMAIL))
+                elif email.lower() in seen:
+                    results.append(InviteResult(email, InviteOutcome.DUPLICATE))
+                elif email.lower() in existing:
+                    seen.add(email.lower())
+                    results.append(InviteResult(email, existing[email.lower()]))
+                else:
+                    seen.add(email.lower())
+                    invite = OrganizationInvite(
+                        organization_id=organization_id,
+                        email=email,
+                        invited_by=invited_by,
+                        expires_at=expires_at,
+                    )
+                    invites.append(invite)
+                    results.append(InviteResult(email, InviteOutcome.INVITED, invite))
+
+            OrganizationInvite.objects.bulk_create(invites)
+            EmailOutbox.enqueue_invites(invites)
+        return results
@@ -1,22 +1,43 @@
 """
 Project service - business logic for project operations.
 """
-from typing import Optional
+from typing import Iterable, Optional
 from uuid import UUID
 from django.core.exceptions import ValidationError, PermissionDenied
+from django.db import transaction
+from django.db.models import Count, QuerySet
 
 from organizations.models import Organization
 from projects.models import Project
 from core.constants import ProjectStatus
+from core.pagination import Page, keyset_paginate
+from tasks.models import Task
 
 
 class ProjectService:
     """Service layer for project operations."""
 
     @staticmethod
-    def get_projects_for_organization(organization_id: UUID) -> list[Project]:
-        """Get all projects for an organization."""
-        return list(Project.objects.filter(organization_id=organization_id))
+    def get_projects_for_organization(organization_id: UUID) -> QuerySet[Project]:
+        """
+        Get all projects for an organization.
+        Returns a lazy queryset so callers can narrow columns and relations.
+        """
+        return Project.objects.filter(organization_id=organization_id)
+
+    @staticmethod
+    def get_projects_page(
+        organization_id: UUID,
+        first: Optional[int] = None,
+        after: Optional[str] = None
+    ) -> Page:
+        """Get one keyset-paginated page of an organization's projects."""
+        return keyset_paginate(
+            Project.objects.filter(organization_id=organization_id),
+            Project._meta.ordering,
+            first=first,
+            after=after,
+        )
 
     @staticmethod
     def get_project(project_id: UUID, organization_id: UUID) -> Project:
@@ -34,6 +55,19 @@ class ProjectService:
         
         return project
 
+    @staticmethod
+    async def aget_project(project_id: UUID, organization_id: UUID) -> Project:
+        """Async variant of ``get_project`` for the async GraphQL schema."""
+        try:
+            project = await Project.objects.select_related('organization').aget(id=project_id)
+        except Project.DoesNotExist:
+            raise ValidationError("Project not found")
+
+        if project.organization_id != organization_id:
+            raise PermissionDenied("Access denied to this project")
+
+        return project
+
     @staticmethod
     def create_project(
         organization_id: UUID,
@@ -91,13 +125,82 @@ class ProjectService:
         project.save()
         return project
 
+    @staticmethod
+    def build_statistics(total_tasks: int, completed_tasks: int) -> dict:
+        """Build the statistics dict from raw task counts."""
+        return {
+            'total_tasks': total_tasks,
+            'completed_tasks': completed_tasks,
+            'completion_percentage': (
+                round((completed_tasks / total_tasks) * 100, 1) if total_tasks else 0
+            ),
+            'pending_tasks': total_tasks - completed_tasks,
+        }
+
+    @staticmethod
+    def count_tasks_by_status(project_ids: Optional[Iterable[UUID]] = None) -> dict[UUID, dict]:
+        """
+        Count tasks per project and status with a single grouped query.
+        Returns {project_id: {counter_field: count}}.
+        """
+        tasks = Task.objects.order_by()
+        if project_ids is not None:
+            tasks = tasks.filter(project_id__in=list(project_ids))
+        counts = {}
+        for row in tasks.values('project_id', 'status').annotate(n=Count('id')):
+            field = Project.TASK_COUNTER_FIELDS.get(row['status'])
+            if field:
+                counts.setdefault(row['project_id'], {})[field] = row['n']
+        return counts
+
+    @staticmethod
+    def reconcile_task_counters(
+        project_ids: Optional[Iterable[UUID]] = None,
+        batch_size: int = 500
+    ) -> int:
+        """
+        Reset the denormalized task counters to the real counts.
+        Returns the number of projects whose counters were corrected.
+
+        Each batch of projects is locked before its tasks are counted, so a
+        task write that adjusts the counters of a locked project waits until
+        the corrected counts are committed and then applies its delta.
+        """
+        fields = list(Project.TASK_COUNTER_FIELDS.values())
+        projects = Project.objects.order_by('id')
+        if project_ids is not None:
+            projects = projects.filter(id__in=list(project_ids))
+        ids = list(projects.values_list('id', flat=True))
+
+        fixed = 0
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            with transaction.atomic():
+                # Lock first: the counts below must not miss a task committed
+                # by a writer that already adjusted these counters.
+                locked = list(
+                    Project.objects.select_for_update().only('id', *fields).filter(id__in=batch).order_by('id')
+                )
+                counts = ProjectService.count_tasks_by_status(batch)
+                stale = []
+                for project in locked:
+                    actual = counts.get(project.id, {})
+                    if any(getattr(project, field) != actual.get(field, 0) for field in fields):
+                        for field in fields:
+                            setattr(project, field, actual.get(field, 0))
+                        stale.append(project)
+                Project.objects.bulk_update(stale, fields)
+            fixed += len(stale)
+        return fixed
+
     @staticmethod
     def get_project_statistics(project_id: UUID, organization_id: UUID) -> dict:
         """Get statistics for a project."""
         project = ProjectService.get_project(project_id, organization_id)
-        return {
-            'total_tasks': project.total_tasks,
-            'completed_tasks': project.completed_tasks,
-            'completion_percentage': project.completion_percentage,
-            'pending_tasks': project.total_tasks - project.completed_tasks,
-        }
+        return ProjectService.build_statistics(project.total_tasks, project.completed_tasks)
+
+    @staticmethod
+    async def aget_project_statistics(project_id: UUID, organization_id: UUID) -> dict:
+        """Async variant of ``get_project_statistics``."""
+        project = await ProjectService.aget_project(project_id, organization_id)
+        return ProjectService.build_statistics(project.total_tasks, project.completed_tasks)
@@ -0,0 +1,177 @@
+"""
+Search service - full-text search over an organization's tasks and comments.
+
+On Postgres, tasks and comments carry trigger-maintained ``search_vector``
+columns (title A, description B, comment content C) with GIN indexes, and
+results are ordered by ``ts_rank``. Other databases fall back to an
+unranked substring match so development setups keep working.
+"""
+import html
+import re
+from collections import defaultdict
+from typing import NamedTuple, Optional
+from uuid import UUID
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import F, FloatField, OuterRef, Q, Subquery, Value, Window
+from django.db.models.functions import Cast, Coalesce, Greatest, RowNumber
+
+from core.pagination import Page, keyset_paginate
+from tasks.models import Task, TaskComment
+
+
+# Text search configuration; must match the triggers in tasks migration 0005.
+SEARCH_CONFIG = 'english'
+
+# Highlighted terms are wrapped in these markers; the text is HTML-escaped.
+START_SEL = '<mark>'
+STOP_SEL = '</mark>'
+# Matches are first delimited with these control characters so the text can
+# be escaped before the markers are inserted.
+_START = '\x02'
+_STOP = '\x03'
+
+
+def _markup(text: str) -> str:
+    """Escape ``text`` and turn the match delimiters into the markers."""
+    return html.escape(text).replace(_START, START_SEL).replace(_STOP, STOP_SEL)
+
+
+class CommentHit(NamedTuple):
+    """A comment matching the search, with its highlighted content."""
+    comment: TaskComment
+    highlight: str
+
+
+class SearchService:
+    """Service layer for search."""
+
+    MAX_QUERY_LENGTH = 200
+    # Matching comments returned per task.
+    MAX_COMMENT_HITS = 3
+
+    @staticmethod
+    def search_tasks(
+        organization_id: UUID,
+        text: str,
+        first: Optional[int] = None,
+        after: Optional[str] = None
+    ) -> Page:
+        """
+        Get one page of an organization's tasks matching ``text`` in their
+        title, description or comments, best match first.
+
+        Each task gets ``search_rank``, ``title_highlight``,
+        ``description_highlight`` and ``comment_hits`` attributes.
+        """
+        text = (text or '').strip()
+        if not text:
+            raise ValidationError("Search query is required")
+        if len(text) > SearchService.MAX_QUERY_LENGTH:
+            raise ValidationError(
+                f"Search query must be at most {SearchService.MAX_QUERY_LENGTH} characters"
+            )
+
+        tasks = Task.objects.filter(project__organization_id=organization_id).defer('search_vector')
+        comments = TaskComment.objects.filter(task__project__organization_id=organization_id)
+        if connection.vendor == 'postgresql':
+            query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+            page = SearchService._ranked_page(tasks, comments, query, first, after)
+            SearchService._highlight(page.items, query)
+        else:
+            page = SearchService._substring_page(tasks, comments, text, first, after)
+            SearchService._highlight_substring(page.items, text)
+        return page
+
+    @staticmethod
+    def _ranked_page(tasks, comments, query, first, after) -> Page:
+        # Both sides are GIN index scans; a task ranks by its own match or
+        # its best matching comment, whichever is higher.
+        best_comment_rank = Subquery(
+            TaskComment.objects.filter(task_id=OuterRef('pk'), search_vector=query)
+            .annotate(rank=SearchRank(F('search_vector'), query))
+            .order_by('-rank')
+            .values('rank')[:1],
+            output_field=FloatField(),
+        )
+        matches = tasks.filter(
+            Q(search_vector=query) | Q(id__in=comments.filter(search_vector=query).values('task_id'))
+        ).annotate(
+            # ts_rank is real; as float8 the rank round-trips exactly through
+            # the cursor, so keyset comparisons on it match the boundary row.
+            search_rank=Cast(
+                Greatest(
+                    Coalesce(SearchRank(F('search_vector'), query), Value(0.0)),
+                    Coalesce(best_comment_rank, Value(0.0)),
+                ),
+                FloatField(),
+            )
+        )
+        return keyset_paginate(matches, ['-search_rank', 'id'], first=first, after=after)
+
+    @staticmethod
+    def _highlight(tasks, query) -> None:
+        """Attach headlines and the best matching comments to a page of tasks."""
+        ids = [task.id for task in tasks]
+        options = {'config': SEARCH_CONFIG, 'start_sel': _START, 'stop_sel': _STOP}
+        headlines = {
+            task_id: (title, description)
+            for task_id, title, description in Task.objects.filter(id__in=ids).annotate(
+                title_headline=SearchHeadline('title', query, highlight_all=True, **options),
+                description_headline=SearchHeadline('description', query, max_fragments=2, **options),
+            ).values_list('id', 'title_headline', 'description_headline')
+        }
+
+        # Pick the top comments per task first so headlines are only
+        # computed for the comments that are returned.
+        top_comment_ids = (
+            TaskComment.objects.filter(task_id__in=ids, search_vector=query)
+            .annotate(position=Window(
+                RowNumber(),
+                partition_by=[F('task_id')],
+                order_by=[SearchRank(F('search_vector'), query).desc(), F('id').asc()],
+            ))
+            .filter(position__lte=SearchService.MAX_COMMENT_HITS)
+            .values_list('id', flat=True)
+        )
+        hits = defaultdict(list)
+        for comment in TaskComment.objects.filter(id__in=list(top_comment_ids)).annotate(
+            rank=SearchRank(F('search_vector'), query),
+            headline=SearchHeadline('content', query, max_fragments=2, **options),
+        ).order_by('-rank', 'id'):
+            hits[comment.task_id].append(CommentHit(comment, _markup(comment.headline)))
+
+        for task in tasks:
+            title, description = headlines.get(task.id, (task.title, task.description))
+            task.title_highlight = _markup(title)
+            task.description_highlight = _markup(description)
+            task.comment_hits = hits[task.id]
+
+    @staticmethod
+    def _substring_page(tasks, comments, text, first, after) -> Page:
+        matches = tasks.filter(
+            Q(title__icontains=text)
+            | Q(description__icontains=text)
+            | Q(id__in=comments.filter(content__icontains=text).values('task_id'))
+        ).annotate(search_rank=Value(0.0, output_field=FloatField()))
+        return keyset_paginate(matches, ['-search_rank', 'id'], first=first, after=after)
+
+    @staticmethod
+    def _highlight_substring(tasks, text) -> None:
+        pattern = re.compile(re.escape(text), re.IGNORECASE)
+
+        def mark(value):
+            return _markup(pattern.sub(lambda match: f'{_START}{match.group()}{_STOP}', value))
+
+        hits = defaultdict(list)
+        for comment in TaskComment.objects.filter(
+            task_id__in=[task.id for task in tasks], content__icontains=text
+        ).order_by('-created_at', 'id'):
+            if len(hits[comment.task_id]) < SearchService.MAX_COMMENT_HITS:
+                hits[comment.task_id].append(CommentHit(comment, mark(comment.content)))
+
+        for task in tasks:
+            task.title_highlight = mark(task.title)
+            task.description_highlight = mark(task.description)
+            task.comment_hits = hits[task.id]
@@ -0,0 +1,87 @@
+"""
+Task event service - fan-out of task and comment changes to subscribers.
+
+Events are published to a per-project channel-layer group (Redis pub/sub in
+production, the in-memory layer in tests) once the writing transaction
+commits, and consumed by the GraphQL subscriptions in api/subscriptions.py.
+"""
+import logging
+from uuid import UUID
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core import serializers
+from django.db import transaction
+from django.db.models import Model
+
+
+logger = logging.getLogger(__name__)
+
+
+class TaskEventStream:
+    """Async iterator over the events of one project, joined eagerly."""
+
+    def __init__(self, layer, group, channel, events):
+        self.layer = layer
+        self.group = group
+        self.channel = channel
+        self.events = events
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            message = await self.layer.receive(self.channel)
+            if message['event'] in self.events:
+                return next(serializers.deserialize('json', message['data'])).object
+
+    async def aclose(self):
+        await self.layer.group_discard(self.group, self.channel)
+
+
+class TaskEventService:
+    """Publishes and subscribes to per-project task events."""
+
+    TASK_CREATED = 'task_created'
+    TASK_UPDATED = 'task_updated'
+    # A task moved to another project; sent to the project it left.
+    TASK_REMOVED = 'task_removed'
+    COMMENT_ADDED = 'comment_added'
+
+    @staticmethod
+    def group_name(project_id: UUID) -> str:
+        return f'project.{project_id}.tasks'
+
+    @staticmethod
+    def publish(project_id: UUID, event: str, instance: Model) -> None:
+        """Send ``instance`` to the project's subscribers after the current transaction commits."""
+        message = {
+            'type': 'task.event',
+            'event': event,
+            # Deferred columns (search_vector) would cost a query each and are
+            # not part of the event.
+            'data': serializers.serialize('json', [instance], fields=[
+                field.name for field in instance._meta.concrete_fields
+                if field.attname not in instance.get_deferred_fields()
+            ]),
+        }
+        group = TaskEventService.group_name(project_id)
+
+        def send():
+            try:
+                async_to_sync(get_channel_layer().group_send)(group, message)
+            except Exception:
+                # The write already committed; subscribers can refetch.
+                logger.exception("Failed to publish %s to %s", event, group)
+
+        transaction.on_commit(send)
+
+    @staticmethod
+    async def subscribe(project_id: UUID, *events: str) -> TaskEventStream:
+        """Join the project's group and return a stream of the given events."""
+        layer = get_channel_layer()
+        group = TaskEventService.group_name(project_id)
+        channel = await layer.new_channel()
+        await layer.group_add(group, channel)
+        return TaskEventStream(layer, group, channel, set(events))
@@ -1,18 +1,80 @@
 """
 Task service - business logic for task operations.
 """
-from typing import Optional
+import logging
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import NamedTuple, Optional
 from uuid import UUID
+from django.conf import settings
 from django.core.exceptions import ValidationError, PermissionDenied
+from django.db import connections, transaction
+from django.db.models import Case, F, IntegerField, Q, QuerySet, Value, When
+from django.db.models.functions import Lower
+from django.utils import timezone
 
 from tasks.models import Task, TaskComment
 from projects.models import Project
-from core.constants import TaskStatus, TaskPriority
+from core.constants import TaskStatus, TaskPriority, TaskSort
+from core.pagination import Page, keyset_paginate
+from core.ranking import rank_between, rank_sequence
+from services.task_event_service import TaskEventService
+
+
+logger = logging.getLogger(__name__)
+
+# Rebalances run off the request thread, one at a time.
+_rebalancer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rank-rebalance')
+
+
+def _rebalance_in_background(project_id: UUID) -> None:
+    try:
+        TaskService.rebalance_ranks(project_id)
+    except Exception:
+        logger.exception("Failed to rebalance task ranks of project %s", project_id)
+    finally:
+        connections.close_all()
+
+
+class BulkItemResult(NamedTuple):
+    """Outcome of one item of a bulk operation: the task, or why it failed."""
+    task: Optional[Task] = None
+    error: Optional[str] = None
+    # Set by bulk_move_tasks for tasks that changed project.
+    moved_from: Optional[UUID] = None
+
+
+class TaskFilters(NamedTuple):
+    """Filters of the tasks query; every set field narrows the result."""
+    status: Optional[list[str]] = None
+    priority: Optional[list[str]] = None
+    assignee_email: Optional[str] = None
+    due_before: Optional[date] = None
+    due_after: Optional[date] = None
+    # Due before today and not done.
+    overdue: Optional[bool] = None
+
+
+# Orderings of TaskSort; ``rank`` or ``id`` make each one total.
+TASK_SORT_ORDERINGS = {
+    TaskSort.RANK: Task._meta.ordering,
+    TaskSort.DUE_DATE: [F('due_date').asc(nulls_last=True), 'rank'],
+    TaskSort.PRIORITY: ['priority_order', 'rank'],
+    TaskSort.CREATED_AT: ['-created_at', 'id'],
+    TaskSort.UPDATED_AT: ['-updated_at', 'id'],
+    TaskSort.TITLE: ['title', 'id'],
+}
+
+PRIORITY_ORDER = [TaskPriority.URGENT, TaskPriority.HIGH, TaskPriority.MEDIUM, TaskPriority.LOW]
 
 
 class TaskService:
     """Service layer for task operations."""
 
+    # Maximum number of items in one bulk operation.
+    MAX_BULK_SIZE = 500
+
     @staticmethod
     def _verify_project_access(project_id: UUID, organization_id: UUID) -> Project:
         """Verify project belongs to organization and return it."""
@@ -40,16 +102,133 @@ class TaskService:
         return task
 
     @staticmethod
-    def get_tasks_for_project(project_id: UUID, organization_id: UUID) -> list[Task]:
-        """Get all tasks for a project."""
+    async def _averify_project_access(project_id: UUID, organization_id: UUID) -> Project:
+        """Async variant of ``_verify_project_access``."""
+        try:
+            project = await Project.objects.select_related('organization').aget(id=project_id)
+        except Project.DoesNotExist:
+            raise ValidationError("Project not found")
+
+        if project.organization_id != organization_id:
+            raise PermissionDenied("Access denied to this project")
+
+        return project
+
+    @staticmethod
+    async def _averify_task_access(task_id: UUID, organization_id: UUID) -> Task:
+        """Async variant of ``_verify_task_access``."""
+        try:
+            task = await Task.objects.select_related('project__organization').aget(id=task_id)
+        except Task.DoesNotExist:
+            raise ValidationError("Task not found")
+
+        if task.project.organization_id != organization_id:
+            raise PermissionDenied("Access denied to this task")
+
+        return task
+
+    @staticmethod
+    def _adjust_task_counters(project_id: UUID, deltas: dict[str, int]) -> None:
+        """Atomically shift the project's per-status task counters."""
+        updates = {
+            Project.TASK_COUNTER_FIELDS[status]: F(Project.TASK_COUNTER_FIELDS[status]) + delta
+            for status, delta in deltas.items()
+            if delta
+        }
+        if updates:
+            Project.objects.filter(id=project_id).update(**updates)
+
+    @staticmethod
+    def filter_tasks(queryset: QuerySet[Task], filters: TaskFilters) -> QuerySet[Task]:
+        """
+        Apply ``filters`` in SQL. Combined with a project filter each one is
+        backed by an index declared on ``Task``.
+        """
+        if filters.status:
+            queryset = queryset.filter(status__in=filters.status)
+        if filters.priority:
+            queryset = queryset.filter(priority__in=filters.priority)
+        if filters.assignee_email:
+            queryset = queryset.alias(assignee=Lower('assignee_email')).filter(
+                assignee=filters.assignee_email.strip().lower()
+            )
+        if filters.due_before:
+            queryset = queryset.filter(due_date__lte=filters.due_before)
+        if filters.due_after:
+            queryset = queryset.filter(due_date__gte=filters.due_after)
+        if filters.overdue is not None:
+            # Written as NOT (status = 'DONE') to match task_project_open_due_idx.
+            overdue = Q(due_date__lt=timezone.localdate()) & ~Q(status=TaskStatus.DONE)
+            queryset = queryset.filter(overdue if filters.overdue else ~overdue)
+        return queryset
+
+    @staticmethod
+    def sort_tasks(queryset: QuerySet[Task], sort_by: Optional[str]) -> QuerySet[Task]:
+        """Order ``queryset`` by a TaskSort value (board order by default)."""
+        if sort_by == TaskSort.PRIORITY:
+            queryset = queryset.alias(priority_order=Case(
+                *(When(priority=priority, then=Value(index)) for index, priority in enumerate(PRIORITY_ORDER)),
+                output_field=IntegerField(),
+            ))
+        return queryset.order_by(*TASK_SORT_ORDERINGS[sort_by or TaskSort.RANK])
+
+    @staticmethod
+    def get_tasks_for_project(
+        project_id: UUID,
+        organization_id: UUID,
+        filters: Optional[TaskFilters] = None,
+        sort_by: Optional[str] = None
+    ) -> QuerySet[Task]:
+        """
+        Get a project's tasks, optionally filtered and sorted.
+        Returns a lazy queryset so callers can narrow columns and relations.
+        """
+        TaskService._verify_project_access(project_id, organization_id)
+        return TaskService.sort_tasks(
+            TaskService.filter_tasks(Task.objects.filter(project_id=project_id), filters or TaskFilters()),
+            sort_by,
+        )
+
+    @staticmethod
+    async def aget_tasks_for_project(
+        project_id: UUID,
+        organization_id: UUID,
+        filters: Optional[TaskFilters] = None,
+        sort_by: Optional[str] = None
+    ) -> QuerySet[Task]:
+        """Async variant of ``get_tasks_for_project``; the queryset stays lazy."""
+        await TaskService._averify_project_access(project_id, organization_id)
+        return TaskService.sort_tasks(
+            TaskService.filter_tasks(Task.objects.filter(project_id=project_id), filters or TaskFilters()),
+            sort_by,
+        )
+
+    @staticmethod
+    def get_tasks_page(
+        project_id: UUID,
+        organization_id: UUID,
+        first: Optional[int] = None,
+        after: Optional[str] = None
+    ) -> Page:
+        """Get one keyset-paginated page of a project's tasks."""
         TaskService._verify_project_access(project_id, organization_id)
-        return list(Task.objects.filter(project_id=project_id))
+        return keyset_paginate(
+            Task.objects.filter(project_id=project_id),
+            Task._meta.ordering,
+            first=first,
+            after=after,
+        )
 
     @staticmethod
     def get_task(task_id: UUID, organization_id: UUID) -> Task:
         """Get a single task."""
         return TaskService._verify_task_access(task_id, organization_id)
 
+    @staticmethod
+    async def aget_task(task_id: UUID, organization_id: UUID) -> Task:
+        """Async variant of ``get_task``."""
+        return await TaskService._averify_task_access(task_id, organization_id)
+
     @staticmethod
     def create_task(
         project_id: UUID,
@@ -65,21 +244,28 @@ class TaskService:
         if not title or not title.strip():
             raise ValidationError("Task title is required")
 
+        if status not in TaskStatus.values:
+            raise ValidationError(f"Invalid status: {status}")
+
         project = TaskService._verify_project_access(project_id, organization_id)
 
-        # Get the next order value
-        max_order = Task.objects.filter(project=project).count()
-
-        task = Task.objects.create(
-            project=project,
-            title=title.strip(),
-            description=description,
-            status=status,
-            priority=priority,
-            assignee_email=assignee_email,
-            due_date=due_date,
-            order=max_order
-        )
+        with transaction.atomic():
+            # Appending only looks up the last rank through the (project, rank)
+            # index. Concurrent appends may tie; ties sort by creation time.
+            rank = rank_between(TaskService._last_rank(project.id), None)
+
+            task = Task.objects.create(
+                project=project,
+                title=title.strip(),
+                description=description,
+                status=status,
+                priority=priority,
+                assignee_email=assignee_email,
+                due_date=due_date,
+                rank=rank
+            )
+            TaskService._adjust_task_counters(project.id, {status: 1})
+            TaskEventService.publish(project.id, TaskEventService.TASK_CREATED, task)
         return task
 
     @staticmethod
@@ -120,9 +306,302 @@ class TaskService:
         if due_date is not None:
             task.due_date = due_date if due_date else None
 
-        task.save()
+        with transaction.atomic():
+            if status is not None:
+                # Lock the row so concurrent status changes can't both move
+                # the same task out of its previous counter.
+                previous_status = (
+                    Task.objects.select_for_update()
+                    .filter(id=task.id)
+                    .values_list('status', flat=True)
+                    .get()
+                )
+                if previous_status != status:
+                    TaskService._adjust_task_counters(
+                        task.project_id, {previous_status: -1, status: 1}
+                    )
+            task.save()
+            TaskEventService.publish(task.project_id, TaskEventService.TASK_UPDATED, task)
+        return task
+
+    @staticmethod
+    def _neighbour_ranks(task: Task, before_id: Optional[UUID], after_id: Optional[UUID]) -> tuple:
+        """Ranks the moved task must sort between; None for the list edges."""
+        ids = {task_id for task_id in (before_id, after_id) if task_id is not None}
+        ranks = dict(
+            Task.objects.filter(project_id=task.project_id, id__in=ids).values_list('id', 'rank')
+        )
+        if len(ranks) != len(ids):
+            raise ValidationError("Neighbour task not found in this project")
+
+        before, after = ranks.get(before_id), ranks.get(after_id)
+        siblings = Task.objects.filter(project_id=task.project_id).exclude(id=task.id)
+        if before_id is None:
+            before = siblings.filter(rank__lt=after).order_by('-rank').values_list('rank', flat=True).first()
+        elif after_id is None:
+            after = siblings.filter(rank__gt=before).order_by('rank').values_list('rank', flat=True).first()
+        return before, after
+
+    @staticmethod
+    def move_task(
+        task_id: UUID,
+        organization_id: UUID,
+        before_id: Optional[UUID] = None,
+        after_id: Optional[UUID] = None
+    ) -> Task:
+        """
+        Move a task right after ``before_id`` and/or right before ``after_id``
+        (tasks of the same project). Only the moved task's row is written.
+        """
+        if before_id is None and after_id is None:
+            raise ValidationError("beforeId or afterId is required")
+        if task_id in (before_id, after_id):
+            raise ValidationError("A task cannot be moved next to itself")
+
+        task = TaskService._verify_task_access(task_id, organization_id)
+        with transaction.atomic():
+            try:
+                rank = rank_between(*TaskService._neighbour_ranks(task, before_id, after_id))
+            except ValueError:
+                # The neighbours tie (concurrent appends) or are out of order.
+                rank = None
+            if rank is None or len(rank) > settings.TASK_RANK_MAX_LENGTH:
+                # Spread the project's ranks and try again. Also covers keys
+                # near the column limit when background rebalances fell behind.
+                TaskService.rebalance_ranks(task.project_id)
+                try:
+                    rank = rank_between(*TaskService._neighbour_ranks(task, before_id, after_id))
+                except ValueError:
+                    raise ValidationError("beforeId must sort before afterId")
+                if len(rank) > settings.TASK_RANK_MAX_LENGTH:
+                    raise ValidationError("Task order is too deep to place this task; try again")
+
+            task.rank = rank
+            task.updated_at = timezone.now()
+            Task.objects.filter(id=task.id).update(rank=task.rank, updated_at=task.updated_at)
+            TaskEventService.publish(task.project_id, TaskEventService.TASK_UPDATED, task)
+            if len(rank) > settings.TASK_RANK_REBALANCE_LENGTH:
+                transaction.on_commit(lambda: _rebalancer.submit(_rebalance_in_background, task.project_id))
         return task
 
+    @staticmethod
+    def rebalance_ranks(project_id: UUID) -> int:
+        """
+        Rewrite a project's task ranks as short, evenly spaced keys in their
+        current order. Returns the number of rewritten tasks.
+        """
+        with transaction.atomic():
+            TaskService._lock_project(project_id)
+            tasks = list(
+                Task.objects.filter(project_id=project_id)
+                .order_by(*Task._meta.ordering, 'id')
+                .only('id', 'rank')
+            )
+            changed = []
+            for task, rank in zip(tasks, rank_sequence(len(tasks))):
+                if task.rank != rank:
+                    task.rank = rank
+                    changed.append(task)
+            Task.objects.bulk_update(changed, ['rank'], batch_size=1000)
+        return len(changed)
+
+    @staticmethod
+    def _check_bulk_size(items) -> None:
+        if not items:
+            raise ValidationError("At least one item is required")
+        if len(items) > TaskService.MAX_BULK_SIZE:
+            raise ValidationError(f"Bulk operations are limited to {TaskService.MAX_BULK_SIZE} items")
+
+    @staticmethod
+    def _load_tasks_for_update(task_ids, organization_id: UUID) -> dict:
+        """
+        Lock and return ``{id: task}`` for ``task_ids``; ids that do not exist
+        map to a ValidationError and other organizations' tasks to a
+        PermissionDenied, matching ``_verify_task_access``.
+        """
+        # of=('self',): lock the task rows only, not the joined projects.
+        locked = Task.objects.select_for_update(of=('self',)).select_related('project')
+        found = {task.id: task for task in locked.filter(id__in=set(task_ids))}
+        tasks = {}
+        for task_id in task_ids:
+            task = found.get(task_id)
+            if task is None:
+                tasks[task_id] = ValidationError("Task not found")
+            elif task.project.organization_id != organization_id:
+                tasks[task_id] = PermissionDenied("Access denied to this task")
+            else:
+                tasks[task_id] = task
+        return tasks
+
+    @staticmethod
+    def _error_message(error: Exception) -> str:
+        if isinstance(error, ValidationError):
+            return '; '.join(error.messages)
+        return str(error)
+
+    @staticmethod
+    def _last_rank(project_id: UUID) -> Optional[str]:
+        return (
+            Task.objects.filter(project_id=project_id)
+            .order_by('-rank')
+            .values_list('rank', flat=True)
+            .first()
+        )
+
+    @staticmethod
+    def _lock_project(project_id: UUID) -> None:
+        """Lock the project row, serializing rank assignment."""
+        list(Project.objects.select_for_update().filter(id=project_id).values_list('id'))
+
+    @staticmethod
+    def bulk_create_tasks(project_id: UUID, organization_id: UUID, items: list[dict]) -> list[BulkItemResult]:
+        """
+        Create many tasks in one transaction.
+
+        ``items`` take the keyword arguments of ``create_task``. Invalid items
+        are reported in their result and skipped; the others are inserted
+        with one ``bulk_create``.
+        """
+        TaskService._check_bulk_size(items)
+        results = []
+        tasks = []
+        with transaction.atomic():
+            project = TaskService._verify_project_access(project_id, organization_id)
+            TaskService._lock_project(project.id)
+            rank = TaskService._last_rank(project.id)
+
+            for item in items:
+                title = (item.get('title') or '').strip()
+                status = item.get('status') or TaskStatus.TODO
+                priority = item.get('priority') or TaskPriority.MEDIUM
+                if not title:
+                    results.append(BulkItemResult(error="Task title is required"))
+                elif status not in TaskStatus.values:
+                    results.append(BulkItemResult(error=f"Invalid status: {status}"))
+                elif priority not in TaskPriority.values:
+                    results.append(BulkItemResult(error=f"Invalid priority: {priority}"))
+                else:
+                    rank = rank_between(rank, None)
+                    task = Task(
+                        project=project,
+                        title=title,
+                        description=item.get('description') or '',
+                        status=status,
+                        priority=priority,
+                        assignee_email=item.get('assignee_email') or '',
+                        due_date=item.get('due_date'),
+                        rank=rank,
+                    )
+                    tasks.append(task)
+                    results.append(BulkItemResult(task=task))
+
+            Task.objects.bulk_create(tasks)
+            TaskService._adjust_task_counters(project.id, Counter(task.status for task in tasks))
+            for task in tasks:
+                TaskEventService.publish(project.id, TaskEventService.TASK_CREATED, task)
+        return results
+
+    @staticmethod
+    def bulk_update_tasks(organization_id: UUID, updates: list[dict]) -> list[BulkItemResult]:
+        """
+        Update status, priority, assignee and due date of many tasks in one
+        transaction.
+
+        Each update holds the task ``id`` and the fields to change; ``None``
+        leaves a field unchanged and an empty ``due_date`` clears it.
+        """
+        TaskService._check_bulk_size(updates)
+        results = []
+        changed = {}
+        fields = {'updated_at'}
+        deltas = defaultdict(Counter)
+        with transaction.atomic():
+            tasks = TaskService._load_tasks_for_update([update['id'] for update in updates], organization_id)
+            for update in updates:
+                task = tasks[update['id']]
+                status = update.get('status')
+                priority = update.get('priority')
+                if isinstance(task, Exception):
+                    results.append(BulkItemResult(error=TaskService._error_message(task)))
+                    continue
+                if status is not None and status not in TaskStatus.values:
+                    results.append(BulkItemResult(error=f"Invalid status: {status}"))
+                    continue
+                if priority is not None and priority not in TaskPriority.values:
+                    results.append(BulkItemResult(error=f"Invalid priority: {priority}"))
+                    continue
+
+                if status is not None and status != task.status:
+                    deltas[task.project_id][task.status] -= 1
+                    deltas[task.project_id][status] += 1
+                    task.status = status
+                    fields.add('status')
+                if priority is not None:
+                    task.priority = priority
+                    fields.add('priority')
+                if update.get('assignee_email') is not None:
+                    task.assignee_email = update['assignee_email']
+                    fields.add('assignee_email')
+                if update.get('due_date') is not None:
+                    task.due_date = update['due_date'] or None
+                    fields.add('due_date')
+                task.updated_at = timezone.now()
+                changed[task.id] = task
+                results.append(BulkItemResult(task=task))
+
+            Task.objects.bulk_update(changed.values(), sorted(fields))
+            for project_id, project_deltas in deltas.items():
+                TaskService._adjust_task_counters(project_id, project_deltas)
+            for task in changed.values():
+                TaskEventService.publish(task.project_id, TaskEventService.TASK_UPDATED, task)
+        return results
+
+    @staticmethod
+    def bulk_move_tasks(task_ids: list[UUID], project_id: UUID, organization_id: UUID) -> list[BulkItemResult]:
+        """
+        Move many tasks to the end of another project of the same
+        organization in one transaction, keeping their relative order.
+        """
+        TaskService._check_bulk_size(task_ids)
+        results = []
+        moved = {}
+        deltas = defaultdict(Counter)
+        with transaction.atomic():
+            project = TaskService._verify_project_access(project_id, organization_id)
+            TaskService._lock_project(project.id)
+            rank = TaskService._last_rank(project.id)
+            tasks = TaskService._load_tasks_for_update(task_ids, organization_id)
+            now = timezone.now()
+
+            for task_id in task_ids:
+                task = tasks[task_id]
+                if isinstance(task, Exception):
+                    results.append(BulkItemResult(error=TaskService._error_message(task)))
+                    continue
+                if task.id in moved:
+                    results.append(BulkItemResult(task=task, moved_from=moved[task.id][1]))
+                    continue
+                if task.project_id == project.id:
+                    results.append(BulkItemResult(task=task))
+                    continue
+                previous_project_id = task.project_id
+                deltas[previous_project_id][task.status] -= 1
+                deltas[project.id][task.status] += 1
+                rank = rank_between(rank, None)
+                task.project = project
+                task.rank = rank
+                task.updated_at = now
+                moved[task.id] = (task, previous_project_id)
+                results.append(BulkItemResult(task=task, moved_from=previous_project_id))
+
+            Task.objects.bulk_update([task for task, _ in moved.values()], ['project', 'rank', 'updated_at'])
+            for counter_project_id, project_deltas in deltas.items():
+                TaskService._adjust_task_counters(counter_project_id, project_deltas)
+            for task, previous_project_id in moved.values():
+                TaskEventService.publish(previous_project_id, TaskEventService.TASK_REMOVED, task)
+                TaskEventService.publish(project.id, TaskEventService.TASK_CREATED, task)
+        return results
+
     @staticmethod
     def add_comment(
         task_id: UUID,
@@ -143,10 +622,30 @@ class TaskService:
             author_name=author_name.strip() or 'Anonymous',
             author_email=author_email
         )
+        TaskEventService.publish(task.project_id, TaskEventService.COMMENT_ADDED, comment)
         return comment
 
     @staticmethod
-    def get_comments_for_task(task_id: UUID, organization_id: UUID) -> list[TaskComment]:
-        """Get all comments for a task."""
+    def get_comments_for_task(task_id: UUID, organization_id: UUID) -> QuerySet[TaskComment]:
+        """
+        Get all comments for a task.
+        Returns a lazy queryset so callers can narrow columns and relations.
+        """
         TaskService._verify_task_access(task_id, organization_id)
-        return list(TaskComment.objects.filter(task_id=task_id))
+        return TaskComment.objects.filter(task_id=task_id)
+
+    @staticmethod
+    def get_comments_page(
+        task_id: UUID,
+        organization_id: UUID,
+        first: Optional[int] = None,
+        after: Optional[str] = None
+    ) -> Page:
+        """Get one keyset-paginated page of a task's comments."""
+        TaskService._verify_task_access(task_id, organization_id)
+        return keyset_paginate(
+            TaskComment.objects.filter(task_id=task_id),
+            TaskComment._meta.ordering,
+            first=first,
+            after=after,
+        )
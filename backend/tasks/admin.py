@@ -1,22 +1,48 @@
 from django.contrib import admin
+from django.contrib.postgres.search import SearchQuery
+from django.db import connection, transaction
+from services.search_service import SEARCH_CONFIG
+from services.task_service import TaskService
 from .models import Task, TaskComment
 
 
+class FullTextSearchMixin:
+    """Search through the ``search_vector`` GIN index on Postgres."""
+
+    def get_search_results(self, request, queryset, search_term):
+        if search_term.strip() and connection.vendor == 'postgresql':
+            query = SearchQuery(search_term, config=SEARCH_CONFIG, search_type='websearch')
+            return queryset.filter(search_vector=query), False
+        return super().get_search_results(request, queryset, search_term)
+
+
 class TaskCommentInline(admin.TabularInline):
     model = TaskComment
     extra = 0
 
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['title', 'project', 'status', 'priority', 'due_date', 'created_at']
     list_filter = ['status', 'priority', 'project__organization']
     search_fields = ['title', 'description']
     inlines = [TaskCommentInline]
 
+    def save_model(self, request, obj, form, change):
+        """Apply the counter deltas TaskService applies to its own writes."""
+        with transaction.atomic():
+            previous = None
+            if change:
+                previous = Task.objects.select_for_update().filter(id=obj.id).values_list('project_id', 'status').get()
+            super().save_model(request, obj, form, change)
+            if previous != (obj.project_id, obj.status):
+                if previous:
+                    TaskService._adjust_task_counters(previous[0], {previous[1]: -1})
+                TaskService._adjust_task_counters(obj.project_id, {obj.status: 1})
+
 
 @admin.register(TaskComment)
-class TaskCommentAdmin(admin.ModelAdmin):
+class TaskCommentAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['task', 'author_name', 'created_at']
     list_filter = ['author_name']
     search_fields = ['content']
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-17 23:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_task_assignee_email_taskcomment_author_email'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'order', '-created_at', 'id'], name='task_project_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskcomment',
+            index=models.Index(fields=['task', '-created_at', 'id'], name='comment_task_page_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+from django.db import migrations, models
+
+from core.ranking import rank_sequence
+
+
+def ranks_from_order(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    project_ids = Task.objects.values_list('project_id', flat=True).distinct()
+    for project_id in project_ids.iterator():
+        tasks = list(Task.objects.filter(project_id=project_id).order_by('order', '-created_at', 'id').only('id'))
+        for task, rank in zip(tasks, rank_sequence(len(tasks))):
+            task.rank = rank
+        Task.objects.bulk_update(tasks, ['rank'], batch_size=1000)
+
+
+def order_from_ranks(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    project_ids = Task.objects.values_list('project_id', flat=True).distinct()
+    for project_id in project_ids.iterator():
+        tasks = list(Task.objects.filter(project_id=project_id).order_by('rank', '-created_at', 'id').only('id'))
+        for position, task in enumerate(tasks):
+            task.order = position
+        Task.objects.bulk_update(tasks, ['order'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='rank',
+            field=models.CharField(default='', max_length=255),
+        ),
+        migrations.RunPython(ranks_from_order, order_from_ranks),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_project_page_idx',
+        ),
+        migrations.RemoveField(
+            model_name='task',
+            name='order',
+        ),
+        migrations.AlterModelOptions(
+            name='task',
+            options={'ordering': ['rank', '-created_at']},
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'rank', '-created_at', 'id'], name='task_project_rank_idx'),
+        ),
+    ]
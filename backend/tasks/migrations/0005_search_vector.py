@@ -0,0 +1,86 @@
+# Generated by Django 4.2.30 on 2026-10-17 23:43
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# Vectors are computed from the row being written, so they stay correct for
+# saves, bulk_create and COPY alike; the rank-only UPDATEs issued when tasks
+# are reordered do not touch the indexed columns and skip the trigger.
+TRIGGERS = """
+CREATE FUNCTION tasks_task_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER tasks_task_search_vector_update
+    BEFORE INSERT OR UPDATE OF title, description, search_vector ON tasks_task
+    FOR EACH ROW EXECUTE PROCEDURE tasks_task_search_vector();
+
+CREATE FUNCTION tasks_taskcomment_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := setweight(to_tsvector('english', coalesce(NEW.content, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER tasks_taskcomment_search_vector_update
+    BEFORE INSERT OR UPDATE OF content, search_vector ON tasks_taskcomment
+    FOR EACH ROW EXECUTE PROCEDURE tasks_taskcomment_search_vector();
+
+UPDATE tasks_task SET search_vector = NULL;
+UPDATE tasks_taskcomment SET search_vector = NULL;
+"""
+
+DROP_TRIGGERS = """
+DROP TRIGGER IF EXISTS tasks_task_search_vector_update ON tasks_task;
+DROP FUNCTION IF EXISTS tasks_task_search_vector();
+DROP TRIGGER IF EXISTS tasks_taskcomment_search_vector_update ON tasks_taskcomment;
+DROP FUNCTION IF EXISTS tasks_taskcomment_search_vector();
+"""
+
+
+def install_triggers(apps, schema_editor):
+    # Other databases fall back to substring search (services/search_service.py).
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(TRIGGERS)
+
+
+def drop_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_TRIGGERS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_task_rank'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='taskcomment',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # Backfill before building the indexes.
+        migrations.RunPython(install_triggers, drop_triggers),
+        migrations.AddIndex(
+            model_name='task',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='task_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskcomment',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='comment_search_idx'),
+        ),
+    ]
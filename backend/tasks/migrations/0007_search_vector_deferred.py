@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 00:25
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_task_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='task',
+            options={'base_manager_name': 'objects', 'ordering': ['rank', '-created_at']},
+        ),
+        migrations.AlterModelOptions(
+            name='taskcomment',
+            options={'base_manager_name': 'objects', 'ordering': ['-created_at']},
+        ),
+    ]
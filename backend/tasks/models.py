@@ -1,12 +1,26 @@
 """
 Task and TaskComment models.
 """
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import F, Q
+from django.db.models.functions import Lower
 from core.models import TimestampedModel
 from core.constants import TaskStatus, TaskPriority
 from projects.models import Project
 
 
+class SearchVectorDeferringManager(models.Manager):
+    """
+    Leaves ``search_vector`` unloaded: the tsvector is large and only
+    SearchService reads it, in SQL.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().defer('search_vector')
+
+
 class Task(TimestampedModel):
     """
     Task model - belongs to a project.
@@ -33,13 +47,34 @@ class Task(TimestampedModel):
     )
     assignee_email = models.EmailField(blank=True)
     due_date = models.DateField(null=True, blank=True)
-    order = models.PositiveIntegerField(default=0)
+    # Fractional rank key (see core/ranking.py): moving a task rewrites only
+    # its own rank.
+    rank = models.CharField(max_length=255, default='')
+    # Weighted title (A) and description (B) lexemes, maintained by a
+    # database trigger (see migration 0005); not written by the application.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = SearchVectorDeferringManager()
 
     class Meta:
-        ordering = ['order', '-created_at']
+        # Also used for comment.task and other related-object access.
+        base_manager_name = 'objects'
+        ordering = ['rank', '-created_at']
         indexes = [
             models.Index(fields=['project', 'status']),
             models.Index(fields=['project', 'priority']),
+            # Filters of the tasks query (TaskService.filter_tasks).
+            models.Index(F('project'), Lower('assignee_email'), name='task_project_assignee_idx'),
+            models.Index(fields=['project', 'due_date'], name='task_project_due_idx'),
+            # Overdue lookups only ever read open tasks.
+            models.Index(
+                fields=['project', 'due_date'],
+                condition=~Q(status=TaskStatus.DONE),
+                name='task_project_open_due_idx',
+            ),
+            # Keyset pagination over the default ordering.
+            models.Index(fields=['project', 'rank', '-created_at', 'id'], name='task_project_rank_idx'),
+            GinIndex(fields=['search_vector'], name='task_search_idx'),
         ]
 
     def __str__(self):
@@ -64,9 +99,19 @@ class TaskComment(TimestampedModel):
     content = models.TextField()
     author_name = models.CharField(max_length=100, default='Anonymous')
     author_email = models.EmailField(blank=True)
+    # Content lexemes (weight C), maintained by a database trigger.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = SearchVectorDeferringManager()
 
     class Meta:
+        base_manager_name = 'objects'
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination over the default ordering.
+            models.Index(fields=['task', '-created_at', 'id'], name='comment_task_page_idx'),
+            GinIndex(fields=['search_vector'], name='comment_search_idx'),
+        ]
 
     def __str__(self):
         return f"Comment on {self.task.title}"
@@ -0,0 +1,14 @@
+"""
+Keep the per-status task counters of projects in sync with task deletes,
+which never go through TaskService (admin, cascades, queryset deletes).
+"""
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from services.task_service import TaskService
+from .models import Task
+
+
+@receiver(post_delete, sender=Task)
+def decrement_task_counter(sender, instance, **kwargs):
+    TaskService._adjust_task_counters(instance.project_id, {instance.status: -1})
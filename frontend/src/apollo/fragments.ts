@@ -20,7 +20,7 @@ export const TASK_FRAGMENT = gql`
     status
     priority
     dueDate
-    order
+    rank
     createdAt
     updatedAt
   }
@@ -35,7 +35,7 @@ export const TASK_WITH_COMMENTS_FRAGMENT = gql`
     status
     priority
     dueDate
-    order
+    rank
     createdAt
     updatedAt
     comments {
@@ -65,17 +65,27 @@ export const PROJECT_FRAGMENT = gql`
   }
 `
 
+// Statistics and comments are deferred so the board renders as soon as the
+// tasks arrive; the server streams them in follow-up multipart payloads.
 export const PROJECT_WITH_TASKS_FRAGMENT = gql`
   ${PROJECT_FRAGMENT}
-  ${TASK_WITH_COMMENTS_FRAGMENT}
+  ${TASK_FRAGMENT}
+  ${TASK_COMMENT_FRAGMENT}
   ${PROJECT_STATISTICS_FRAGMENT}
   fragment ProjectWithTasks on ProjectType {
     ...ProjectFields
     tasks {
-      ...TaskWithComments
+      ...TaskFields
+      ... @defer(label: "comments") {
+        comments {
+          ...TaskCommentFields
+        }
+      }
     }
-    statistics {
-      ...ProjectStatisticsFields
+    ... @defer(label: "statistics") {
+      statistics {
+        ...ProjectStatisticsFields
+      }
     }
   }
 `
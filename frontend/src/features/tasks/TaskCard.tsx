@@ -2,20 +2,17 @@ import { useMutation } from '@apollo/client'
 import { Task, TaskStatus } from '../../types'
 import { Button } from '../../components/ui'
 import { UPDATE_TASK } from './operations'
-import { GET_PROJECT } from '../projects/operations'
 import { STATUS_LABELS, PRIORITY_LABELS, formatDate, getStatusClass, getPriorityClass, STATUS_OPTIONS } from '../../utils'
 
 interface TaskCardProps {
   task: Task
-  projectId: string
   organizationId: string
   onViewComments: (task: Task) => void
 }
 
-export function TaskCard({ task, projectId, organizationId, onViewComments }: TaskCardProps) {
+export function TaskCard({ task, organizationId, onViewComments }: TaskCardProps) {
 
   const [updateTask, { loading }] = useMutation(UPDATE_TASK, {
-    refetchQueries: [{ query: GET_PROJECT, variables: { id: projectId, organizationId } }],
     // Optimistic update for instant UI feedback
     optimisticResponse: (vars) => ({
       updateTask: {
@@ -4,24 +4,21 @@ import { Modal, Button } from '../../components/ui'
 import { Textarea, Input } from '../../components/forms'
 import { Task } from '../../types'
 import { ADD_COMMENT } from './operations'
-import { GET_PROJECT } from '../projects/operations'
 import { formatDateTime } from '../../utils'
 
 interface TaskCommentsModalProps {
   isOpen: boolean
   onClose: () => void
   task: Task | null
-  projectId: string
   organizationId: string
 }
 
-export function TaskCommentsModal({ isOpen, onClose, task, projectId, organizationId }: TaskCommentsModalProps) {
+export function TaskCommentsModal({ isOpen, onClose, task, organizationId }: TaskCommentsModalProps) {
   const [content, setContent] = useState('')
   const [authorName, setAuthorName] = useState('')
   const [error, setError] = useState<string | null>(null)
 
   const [addComment, { loading }] = useMutation(ADD_COMMENT, {
-    refetchQueries: [{ query: GET_PROJECT, variables: { id: projectId, organizationId } }],
     // Optimistic update for instant UI feedback
     optimisticResponse: task ? {
       addTaskComment: {
@@ -4,7 +4,6 @@ import { Modal, Button } from '../../components/ui'
 import { Input, Textarea, Select } from '../../components/forms'
 import { Task, TaskStatus, TaskPriority } from '../../types'
 import { CREATE_TASK, UPDATE_TASK } from './operations'
-import { GET_PROJECT } from '../projects/operations'
 import { STATUS_LABELS, PRIORITY_LABELS, STATUS_OPTIONS, PRIORITY_OPTIONS } from '../../utils'
 
 interface TaskFormModalProps {
@@ -27,10 +26,9 @@ export function TaskFormModal({ isOpen, onClose, projectId, organizationId, task
   })
   const [error, setError] = useState<string | null>(null)
 
-  const refetchQueries = [{ query: GET_PROJECT, variables: { id: projectId, organizationId } }]
-
-  const [createTask, { loading: creating }] = useMutation(CREATE_TASK, { refetchQueries })
-  const [updateTask, { loading: updating }] = useMutation(UPDATE_TASK, { refetchQueries })
+  // The board applies the resulting taskCreated/taskUpdated events itself.
+  const [createTask, { loading: creating }] = useMutation(CREATE_TASK)
+  const [updateTask, { loading: updating }] = useMutation(UPDATE_TASK)
 
   const loading = creating || updating
 
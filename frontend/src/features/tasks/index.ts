@@ -2,3 +2,4 @@ export { TaskCard } from './TaskCard'
 export { TaskFormModal } from './TaskFormModal'
 export { TaskCommentsModal } from './TaskCommentsModal'
 export * from './operations'
+export { useTaskSubscriptions } from './useTaskSubscriptions'
@@ -1,5 +1,5 @@
 import { gql } from '@apollo/client'
-import { TASK_FRAGMENT, TASK_COMMENT_FRAGMENT } from '../../apollo/fragments'
+import { TASK_FRAGMENT, TASK_COMMENT_FRAGMENT, TASK_WITH_COMMENTS_FRAGMENT } from '../../apollo/fragments'
 
 export const CREATE_TASK = gql`
   ${TASK_FRAGMENT}
@@ -27,6 +27,19 @@ export const UPDATE_TASK = gql`
   }
 `
 
+export const MOVE_TASK = gql`
+  ${TASK_FRAGMENT}
+  mutation MoveTask($taskId: UUID!, $organizationId: UUID!, $beforeId: UUID, $afterId: UUID) {
+    moveTask(taskId: $taskId, organizationId: $organizationId, beforeId: $beforeId, afterId: $afterId) {
+      success
+      error
+      task {
+        ...TaskFields
+      }
+    }
+  }
+`
+
 export const ADD_COMMENT = gql`
   ${TASK_COMMENT_FRAGMENT}
   mutation AddTaskComment($taskId: UUID!, $organizationId: UUID!, $input: CommentInput!) {
@@ -39,3 +52,41 @@ export const ADD_COMMENT = gql`
     }
   }
 `
+
+export const TASK_CREATED = gql`
+  ${TASK_WITH_COMMENTS_FRAGMENT}
+  subscription TaskCreated($projectId: UUID!, $organizationId: UUID!) {
+    taskCreated(projectId: $projectId, organizationId: $organizationId) {
+      ...TaskWithComments
+    }
+  }
+`
+
+export const TASK_UPDATED = gql`
+  ${TASK_FRAGMENT}
+  subscription TaskUpdated($projectId: UUID!, $organizationId: UUID!) {
+    taskUpdated(projectId: $projectId, organizationId: $organizationId) {
+      ...TaskFields
+    }
+  }
+`
+
+export const TASK_REMOVED = gql`
+  subscription TaskRemoved($projectId: UUID!, $organizationId: UUID!) {
+    taskRemoved(projectId: $projectId, organizationId: $organizationId) {
+      id
+    }
+  }
+`
+
+export const COMMENT_ADDED = gql`
+  ${TASK_COMMENT_FRAGMENT}
+  subscription CommentAdded($projectId: UUID!, $organizationId: UUID!) {
+    commentAdded(projectId: $projectId, organizationId: $organizationId) {
+      taskId
+      comment {
+        ...TaskCommentFields
+      }
+    }
+  }
+`
@@ -0,0 +1,95 @@
+import { useEffect } from 'react'
+import { ObservableQuery } from '@apollo/client'
+import { Project, Task, TaskComment } from '../../types'
+import { TASK_CREATED, TASK_UPDATED, TASK_REMOVED, COMMENT_ADDED } from './operations'
+
+type ProjectQuery = { project: Project }
+type SubscribeToMore = ObservableQuery<ProjectQuery>['subscribeToMore']
+
+// Statistics are derived from the task list, so deltas keep them current
+// without refetching the project.
+function withTasks(project: Project, tasks: Task[]): ProjectQuery {
+  const completedTasks = tasks.filter((task) => task.status === 'DONE').length
+  return {
+    project: {
+      ...project,
+      tasks,
+      statistics: project.statistics && {
+        ...project.statistics,
+        totalTasks: tasks.length,
+        completedTasks,
+        pendingTasks: tasks.length - completedTasks,
+        completionPercentage: tasks.length ? Math.round((completedTasks / tasks.length) * 1000) / 10 : 0,
+      },
+    },
+  }
+}
+
+/**
+ * Apply task and comment changes pushed by the server to a GET_PROJECT
+ * query instead of refetching it after every mutation.
+ */
+export function useTaskSubscriptions(
+  subscribeToMore: SubscribeToMore,
+  projectId: string | undefined,
+  organizationId: string | null
+) {
+  useEffect(() => {
+    if (!projectId || !organizationId) return
+    const variables = { projectId, organizationId }
+
+    const unsubscribers = [
+      subscribeToMore<{ taskCreated: Task }>({
+        document: TASK_CREATED,
+        variables,
+        updateQuery: (prev, { subscriptionData }) => {
+          const task = subscriptionData.data?.taskCreated
+          const tasks = prev.project.tasks ?? []
+          if (!task || tasks.some((existing) => existing.id === task.id)) return prev
+          return withTasks(prev.project, [...tasks, task])
+        },
+      }),
+      subscribeToMore<{ taskUpdated: Task }>({
+        document: TASK_UPDATED,
+        variables,
+        updateQuery: (prev, { subscriptionData }) => {
+          const task = subscriptionData.data?.taskUpdated
+          if (!task) return prev
+          const tasks = (prev.project.tasks ?? []).map((existing) =>
+            existing.id === task.id ? { ...existing, ...task } : existing
+          )
+          return withTasks(prev.project, tasks)
+        },
+      }),
+      subscribeToMore<{ taskRemoved: Pick<Task, 'id'> }>({
+        document: TASK_REMOVED,
+        variables,
+        updateQuery: (prev, { subscriptionData }) => {
+          const removed = subscriptionData.data?.taskRemoved
+          if (!removed) return prev
+          const tasks = prev.project.tasks ?? []
+          if (!tasks.some((task) => task.id === removed.id)) return prev
+          return withTasks(prev.project, tasks.filter((task) => task.id !== removed.id))
+        },
+      }),
+      subscribeToMore<{ commentAdded: { taskId: string; comment: TaskComment } }>({
+        document: COMMENT_ADDED,
+        variables,
+        updateQuery: (prev, { subscriptionData }) => {
+          const event = subscriptionData.data?.commentAdded
+          if (!event) return prev
+          const tasks = (prev.project.tasks ?? []).map((task) => {
+            const comments = task.comments ?? []
+            if (task.id !== event.taskId || comments.some((c) => c.id === event.comment.id)) {
+              return task
+            }
+            return { ...task, comments: [event.comment, ...comments] }
+          })
+          return { project: { ...prev.project, tasks } }
+        },
+      }),
+    ]
+
+    return () => unsubscribers.forEach((unsubscribe) => unsubscribe())
+  }, [subscribeToMore, projectId, organizationId])
+}
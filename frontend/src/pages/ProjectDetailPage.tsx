@@ -3,7 +3,7 @@ import { useParams, Link } from 'react-router-dom'
 import { useQuery } from '@apollo/client'
 import { Button, Badge, ProjectDetailSkeleton, ErrorMessage } from '../components/ui'
 import { GET_PROJECT, ProjectFormModal } from '../features/projects'
-import { TaskCard, TaskFormModal, TaskCommentsModal } from '../features/tasks'
+import { TaskCard, TaskFormModal, TaskCommentsModal, useTaskSubscriptions } from '../features/tasks'
 import { useOrganization } from '../hooks/useOrganization'
 import { Project, Task } from '../types'
 import { PROJECT_STATUS_LABELS, formatDate } from '../utils'
@@ -17,10 +17,11 @@ export default function ProjectDetailPage() {
   const [selectedTask, setSelectedTask] = useState<Task | null>(null)
   const [isCommentsModalOpen, setIsCommentsModalOpen] = useState(false)
 
-  const { data, loading, error, refetch } = useQuery<{ project: Project }>(GET_PROJECT, {
+  const { data, loading, error, refetch, subscribeToMore } = useQuery<{ project: Project }>(GET_PROJECT, {
     variables: { id: projectId, organizationId },
     skip: !projectId || !organizationId,
   })
+  useTaskSubscriptions(subscribeToMore, projectId, organizationId)
 
   const project = data?.project
 
@@ -135,7 +136,6 @@ export default function ProjectDetailPage() {
               <TaskCard
                 key={task.id}
                 task={task}
-                projectId={project.id}
                 organizationId={organizationId}
                 onViewComments={handleViewComments}
               />
@@ -175,8 +175,7 @@ export default function ProjectDetailPage() {
           setIsCommentsModalOpen(false)
           setSelectedTask(null)
         }}
-        task={selectedTask}
-        projectId={project.id}
+        task={project.tasks?.find((t) => t.id === selectedTask?.id) ?? selectedTask}
         organizationId={organizationId}
       />
     </div>
@@ -31,7 +31,7 @@ export interface Task {
   priority: TaskPriority
   assigneeEmail?: string
   dueDate?: string
-  order: number
+  rank: string
   createdAt: string
   updatedAt: string
   comments?: TaskComment[]